@@ -0,0 +1,925 @@
+import time
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from utils import fill_field, click_element, check_text_on_page, send_files, get_number, identify_fields, delete_patient, extract_data, wait_conditions, pause, get_sleep_stats, reset_sleep_stats, log_sleep_savings, browser_now, get_text_gone_time, reset_text_events, expand_and_scan_widgets, install_network_tracker, install_file_dialog_guard, wait_page_settled
+import os
+import re
+import threading
+from deps import load_env_file
+import logger
+from logger import log_message, log_context
+from tracer import traced, span
+import checkpoint
+import timeouts
+
+# Endereço padrão do sistema testado (pode ser trocado pela variável BASE_URL, ex.: servidor mock local)
+DEFAULT_BASE_URL = "https://staging.voiston.ai"
+
+
+# Mensagens de falha de processamento exibidas pela interface (separadas por vírgula em PROCESSING_ERROR_TEXTS)
+PROCESSING_ERROR_TEXTS = [text.strip() for text in os.getenv(
+    "PROCESSING_ERROR_TEXTS", "Erro no processamento,Falha no processamento").split(",") if text.strip()]
+
+
+def get_base_url():
+    """
+    Retorna o endereço base do sistema testado, sem barra no final.
+    """
+
+    return os.getenv("BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+
+
+class StepFailed(Exception):
+    """
+    Falha de uma interação obrigatória: interrompe a etapa atual (as interações seguintes
+    esperariam o timeout em vão) e faz as etapas dependentes serem ignoradas.
+    """
+
+
+class StepResult:
+    """
+    Resultado de uma etapa do cenário: 'ok', 'failed' ou 'skipped'.
+    """
+
+    def __init__(self, name, status, duration=None, reason=None):
+        self.name = name
+        self.status = status
+        self.duration = duration
+        self.reason = reason
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+    def as_dict(self):
+        return {"status": self.status, "duration": self.duration, "reason": self.reason}
+
+
+class Action:
+
+    _instance_lock = threading.Lock()
+
+    # Etapas presas à sessão do navegador ou de limpeza: repetidas mesmo se concluídas antes
+    RERUN_ON_RESUME = ("open_browser", "Login", "del_patient", "logout")
+
+    # Marcas de tempo e latências do upload: não são herdadas na retomada (incluiriam o tempo parado)
+    RESUME_TIMING_KEYS = ("upload_started_at", "upload_done_at", "upload_latency_ms", "processing_latency_ms")
+
+    def __init__(self, patient_name="Teste Automatizado", autorun=True, exclusive=True, setup=None, headless=None,
+                 checkpoint_id=None, resume=False):
+        """
+        Prepara o cenário de teste e, por padrão, executa todas as etapas.
+
+        Parâmetros:
+        - patient_name (str, opcional): Nome do paciente cadastrado neste cenário.
+        - autorun (bool, opcional): Se True, executa as etapas imediatamente (padrão: True).
+        - exclusive (bool, opcional): Se True, impede execuções simultâneas na mesma
+          instância do Python. O runner paralelo usa False (padrão: True).
+        - setup (str, opcional): 'ui' cadastra o paciente e envia os arquivos pela interface;
+          'api' faz o mesmo direto pela API DataPartner (padrão: variável SETUP_MODE ou 'ui').
+        - headless (bool, opcional): Executa o Chrome sem janela, com viewport fixo
+          (padrão: variável HEADLESS ou False).
+        - checkpoint_id (str, opcional): Nome do arquivo de estado em runs/ (padrão: logger.run_id).
+        - resume (bool, opcional): Retoma a execução salva em checkpoint_id a partir da primeira
+          etapa não concluída, com o mesmo paciente (padrão: False).
+        """
+
+        self.driver = None
+        self.wait = None
+        self.patient_name = patient_name
+        self.patient_id = None
+        self.network = None
+        self.sampler = None
+        if headless is None:
+            headless = os.getenv("HEADLESS", "0").lower() in ("1", "true", "sim")
+        self.headless = headless
+        self.setup = (setup or os.getenv("SETUP_MODE", "ui")).lower()
+        self.results = {"patient_name": patient_name, "setup": self.setup, "headless": self.headless, "steps": {}}
+        self.step_results = {}
+        self.session_state = None
+        self.checkpoint_id = checkpoint_id or logger.run_id
+        self.resumed = {}  # Etapas concluídas na execução retomada
+
+        if resume:
+            self.load_checkpoint()
+
+        if autorun:
+            if exclusive:
+                with self._instance_lock:
+                    self.run()
+            else:
+                self.run()
+
+    def step_graph(self):
+        """
+        Declara as etapas do cenário, em ordem, com suas dependências. Uma etapa só é executada se
+        todas as dependências terminaram com sucesso; as etapas de limpeza executam sempre.
+
+        Retorno:
+        - list: Tuplas (nome do método, dependências, sempre executa).
+        """
+
+        setup = "api_setup" if self.setup == "api" else "Register_patient"
+        return [
+            ("open_browser", (), False),
+            ("Login", ("open_browser",), False),
+            (setup, ("Login",), False),
+            ("awaiting_processing", (setup,), False),
+            ("check_exams", (setup,), False),
+            ("check_widgets", (setup,), False),
+            ("del_patient", (), True),
+            ("logout", (), True),
+        ]
+
+    def load_checkpoint(self):
+        """
+        Restaura de runs/<checkpoint_id>.json o paciente, a sessão e as etapas já concluídas.
+        As etapas de navegador (open_browser, Login) e de limpeza sempre executam de novo.
+
+        Retorno:
+        - bool: True se havia um checkpoint para retomar.
+        """
+
+        state = checkpoint.load_checkpoint(self.checkpoint_id)
+        if not state:
+            return False
+
+        self.patient_name = state.get("patient_name", self.patient_name)
+        self.patient_id = state.get("patient_id")
+        self.setup = state.get("setup", self.setup)
+        self.session_state = state.get("session")
+
+        # Dados coletados antes da interrupção (latências, extrações); as durações ficam à parte
+        # para o histórico gravar apenas as etapas executadas agora
+        previous = state.get("results", {})
+        if previous.get("patient_deleted"):
+            # O paciente já foi excluído: a retomada recomeça do cadastro, com um novo paciente
+            log_message(f"⚠️ O paciente {self.patient_id} da execução '{self.checkpoint_id}' já foi excluído. "
+                        "O cenário será refeito a partir do cadastro.")
+            self.patient_id = None
+            previous = {key: value for key, value in previous.items() if key not in ("patient_id", "patient_deleted")}
+            previous["step_results"] = {}
+        skipped = ("steps", "step_results", "success") + self.RESUME_TIMING_KEYS
+        self.results.update({key: value for key, value in previous.items() if key not in skipped})
+        self.results.update(patient_name=self.patient_name, setup=self.setup, patient_id=self.patient_id,
+                            resumed_from=self.checkpoint_id, resumed_steps=previous.get("steps", {}))
+
+        self.resumed = {name: result for name, result in previous.get("step_results", {}).items()
+                        if result.get("status") == "ok" and name not in self.RERUN_ON_RESUME}
+        log_message(f"⏩ Retomando a execução '{self.checkpoint_id}' do paciente {self.patient_id}: "
+                    f"{len(self.resumed)} etapa(s) já concluída(s) ({', '.join(self.resumed) or '-'}).")
+        return True
+
+    def save_checkpoint(self, finished=False):
+        """
+        Grava em runs/<checkpoint_id>.json o paciente, a sessão e o resultado das etapas até agora.
+        """
+
+        if not self.patient_id and self.driver:
+            self.patient_id = self._patient_id_from_url()
+
+        checkpoint.save_checkpoint(self.checkpoint_id, {
+            "checkpoint_id": self.checkpoint_id,
+            "run_id": logger.run_id,
+            "base_url": get_base_url(),
+            "patient_name": self.patient_name,
+            "patient_id": self.patient_id,
+            "setup": self.setup,
+            "session": self.session_state,
+            "finished": finished,
+            "results": self.results,
+        })
+
+    def open_patient(self):
+        """
+        Abre o Panorama do paciente retomado (substitui o cadastro já concluído).
+
+        Retorno:
+        - bool: True se o paciente foi aberto.
+        """
+
+        if not self.patient_id:
+            log_message("❌ Checkpoint sem ID do paciente: não é possível retomar sem repetir o cadastro.")
+            return False
+
+        self.driver.get(f"{get_base_url()}/patient/{self.patient_id}/panorama")
+        wait_page_settled(self.driver, 60)
+        log_message(f"✅ Paciente {self.patient_id} reaberto a partir do checkpoint.")
+        return True
+
+    def _patient_id_from_url(self):
+        # As páginas do paciente têm a forma /patient/<id>/...
+        try:
+            match = re.search(r'/patient/(\d+)/', self.driver.current_url)
+        except Exception:
+            return None
+        return match.group(1) if match else None
+
+    def run_step(self, name, requires=(), always=False):
+        """
+        Executa uma etapa respeitando as dependências e registra o resultado.
+
+        Parâmetros:
+        - name (str): Nome do método da etapa (deve retornar True em caso de sucesso).
+        - requires (tuple, opcional): Etapas que precisam ter terminado com sucesso.
+        - always (bool, opcional): Executa mesmo com dependências falhas (limpeza).
+
+        Retorno:
+        - StepResult: Resultado da etapa.
+        """
+
+        log_context.step = name  # Etapa atual gravada em cada linha do log
+        missing = [dependency for dependency in requires
+                   if dependency not in self.step_results or not self.step_results[dependency].ok]
+
+        if missing and not always:
+            result = StepResult(name, "skipped", reason=f"dependência sem sucesso: {', '.join(missing)}")
+            log_message(f"⏭️ Etapa '{name}' ignorada ({result.reason}).")
+        elif name in self.resumed and not always:
+            # Concluída na execução retomada; o cadastro é substituído por reabrir o paciente
+            ok = self.open_patient() if name in ("api_setup", "Register_patient") else True
+            result = StepResult(name, "ok" if ok else "failed", self.resumed[name].get("duration"),
+                                "retomada do checkpoint" if ok else "paciente do checkpoint não reaberto")
+            log_message(f"⏩ Etapa '{name}' já concluída na execução '{self.checkpoint_id}'.")
+        else:
+            step_start = time.time()
+            try:
+                ok = getattr(self, name)() is True
+                reason = None if ok else "etapa sem sucesso"
+            except Exception as e:
+                ok, reason = False, str(e)
+                log_message(f"❌ Erro inesperado na etapa '{name}': {e}")
+            duration = round(time.time() - step_start, 2)
+            self.results["steps"][name] = duration
+            result = StepResult(name, "ok" if ok else "failed", duration, reason)
+
+        self.step_results[name] = result
+        self.results.setdefault("step_results", {})[name] = result.as_dict()
+        self.save_checkpoint()
+        return result
+
+    def run(self):
+        """
+        Executa as etapas do grafo em ordem, ignorando de imediato as que dependem de uma etapa que
+        falhou, e registra a duração e o resultado de cada uma.
+
+        Retorno:
+        - dict: Resultados coletados durante a execução (duração e resultado das etapas, dados extraídos etc.).
+        """
+
+        import history
+
+        load_env_file()
+        reset_sleep_stats()
+        reset_text_events()
+        timeouts.reset_observations()
+        self.step_results = {}
+
+        with span("Action.run", category="scenario", patient=self.patient_name):
+            for name, requires, always in self.step_graph():
+                self.run_step(name, requires, always)
+
+        log_context.step = None
+
+        failed = [name for name, result in self.step_results.items() if result.status == "failed"]
+        skipped = [name for name, result in self.step_results.items() if result.status == "skipped"]
+        self.results["success"] = not failed and not skipped
+        self.save_checkpoint(finished=True)
+        if self.results["success"]:
+            log_message(f"✅ Cenário concluído: {len(self.step_results)} etapa(s) com sucesso.")
+        else:
+            log_message(f"❌ Cenário com falha em {', '.join(failed) or '-'}; "
+                        f"{len(skipped)} etapa(s) ignorada(s){': ' + ', '.join(skipped) if skipped else ''}. "
+                        f"Estado salvo em {checkpoint.checkpoint_path(self.checkpoint_id)}.")
+
+        log_sleep_savings()
+        self.results["sleep"] = get_sleep_stats()
+
+        # Maior espera por elemento e orçamentos esgotados (alimentam os timeouts adaptativos)
+        observations = timeouts.get_observations()
+        self.results["waits"] = observations["waits"]
+        self.results["timeouts_expired"] = observations["expired"]
+
+        # Durações das etapas e contagens extraídas no histórico local (base do 'start.py report')
+        history.record_run(self.results, base_url=get_base_url())
+
+        return self.results
+
+    @traced()
+    def open_browser(self):
+        """
+        Inicializa o navegador Google Chrome com configurações específicas.
+
+        Retorno:
+        - bool: True se o navegador foi iniciado e o site aberto.
+        """
+
+        from driver_resolver import resolve_chromedriver
+        from network import NetworkCapture, enable_performance_log, apply_block_profile, get_block_profile
+        from resources import ResourceSampler
+
+        try:
+            log_message("🔧 Configurando navegador...")
+
+            # Configurações do Chrome
+            options = webdriver.ChromeOptions()
+
+            # Define opções para melhorar a execução do Selenium
+            if self.headless:
+                # Sem janela nem sessão gráfica; viewport fixo para os seletores se comportarem igual
+                options.add_argument("--headless=new")
+                options.add_argument(f"--window-size={os.getenv('WINDOW_SIZE', '1920,1080')}")
+            else:
+                options.add_argument("--start-maximized")  # Inicia o navegador maximizado
+                options.add_argument("--disable-headless")  # Garante que o modo gráfico esteja ativado
+            options.add_argument("--disable-gpu")  # Evita possíveis bugs gráficos em alguns sistemas
+            options.add_argument("--disable-blink-features=AutomationControlled")  # 🔹 Evita que o site detecte que é um bot
+            options.add_argument("--no-sandbox")  # 🔹 Necessário para alguns sistemas Linux
+            options.add_argument("--disable-dev-shm-usage")  # 🔹 Evita uso excessivo de memória em contêineres
+
+            # Evita que o Selenium seja detectado pelo Chrome
+            options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            options.add_experimental_option("useAutomationExtension", False)
+
+            # Eventos de rede do DevTools, usados para medir o upload dos arquivos
+            enable_performance_log(options)
+
+            # Resolve o ChromeDriver localmente (cache/sistema), sem acessar a rede no caminho comum
+            chromedriver_path, driver_source, resolution_time = resolve_chromedriver()
+            self.results["driver_resolution"] = {"source": driver_source, "duration": round(resolution_time, 3)}
+            service = Service(chromedriver_path) if chromedriver_path else Service()
+
+            # Inicializa o WebDriver com as opções configuradas
+            launch_start = time.time()
+            self.driver = webdriver.Chrome(service=service, options=options)
+            launch_time = time.time() - launch_start
+            self.results["browser_launch"] = round(launch_time, 3)
+            self.network = NetworkCapture(self.driver)
+            install_network_tracker(self.driver)  # Contador de XHR/fetch usado por wait_page_settled
+            install_file_dialog_guard(self.driver)  # Upload só pelo <input type=file>, sem diálogo nativo
+            self.sampler = ResourceSampler(self.driver).start()  # Memória e CPU da sessão do navegador
+
+            # Bloqueia recursos dispensáveis (fontes, imagens, análise de uso) conforme BLOCK_PROFILE
+            self.results["block_profile"] = get_block_profile()
+            apply_block_profile(self.driver)
+            log_message(f"✅ Navegador{' headless' if self.headless else ''} inicializado em {launch_time:.2f} segundos "
+                        f"(resolução do driver: {resolution_time:.2f} segundos).", duration=launch_time)
+
+            # Define um tempo de espera implícito para encontrar elementos
+            self.driver.implicitly_wait(2)
+            self.wait = WebDriverWait(self.driver, 10)
+
+            log_message("🌐 Abrindo site...")
+            self.driver.get(f"{get_base_url()}/user/login?dp_id=MTA0")  # URL do sistema a ser acessado
+            log_message("✅ Site aberto com sucesso!")
+            return True
+
+        except Exception as e:
+            log_message(f"❌ Erro durante a inicialização do navegador: {e}")
+            return False
+
+    @traced()
+    def Login(self):
+        """
+        Realiza login automático no sistema usando as credenciais armazenadas no .env.
+
+        Retorno:
+        - bool: True se o login foi concluído (ou a sessão reaproveitada).
+        """
+
+        import session_cache
+
+        # Obtém as credenciais do arquivo .env
+        email = os.getenv('EMAIL')  # Recupera o e-mail armazenado
+        password = os.getenv('PASSWORD')  # Recupera a senha armazenada
+
+        start_time = time.time()  # Marca o início do login
+
+        try:
+            # Na retomada, reaplica a sessão gravada no checkpoint
+            if self.session_state and session_cache.apply_session(self.driver, self.session_state, get_base_url()):
+                self.results["login"] = "checkpoint"
+                log_message("✅ Sessão do checkpoint reaproveitada. Login completo ignorado.")
+                return True
+
+            # Reaproveita a sessão salva de uma execução anterior, se ainda for aceita
+            if session_cache.is_enabled() and session_cache.restore_session(self.driver, email, get_base_url()):
+                self.results["login"] = "cache"
+                self.capture_session()
+                log_message("✅ Sessão reaproveitada. Login completo ignorado.")
+                return True
+
+            pause(5, self.driver)  # Pequeno atraso para garantir que a página carregue
+
+            log_message("🔑 Realizando login...")
+
+            # Clica no botão de acesso
+            self._require(click_element(self.driver, 'access', 'class_name', 'Click de acesso'))
+            pause(5, self.driver)  # Aguarda a interface carregar
+
+            # Preenche os campos de login com as credenciais
+            self._require(fill_field(self.driver, 'email', 'id', email, 'Preenchimento de Email'))
+            self._require(fill_field(self.driver, 'password', 'id', password, 'Preenchimento de Password'))
+
+            # Clica no botão "Entrar"
+            self._require(click_element(self.driver, 'next', 'id', 'Click entrar'))
+            timeout = timeouts.get_timeout("Login")  # Derivado do histórico, até 400 segundos
+
+            pause(1, self.driver)  # Aguarda redirecionamento
+            while time.time() - start_time < timeout:
+                if not check_text_on_page(self.driver, 'Aguarde enquanto processamos sua requisição...', timeout=timeout):    
+                    log_message("✅ Log-in OK. Continuando ...")
+                    break
+                time.sleep(1)
+                log_message("⏳ Aguarde enquanto processamos sua requisição...")
+                
+            else:
+                execution_time = time.time() - start_time
+                log_message(f"❌ Timeout: Texto 'Aguarde enquanto processamos sua requisição...' ainda presente após {execution_time:.2f}")
+                timeouts.record_expired("Login", timeout)
+                return False  # Encerra a função caso o tempo de espera exceda o limite
+
+            log_message("✅ Login realizado com sucesso!")
+            pause(2, self.driver)  # Aguarda redirecionamento
+            self.results["login"] = "full"
+
+            # Salva cookies e localStorage para as próximas execuções e workers paralelos
+            if session_cache.is_enabled():
+                session_cache.save_session(self.driver, email, get_base_url())
+            self.capture_session()
+
+            # Possível clique para acessar uma seção específica após login (desativado por enquanto)
+            # click_element(self.driver, "//span[contains(text(), 'TESTE AUTOMATIZADO')]", 'xpath', 'Clicar no paciente')
+            return True
+
+        except Exception as e:
+            log_message(f"❌ Erro durante login: {e}")
+            return False
+
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total do login
+            log_message(f"⏳ Ação Login concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+    @traced()
+    def Register_patient(self):
+        """
+        Realiza o cadastro automático de um paciente no sistema.
+
+        Retorno:
+        - bool: True se o paciente foi cadastrado e os arquivos enviados.
+        """
+
+        start_time = time.time()  # Marca o início da execução
+
+        try:
+            pause(5, self.driver)  # Aguarda carregamento da página
+
+            log_message("📝 Realizando cadastro de paciente...")
+
+            # Clica no botão para adicionar um novo paciente
+            self._require(click_element(self.driver, "//button[span[contains(., 'Adicionar novo paciente')]]", 'xpath', 'Click novo Paciente'))
+
+            # Preenche os campos do paciente
+            self._require(fill_field(self.driver, "//input[@formcontrolname='name']", 'xpath', self.patient_name, 'Preencher campo nome'))
+            self._require(fill_field(self.driver, "//input[@placeholder='DD/MM/AAAA']", 'xpath', '20051995', 'Preencher campo data de nascimento'))
+
+            # Seleciona o gênero
+            self._require(click_element(self.driver, "//mat-select[@formcontrolname='gender']", 'xpath', 'Abrir seletor de gênero'))
+            self._require(click_element(self.driver, "//span[text()='Feminino']", 'xpath', 'Selecionar gênero'))
+
+            # Clica no botão "Salvar" para concluir o cadastro inicial
+            self._require(click_element(self.driver, "//button//span[text()='Salvar']", 'xpath', 'Click salvar'))
+
+            pause(5, self.driver)  # Aguarda a página atualizar antes de prosseguir
+
+            # ID do paciente recém-criado (gravado no checkpoint e usado na exclusão)
+            self.patient_id = self._patient_id_from_url() or self.patient_id
+            self.results["patient_id"] = self.patient_id
+
+            # Janela de captura dos eventos de rede: da seleção dos arquivos até o fim do upload
+            if self.network:
+                self.network.start()
+
+            # Clica no botão para adicionar exames e prontuários
+            self._require(click_element(self.driver, "//button[@mattooltip='Adicionar exames, prontuários']", 'xpath', 'Click adicionar exames, prontuários'))
+
+            # Envio de exames
+            self._require(click_element(self.driver, "//button[.//span[text()='Clique para enviar Exames']]", 'xpath', 'Clique para enviar Exames'))
+            sent_files = {"exames": self._require(send_files(self.driver,'exames', 'Selecionando exames'))}
+
+            pause(1, self.driver)  # Pequeno delay para estabilidade
+
+            # Envio de prontuários
+            self._require(click_element(self.driver, "//button[.//span[text()='Clique para enviar Prontuários']]", 'xpath', 'Clique para enviar Prontuários'))
+            sent_files["txts"] = self._require(send_files(self.driver,'txts', 'Selecionando Prontuários'))
+            self.record_upload(sent_files)
+
+            pause(3, self.driver)  # Aguarda o upload ser concluído
+
+            # Marca (no relógio do navegador) o início do upload para medir as latências
+            self.results["upload_started_at"] = browser_now(self.driver)
+
+            # Clica no botão "Salvar" para finalizar o processo
+            self._require(click_element(self.driver, "//button[span[text()='Salvar']]", 'xpath', 'Click Salvar'))
+            return True
+
+        except Exception as e:
+            log_message(f"❌ Erro durante preenchimento dos dados do paciente: {e}")
+            return False
+
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total da execução
+            log_message(f"⏳ Ação Registrar paciente concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+    def capture_session(self):
+        # Sessão autenticada gravada no checkpoint, para uma retomada não repetir o login
+        import session_cache
+
+        try:
+            self.session_state = session_cache.capture_session(self.driver)
+        except Exception as e:
+            log_message(f"⚠️ Não foi possível capturar a sessão para o checkpoint: {e}")
+
+    def _require(self, result):
+        # Interação obrigatória: interrompe a etapa na primeira falha (o helper já registrou qual foi)
+        if not result:
+            raise StepFailed("interação obrigatória não concluída")
+        return result
+
+    def record_upload(self, files):
+        """
+        Registra no manifesto das fixtures e nos resultados quantos arquivos e bytes foram enviados.
+
+        Parâmetros:
+        - files (dict): Pasta ('exames', 'txts') -> lista de caminhos enviados.
+        """
+
+        import fixtures
+
+        try:
+            record = fixtures.record_run(logger.run_id, self.patient_name, files, setup=self.setup)
+            self.results["upload_files"] = record["files"]
+            self.results["upload_bytes"] = record["bytes"]
+            log_message(f"📦 {record['files']} arquivo(s) enviados, {record['bytes'] / 1024:.0f} KB.")
+        except Exception as e:
+            log_message(f"⚠️ Não foi possível registrar os arquivos enviados: {e}")
+
+    def record_network(self):
+        """
+        Lê os eventos de rede capturados durante o upload e grava por requisição o tamanho, TTFB,
+        tempo de envio, tempo do servidor e vazão em results['upload_network'].
+        """
+
+        from network import log_summary
+
+        if not self.network or not self.network.available:
+            return
+
+        try:
+            self.network.poll()
+            summary = self.network.summary(ui_wait_ms=self.results.get("upload_latency_ms"))
+            self.results["upload_network"] = summary
+            log_summary(summary)
+        except Exception as e:
+            log_message(f"⚠️ Não foi possível medir o upload pelos eventos de rede: {e}")
+
+    @traced()
+    def api_setup(self):
+        """
+        Cadastra o paciente e envia os arquivos de 'arquivos/exames' e 'arquivos/txts' direto pela
+        API DataPartner, sem o formulário da interface, e abre o Panorama do paciente criado.
+
+        Retorno:
+        - bool: True se o paciente foi cadastrado e os arquivos enviados.
+        """
+
+        import fixtures
+        from api_client import get_client
+
+        start_time = time.time()  # Marca o início da execução
+
+        try:
+            log_message("📝 Cadastrando paciente pela API...")
+
+            client = get_client()
+            self.patient_id = client.create_patient(self.patient_name)
+            self.results["patient_id"] = self.patient_id
+            log_message(f"✅ Paciente {self.patient_id} cadastrado pela API.")
+
+            # Exames e prontuários em uma única requisição multipart
+            files = {folder: fixtures.select_files(folder) for folder in ("exames", "txts")}
+            upload = client.upload_files(self.patient_id, files)
+            self.record_upload(files)
+
+            # O fim do upload (epoch em ms, mesma base do relógio do navegador) é a referência do processamento
+            self.results["upload_done_at"] = time.time() * 1000
+            self.results["upload_latency_ms"] = round(upload["duration"] * 1000, 1)
+            log_message(f"📤 {upload['files']} arquivo(s) ({upload['bytes'] / 1024:.0f} KB) enviados pela API "
+                        f"em {upload['duration']:.2f} segundos.", duration=upload["duration"])
+
+            # Continua pela interface a partir do Panorama do paciente
+            self.driver.get(f"{get_base_url()}/patient/{self.patient_id}/panorama")
+            return True
+
+        except Exception as e:
+            log_message(f"❌ Erro durante cadastro do paciente pela API: {e}")
+            return False
+
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total da execução
+            log_message(f"⏳ Ação Cadastrar paciente (API) concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+    @traced()
+    def awaiting_processing(self):
+        """
+        Aguarda o processamento dos arquivos enviados (exames e prontuários).
+
+        Retorno:
+        - bool: True se o upload e o processamento dos prontuários terminaram dentro do timeout.
+        """
+
+        start_time = time.time()  # Marca o início do tempo de espera
+
+        try:
+            pause(5, self.driver)  # Pequena pausa para garantir que a página carregue
+
+            log_message("⏳ Aguardando processamento...")
+
+            # Define o tempo máximo de espera (derivado do histórico, até 10 minutos)
+            timeout = timeouts.get_timeout("awaiting_processing")
+            
+            # Verifica se a mensagem "Enviando arquivos..." desaparece
+            while time.time() - start_time < timeout:
+                if not check_text_on_page(self.driver, 'Enviando arquivos...', timeout=timeout):
+                    execution_time = time.time() - start_time
+                    log_message(f"✅ Enviando arquivos... Upload executado em {execution_time:.2f} segundos.", duration=execution_time)
+                    break
+                time.sleep(3)  # Pausa de 5 segundos para estabilidade
+                log_message("⏳ Processamento ainda em andamento...")
+            else:
+                log_message(f"❌ Timeout: Texto 'Enviando arquivos...' ainda presente após {timeout:.0f} segundos.")
+                timeouts.record_expired("awaiting_processing", timeout)
+                return False  # Encerra a função caso o tempo de espera exceda o limite
+
+            # Latência do upload medida no navegador (precisão de milissegundos)
+            upload_started = self.results.get("upload_started_at")
+            # No setup pela API o fim do upload já é conhecido; na interface, é quando o texto some
+            # (sem marca de início, como num cadastro retomado, não há latência a medir)
+            upload_done = self.results.get("upload_done_at") or (upload_started and get_text_gone_time('Enviando arquivos...'))
+            if upload_started and upload_done:
+                self.results["upload_latency_ms"] = round(upload_done - upload_started, 1)
+                log_message(f"📤 Latência do upload: {self.results['upload_latency_ms']:.1f} ms.")
+
+            self.record_network()
+
+            pause(4, self.driver)  # Pausa adicional para garantir estabilidade na página
+
+            # Clica na aba "Prontuários"
+            self._require(click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-16.svg']", 'xpath', 'Click Prontuários'))
+
+            pause(2, self.driver)  # Pausa adicional para garantir estabilidade na página
+
+            # Segunda verificação: uma única espera até "Aguardando processamento" e "Processando:"
+            # sumirem juntos, ou uma mensagem de erro aparecer (mesmo DOM, mesma política de refresh)
+            wait = wait_conditions(self.driver, [
+                ("processado", "all_gone", ['Aguardando processamento', 'Processando:']),
+                ("erro", "any_present", PROCESSING_ERROR_TEXTS),
+            ], timeout=max(timeout - (time.time() - start_time), 0))
+            self.results["processing_wait"] = wait
+            processed = wait["met"] == "processado"
+
+            if processed:
+                execution_time1 = time.time() - start_time
+                log_message(f"✅ Processamento de prontuarios executado em {execution_time1:.2f}.", duration=execution_time1)
+
+                # Latência do processamento medida no navegador, a partir do fim do upload
+                if upload_done and wait["timestamp"]:
+                    self.results["processing_latency_ms"] = round(wait["timestamp"] - upload_done, 1)
+                    log_message(f"⚙️ Latência do processamento: {self.results['processing_latency_ms']:.1f} ms.")
+
+            elif wait["met"] == "erro":
+                log_message("❌ A interface exibiu um erro no processamento dos prontuários.")
+
+            else:
+                log_message("❌ Timeout atingido em processamento dos prontuários.")
+                timeouts.record_expired("awaiting_processing", timeout)
+
+            pause(1, self.driver)  # Pequena pausa para estabilidade
+            self.results["prontuarios"] = extract_data(self.driver)
+            pause(1, self.driver)  # Pequena pausa antes de finalizar
+            return processed
+
+        except Exception as e:
+            log_message(f"❌ Erro durante processamento dos prontuarios: {e}")
+            return False
+
+        finally:
+            execution_time2 = time.time() - start_time  # Calcula o tempo total de execução
+            log_message(f"⏳ Processamento dos prontuarios concluída em {execution_time2:.2f} segundos.", duration=execution_time2)
+    
+    @traced()
+    def check_exams(self):
+        """
+        Verifica o processamento dos exames enviados, aguardando a conclusão antes de prosseguir.
+
+        Retorno:
+        - bool: True se o processamento dos exames terminou dentro do timeout.
+        """
+
+        start_time = time.time()  # Marca o início do tempo de execução
+
+        try:
+            medidas = None  # Inicializa a variável de medidas
+            erros = None  # Inicializa a variável de erros
+            pause(5, self.driver)  # Pequena pausa para garantir que a página carregue
+
+            log_message("🔍 Verificando processamento dos exames...")
+
+            # Clica no menu de exames
+            self._require(click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-11.svg']", 'xpath', 'Click Exames'))
+
+            # Clica na aba de exames enviados
+            self._require(click_element(self.driver, "//mat-icon[text()='cloud_download']/parent::a", 'xpath', 'Click Exames enviados'))
+            wait_page_settled(self.driver, 60)  # Aguarda a página carregar
+            # Tempo limite para o processamento (derivado do histórico, até 10 minutos)
+            timeout = timeouts.get_timeout("check_exams")
+            start_time = time.time()
+
+            def refresh_uploads():
+                # Atualiza a lista pelo botão da própria aba (sem recarregar a página)
+                log_message("⏳ Processamento ainda em andamento...")
+                click_element(self.driver, "//mat-icon[text()='update']", 'xpath', 'Click Atualizando Envios')
+                wait_page_settled(self.driver, 60, selector="mat-expansion-panel-header")
+
+            # Uma única espera pelos dois textos de "aguardando", ou por uma mensagem de erro
+            wait = wait_conditions(self.driver, [
+                ("processado", "all_gone", ['Aguardando processamento', 'Exame aguardando processamento']),
+                ("erro", "any_present", PROCESSING_ERROR_TEXTS),
+            ], timeout=timeout, refresh_interval=30, refresh=refresh_uploads)
+            self.results["exams_wait"] = wait
+            processed = wait["met"] == "processado"
+
+            if processed:
+                execution_time = time.time() - start_time
+                log_message(f"✅ Processamento dos exames concluído em {execution_time:.2f} segundos.", duration=execution_time)
+            elif wait["met"] == "erro":
+                log_message("❌ A interface exibiu um erro no processamento dos exames.")
+            else:
+                log_message(f"❌ Timeout: Texto 'Aguardando processamento' ainda presente após {timeout:.0f} segundos.")
+                timeouts.record_expired("check_exams", timeout)
+
+            # Após a conclusão do processamento, captura os números de medidas e erros
+            pause(1, self.driver)
+            medidas = get_number(self.driver, "//p/span[1]", 'xpath', 'Verificação de Medidas')
+            erros = get_number(self.driver, "//p[contains(text(), 'Erros')]", 'xpath', 'Verificação de Erros')
+            pause(1, self.driver)
+            log_message(f" Foram encontrados nos Arquivos de Exames Enviados {medidas} Medidas e {erros} Erros.")
+            self.results["medidas"] = medidas
+            self.results["erros"] = erros
+            click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-11.svg']", 'xpath', 'Click Exames')
+            wait_page_settled(self.driver, 60)  # Aguarda as requisições da aba e a estabilidade do Angular
+            self.results["exames"] = extract_data(self.driver)
+            pause(1, self.driver)  # Pequena pausa antes de finalizar
+            return processed
+
+        except Exception as e:
+            log_message(f"❌ Erro durante processamento: {e}")
+            return False
+
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total da execução
+            log_message(f"⏳ Ação 'checando exames' concluída em {execution_time:.2f} segundos.", duration=execution_time)
+    
+    @traced()
+    def check_widgets(self):
+        """
+        Expande e verifica os widgets disponíveis na página.
+
+        Retorno:
+        - bool: True se os widgets foram verificados.
+        """
+
+        teste = None  # Mensagens de widgets vazios encontradas
+        start_time = time.time()  # Marca o início da execução
+
+        try:
+            pause(5, self.driver)  # Pausa para garantir carregamento da página
+
+            log_message("🔍 Verificando widgets...")
+
+            # Clica no botão para acessar a aba "Panorama"
+            self._require(click_element(self.driver, "//img[@src='/assets/icon/VOISTON_ICONS-01.svg']", 'xpath', 'Click Panorama'))
+
+            pause(5, self.driver)  # Tempo de espera para carregamento dos widgets
+
+            # Expande todos os painéis e verifica os widgets vazios em uma única chamada
+            scan = expand_and_scan_widgets(self.driver)
+
+            if scan is not None:
+                teste = scan["messages"]
+                self.results["widgets"] = scan["widgets"]
+            else:
+                # Encontra todos os elementos de expansão na página
+                expansion = self.driver.find_elements(By.TAG_NAME, "mat-expansion-panel-header")
+
+                for expansions in expansion:
+                    state_expansions = expansions.get_attribute("aria-expanded")  # Verifica se o painel está expandido
+
+                    if state_expansions == "false":  # Se o painel estiver fechado, expande
+                        log_message("🔽 Expansor fechado. Expandindo agora...")
+                        pause(1, self.driver)
+                        expansions.click()
+                    else:
+                        log_message("✅ Expansor já está aberto.")
+
+                pause(5, self.driver)  # Tempo de espera para garantir carregamento das informações
+
+                # Chama a função para identificar os campos da página
+                teste = identify_fields(self.driver, bulk=False)
+
+            self.results["widgets_vazios"] = teste
+
+            pause(1, self.driver)  # Pequena pausa antes de finalizar
+            return True
+
+        except Exception as e:
+            log_message(f"❌ Erro durante verificação dos widgets: {e}")
+            return False
+        
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total da execução
+            log_message(f"Não foram encontrados: {teste}.")
+            log_message(f"⏳ Ação 'checando widgets' concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+    @traced()
+    def del_patient(self):
+        """
+        Exclui um paciente com base no ID extraído da URL atual (ou no ID do cadastro pela API).
+        Etapa de limpeza: executa mesmo quando as etapas anteriores falharam.
+
+        Retorno:
+        - bool: True se o paciente foi excluído ou se nenhum paciente chegou a ser cadastrado.
+        """
+
+        start_time = time.time()  # Marca o início da execução
+        patient_id = self.patient_id
+
+        try:
+            if self.driver:
+                pause(5, self.driver)  # Aguarda possíveis carregamentos da página
+
+                # Extrai o ID do paciente da URL atual
+                patient_id = self._patient_id_from_url() or self.patient_id
+            self.patient_id = patient_id
+            self.results["patient_id"] = patient_id
+
+            # Com KEEP_FAILED_PATIENT, um cenário com falha mantém o paciente para a retomada (--resume)
+            failed = any(result.status == "failed" for result in self.step_results.values())
+            if patient_id and failed and os.getenv("KEEP_FAILED_PATIENT", "0").lower() in ("1", "true", "sim"):
+                log_message(f"⏸️ Paciente {patient_id} mantido para retomada: start.py run --resume {self.checkpoint_id}")
+                return True
+
+            if patient_id:
+                # Chama a função que realiza a exclusão do paciente
+                deleted = delete_patient(patient_id, 'delete_patient')
+                self.results["patient_deleted"] = deleted
+                if deleted:
+                    log_message(f"✅ Paciente {patient_id} excluído com sucesso!")
+                return deleted
+
+            # Sem cadastro concluído não há o que excluir
+            setup = self.step_results.get("api_setup") or self.step_results.get("Register_patient")
+            if setup is None or not setup.ok:
+                log_message("⚠️ Nenhum paciente cadastrado nesta execução. Exclusão ignorada.")
+                return True
+
+            log_message("❌ Erro: ID do paciente não encontrado na URL!")
+            return False
+
+        except Exception as e:
+            log_message(f"❌ Erro durante exclusão do paciente {patient_id} : {e}")
+            return False
+
+        finally:
+            execution_time = time.time() - start_time  # Calcula o tempo total da execução
+            log_message(f"⏳ Ação 'excluir paciente {patient_id}' concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+    @traced()
+    def logout(self):
+        """
+        Encerra a sessão do navegador e registra a ação. Etapa de limpeza: executa sempre.
+    
+        Retorno:
+        - bool: True (também quando o navegador nem chegou a ser iniciado).
+        """
+    
+        if self.sampler:
+            self.results["browser_resources"] = self.sampler.stop()
+
+        if self.driver:
+            self.driver.quit()  # Fecha todas as janelas do navegador e encerra a sessão
+
+        log_message("🚪 Sessão encerrada.")
+        return True
@@ -0,0 +1,280 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from logger import log_message
+from tracer import traced, span
+
+
+# Prefixo do nome dos pacientes criados pelo teste automatizado
+TEST_PATIENT_PREFIX = "Teste Automatizado"
+
+# Tempo máximo de conexão e de leitura de cada requisição (segundos)
+connect_timeout = float(os.getenv("API_CONNECT_TIMEOUT", 5))
+read_timeout = float(os.getenv("API_READ_TIMEOUT", 30))
+
+# Quantidade máxima de exclusões simultâneas (também é o tamanho do pool de conexões)
+max_workers = int(os.getenv("API_WORKERS", 8))
+
+# Novas tentativas em falhas de rede e respostas 429/5xx, com espera exponencial (0.5s, 1s, 2s...)
+retry_total = int(os.getenv("API_RETRIES", 3))
+retry_backoff = float(os.getenv("API_BACKOFF", 0.5))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def _sibling_url(delete_url, env_name, endpoint):
+    # Demais endpoints do DataPartner; por padrão, irmãos do endpoint de exclusão (ex.: .../Patient/List)
+    return os.getenv(env_name) or re.sub(r"Delete/?$", endpoint, delete_url or "")
+
+
+class ApiClient:
+    """
+    Cliente da API Voiston com sessão HTTP persistente (keep-alive), novas tentativas
+    com espera exponencial e exclusão de pacientes em paralelo.
+    """
+
+    def __init__(self, url_api=None, api_key=None, workers=None):
+        self.url_api = url_api or os.getenv("URL_API")
+        self.api_key = api_key or os.getenv("API_KEY")
+        self.list_url = _sibling_url(self.url_api, "URL_API_LIST", "List")
+        self.create_url = _sibling_url(self.url_api, "URL_API_CREATE", "Create")
+        self.upload_url = _sibling_url(self.url_api, "URL_API_UPLOAD", "Upload/")
+        self.status_url = _sibling_url(self.url_api, "URL_API_STATUS", "Status/")
+        self.workers = workers or max_workers
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=retry_total,
+            backoff_factor=retry_backoff,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET", "DELETE"}),  # Apenas métodos idempotentes
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+        # Uma conexão reaproveitável por thread de exclusão
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"apiKey": self.api_key or ""})
+
+    def close(self):
+        self.session.close()
+
+    @traced(category="api")
+    def delete_patient(self, patient_id):
+        """
+        Exclui um paciente pela API.
+
+        Parâmetros:
+        - patient_id (str ou int): ID do paciente.
+
+        Retorno:
+        - dict: {'id', 'ok', 'status', 'duration', 'error'}. Um 404 conta como sucesso
+          (o paciente já não existe, por exemplo após uma nova tentativa).
+        """
+
+        start_time = time.time()
+        result = {"id": str(patient_id), "ok": False, "status": None, "error": None}
+
+        try:
+            response = self.session.delete(f"{self.url_api}{patient_id}", timeout=self.timeout)
+            result["status"] = response.status_code
+            result["ok"] = response.status_code in (200, 204, 404)
+            if not result["ok"]:
+                result["error"] = response.text[:500]
+
+        except requests.RequestException as e:
+            result["error"] = str(e)
+
+        result["duration"] = round(time.time() - start_time, 3)
+        return result
+
+    def delete_patients(self, patient_ids):
+        """
+        Exclui vários pacientes em paralelo, reaproveitando as conexões do pool.
+
+        Parâmetros:
+        - patient_ids (list): IDs dos pacientes.
+
+        Retorno:
+        - list: Resultado de cada exclusão (ver delete_patient), na ordem dos IDs.
+        """
+
+        patient_ids = list(dict.fromkeys(str(patient_id) for patient_id in patient_ids))
+        if not patient_ids:
+            return []
+
+        start_time = time.time()
+        with span("api.delete_patients", category="api", count=len(patient_ids)):
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(patient_ids)), thread_name_prefix="api") as executor:
+                results = list(executor.map(self.delete_patient, patient_ids))
+
+        execution_time = time.time() - start_time
+        failed = [result for result in results if not result["ok"]]
+        log_message(f"🗑️ {len(results) - len(failed)}/{len(results)} paciente(s) excluído(s) em "
+                    f"{execution_time:.2f} segundos.", duration=execution_time, deleted=len(results) - len(failed))
+        for result in failed:
+            log_message(f"❌ Erro ao deletar paciente {result['id']}. Código: {result['status']}, Resposta: {result['error']}")
+
+        return results
+
+    @traced(category="api")
+    def create_patient(self, name, birth_date="1995-05-20", gender="F"):
+        """
+        Cadastra um paciente pela API (sem passar pelo formulário da interface).
+        POST não é repetido automaticamente, para não duplicar o paciente.
+
+        Parâmetros:
+        - name (str): Nome do paciente.
+        - birth_date (str, opcional): Data de nascimento no formato AAAA-MM-DD.
+        - gender (str, opcional): Gênero ('F' ou 'M').
+
+        Retorno:
+        - str: ID do paciente criado (requests.HTTPError se a resposta vier sem ID).
+        """
+
+        response = self.session.post(self.create_url, json={"name": name, "birthDate": birth_date, "gender": gender},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        patient_id = next((payload[key] for key in ("id", "Id", "patientId") if payload.get(key) not in (None, "")), None)
+        if patient_id is None:
+            # Sem ID, o upload e a exclusão iriam para '.../None'
+            raise requests.HTTPError(f"Resposta do cadastro sem ID do paciente: {payload}", response=response)
+        return str(patient_id)
+
+    @traced(category="api")
+    def upload_files(self, patient_id, files):
+        """
+        Envia os arquivos de um paciente em uma única requisição multipart.
+
+        Parâmetros:
+        - patient_id (str): ID do paciente.
+        - files (dict): Categoria ('exames', 'txts') -> lista de caminhos de arquivo.
+
+        Retorno:
+        - dict: {'files', 'bytes', 'duration'} do envio.
+        """
+
+        start_time = time.time()
+        handles = []
+        try:
+            parts = []
+            for category, paths in files.items():
+                for path in paths:
+                    handle = open(path, "rb")
+                    handles.append(handle)
+                    parts.append((category, (os.path.basename(path), handle)))
+
+            response = self.session.post(f"{self.upload_url}{patient_id}", files=parts,
+                                         timeout=(connect_timeout, max(read_timeout, 120)))
+            response.raise_for_status()
+        finally:
+            for handle in handles:
+                handle.close()
+
+        return {
+            "files": len(parts),
+            "bytes": sum(os.path.getsize(path) for paths in files.values() for path in paths),
+            "duration": round(time.time() - start_time, 3),
+        }
+
+    def patient_status(self, patient_id):
+        """
+        Consulta o estado de processamento dos documentos de um paciente.
+
+        Parâmetros:
+        - patient_id (str): ID do paciente.
+
+        Retorno:
+        - dict: Resposta da API (ex.: {'docs': 'processing', 'exams': 'done'}).
+        """
+
+        response = self.session.get(f"{self.status_url}{patient_id}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    @traced(category="api")
+    def list_patients(self, name_prefix=TEST_PATIENT_PREFIX):
+        """
+        Lista os pacientes cujo nome começa com o prefixo informado.
+
+        Parâmetros:
+        - name_prefix (str, opcional): Prefixo do nome (padrão: 'Teste Automatizado').
+
+        Retorno:
+        - list: Dicionários {'id', 'name'}.
+        """
+
+        response = self.session.get(self.list_url, params={"name": name_prefix}, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+
+        # Aceita tanto uma lista simples quanto uma resposta paginada ({'data': [...]} / {'items': [...]})
+        if isinstance(payload, dict):
+            payload = payload.get("data") or payload.get("items") or []
+
+        patients = []
+        for item in payload:
+            patient_id = item.get("id") or item.get("Id") or item.get("patientId")
+            name = item.get("name") or item.get("Name") or ""
+            if patient_id and name.startswith(name_prefix):
+                patients.append({"id": str(patient_id), "name": name})
+        return patients
+
+    def sweep(self, name_prefix=TEST_PATIENT_PREFIX, dry_run=False):
+        """
+        Remove de uma vez todos os pacientes de teste deixados por execuções anteriores.
+
+        Parâmetros:
+        - name_prefix (str, opcional): Prefixo do nome dos pacientes de teste.
+        - dry_run (bool, opcional): Apenas lista, sem excluir (padrão: False).
+
+        Retorno:
+        - list: Pacientes encontrados, cada um com o resultado da exclusão em 'result'.
+        """
+
+        patients = self.list_patients(name_prefix)
+        log_message(f"🔍 {len(patients)} paciente(s) de teste encontrado(s) com o prefixo '{name_prefix}'.")
+
+        if dry_run or not patients:
+            for patient in patients:
+                log_message(f"   {patient['id']}: {patient['name']}")
+            return patients
+
+        results = self.delete_patients(patient["id"] for patient in patients)
+        for patient, result in zip(patients, results):
+            patient["result"] = result
+        return patients
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Retorna o cliente compartilhado do processo, criado na primeira chamada
+    (com URL_API e API_KEY já carregados do .env).
+
+    Retorno:
+    - ApiClient: Cliente com o pool de conexões compartilhado entre as threads.
+    """
+
+    global _client
+
+    with _client_lock:
+        if _client is None or _client.url_api != os.getenv("URL_API") or _client.api_key != os.getenv("API_KEY"):
+            if _client is not None:
+                _client.close()
+            _client = ApiClient()
+        return _client
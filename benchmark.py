@@ -0,0 +1,389 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+from logger import log_message
+from mock_server import start_in_background
+
+
+# Arquivo com o resultado do benchmark
+results_filename = "benchmark_results.json"
+
+# Arquivo com a comparação de carregamento com e sem o perfil de bloqueio
+blocking_results_filename = "blocking_results.json"
+
+# Arquivo com a comparação de memória e CPU entre o Chrome com janela e headless
+headless_results_filename = "headless_results.json"
+
+
+def summarize(samples):
+    """
+    Calcula estatísticas de uma lista de durações.
+
+    Parâmetros:
+    - samples (list): Durações em segundos.
+
+    Retorno:
+    - dict: n, min, mediana, média, máximo e desvio padrão (em segundos).
+    """
+
+    if not samples:
+        return {"n": 0}
+
+    return {
+        "n": len(samples),
+        "min": round(min(samples), 4),
+        "median": round(statistics.median(samples), 4),
+        "mean": round(statistics.mean(samples), 4),
+        "max": round(max(samples), 4),
+        "stdev": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+    }
+
+
+def configure_environment(server):
+    """
+    Aponta o harness para o servidor mock (sobrescreve BASE_URL, URL_API e API_KEY do .env).
+
+    Parâmetros:
+    - server: Servidor retornado por mock_server.start_in_background.
+    """
+
+    os.environ["BASE_URL"] = server.base_url
+    os.environ["URL_API"] = f"{server.base_url}/api/DataPartner/v1/Patient/Delete/"
+    os.environ["API_KEY"] = "mock-api-key"
+    os.environ.setdefault("EMAIL", "benchmark@mock.local")
+    os.environ.setdefault("PASSWORD", "mock")
+
+
+def benchmark_steps(iterations):
+    """
+    Executa o cenário completo contra o servidor mock e mede cada etapa do Action.
+
+    Parâmetros:
+    - iterations (int): Quantidade de execuções completas do cenário.
+
+    Retorno:
+    - dict: Estatísticas de duração por etapa.
+    """
+
+    from action import Action
+
+    samples = {}
+    for iteration in range(1, iterations + 1):
+        log_message(f"🚀 Benchmark de etapas: execução {iteration}/{iterations}")
+        action = Action(patient_name=f"Teste Automatizado Benchmark {iteration:02d}", autorun=False)
+        results = action.run()
+
+        for step, duration in results["steps"].items():
+            samples.setdefault(step, []).append(duration)
+
+    return {step: summarize(values) for step, values in samples.items()}
+
+
+def benchmark_helpers(server, repeats):
+    """
+    Mede os helpers do utils isoladamente, sobre páginas do mock já processadas.
+
+    Parâmetros:
+    - server: Servidor mock em execução.
+    - repeats (int): Quantidade de repetições de cada helper.
+
+    Retorno:
+    - dict: Estatísticas de duração por helper.
+    """
+
+    from action import Action
+    from utils import (extract_data, identify_fields, check_text_on_page, get_number, click_element,
+                       fill_field, expand_and_scan_widgets, wait_text_gone)
+
+    action = Action(autorun=False)
+    action.open_browser()
+    action.Login()
+    driver = action.driver
+
+    # Paciente com arquivos já processados (upload no passado)
+    patient = server.state.create_patient("Teste Automatizado Benchmark Helpers")
+    patient["files"]["exames"] = ["53271_1.jpg", "53271_2.jpg"]
+    patient["files"]["txts"] = ["ehr_well.txt", "teste.txt", "teste_3567.txt"]
+    patient["uploaded_at"] = time.time() - 3600
+    patient_url = f"{server.base_url}/patient/{patient['id']}"
+
+    helpers = [
+        ("extract_data (prontuários)", f"{patient_url}/prontuarios", lambda: extract_data(driver)),
+        ("extract_data (exames)", f"{patient_url}/exames", lambda: extract_data(driver)),
+        ("get_number", f"{patient_url}/exames/enviados",
+         lambda: get_number(driver, "//p/span[1]", 'xpath', 'Benchmark get_number')),
+        ("check_text_on_page (ausente)", f"{patient_url}/exames/enviados",
+         lambda: check_text_on_page(driver, 'Aguardando processamento', timeout=30)),
+        ("wait_text_gone (ausente)", f"{patient_url}/exames/enviados",
+         lambda: wait_text_gone(driver, 'Aguardando processamento', 30)),
+        ("identify_fields", f"{patient_url}/panorama", lambda: identify_fields(driver)),
+        ("expand_and_scan_widgets", f"{patient_url}/panorama", lambda: expand_and_scan_widgets(driver)),
+        ("click_element", f"{server.base_url}/patients",
+         lambda: click_element(driver, "//button[span[contains(., 'Adicionar novo paciente')]]", 'xpath', 'Benchmark click')),
+        ("fill_field", None,
+         lambda: fill_field(driver, "//input[@formcontrolname='name']", 'xpath', 'Benchmark', 'Benchmark fill')),
+    ]
+
+    samples = {}
+    try:
+        for name, url, helper in helpers:
+            for _ in range(repeats):
+                if url:
+                    driver.get(url)
+                start_time = time.perf_counter()
+                helper()
+                samples.setdefault(name, []).append(time.perf_counter() - start_time)
+    finally:
+        driver.quit()
+
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+# Contagem de elementos usados pelos seletores e tempos de carregamento da navegação
+PAGE_PROBE_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const visible = el => { const r = el.getBoundingClientRect(); return r.width > 0 && r.height > 0; };
+return {
+    loadMs: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+    domContentLoadedMs: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+    panels: document.querySelectorAll('mat-expansion-panel-header').length,
+    chips: document.getElementsByClassName('mat-chip').length,
+    icons: Array.from(document.querySelectorAll("img[src*='/assets/icon/']")).filter(visible).length,
+    text: (document.body.innerText || '').length
+};
+"""
+
+# Páginas do paciente medidas com e sem o perfil de bloqueio
+BLOCKING_PAGES = ("panorama", "prontuarios", "exames")
+
+
+def benchmark_blocking(profile="full", repeats=3, patient_id=None):
+    """
+    Mede o carregamento das páginas do paciente (Panorama, Prontuários, Exames) sem bloqueio e
+    com o perfil informado: tempo até o load, tempo até a página ficar ociosa, bytes recebidos,
+    requisições bloqueadas e se os elementos usados pelos seletores continuam presentes.
+
+    Parâmetros:
+    - profile (str, opcional): Perfil de bloqueio comparado com 'off' (padrão: 'full').
+    - repeats (int, opcional): Carregamentos de cada página por perfil (padrão: 3).
+    - patient_id (str, opcional): Paciente existente; se omitido, um paciente é criado pela API
+      com as fixtures e excluído ao final.
+
+    Retorno:
+    - dict: Perfil -> página -> estatísticas.
+    """
+
+    from action import Action, get_base_url
+    from api_client import get_client
+    from fixtures import select_files
+    from network import apply_block_profile
+    from utils import wait_page_settled
+
+    action = Action(autorun=False)
+    action.open_browser()
+    action.Login()
+    driver, capture = action.driver, action.network
+
+    created = None
+    if not patient_id:
+        client = get_client()
+        patient_id = created = client.create_patient("Teste Automatizado Bloqueio")
+        client.upload_files(patient_id, {folder: select_files(folder) for folder in ("exames", "txts")})
+
+    # Sem cache: cada carregamento transfere tudo o que o perfil permite
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+
+    samples = {}
+    try:
+        for _ in range(repeats):
+            for current in ("off", profile):
+                apply_block_profile(driver, current)
+
+                for page in BLOCKING_PAGES:
+                    capture.start()
+                    start_time = time.perf_counter()
+                    driver.get(f"{get_base_url()}/patient/{patient_id}/{page}")
+                    wait_page_settled(driver, 60)
+                    settled = time.perf_counter() - start_time
+
+                    capture.poll()
+                    probe = driver.execute_script(PAGE_PROBE_SCRIPT)
+                    totals = capture.totals()
+
+                    sample = samples.setdefault(current, {}).setdefault(page, {
+                        "load": [], "settled": [], "bytes": [], "requests": [], "blocked": [], "elements": None})
+                    if probe["loadMs"] is not None:
+                        sample["load"].append(probe["loadMs"] / 1000)
+                    sample["settled"].append(settled)
+                    sample["bytes"].append(totals["bytes"])
+                    sample["requests"].append(totals["requests"])
+                    sample["blocked"].append(totals["blocked"])
+                    sample["elements"] = {key: probe[key] for key in ("panels", "chips", "icons", "text")}
+    finally:
+        driver.quit()
+        if created:
+            get_client().delete_patients([created])
+
+    report = {}
+    for current, pages in samples.items():
+        report[current] = {}
+        for page, sample in pages.items():
+            baseline = samples["off"][page]["elements"]
+            # Mesmos painéis, chips e ícones visíveis que sem bloqueio: os seletores continuam válidos
+            selectors_ok = all(sample["elements"][key] == baseline[key] for key in ("panels", "chips", "icons"))
+            report[current][page] = {
+                "load": summarize(sample["load"]),
+                "settled": summarize(sample["settled"]),
+                "bytes": round(statistics.mean(sample["bytes"])),
+                "requests": round(statistics.mean(sample["requests"]), 1),
+                "blocked": round(statistics.mean(sample["blocked"]), 1),
+                "elements": sample["elements"],
+                "selectors_ok": selectors_ok,
+            }
+
+    for page in BLOCKING_PAGES:
+        off, blocked = report["off"][page], report[profile][page]
+        log_message(f"📊 {page:<12} sem bloqueio: {off['settled'].get('median', 0):.2f} s, {off['bytes'] / 1024:.0f} KB | "
+                    f"'{profile}': {blocked['settled'].get('median', 0):.2f} s, {blocked['bytes'] / 1024:.0f} KB, "
+                    f"{blocked['blocked']:.0f} bloqueada(s) | seletores {'✅' if blocked['selectors_ok'] else '❌'}")
+        if not blocked["selectors_ok"]:
+            log_message(f"❌ Elementos diferentes em '{page}': sem bloqueio {off['elements']}, com '{profile}' {blocked['elements']}")
+
+    with open(blocking_results_filename, "w", encoding="utf-8") as results_file:
+        json.dump(report, results_file, ensure_ascii=False, indent=2)
+    log_message(f"✅ Comparação de bloqueio salva em {blocking_results_filename}.")
+
+    return report
+
+
+def benchmark_headless(iterations=2, modes=(False, True)):
+    """
+    Executa o cenário completo com o Chrome com janela e headless e compara a memória e a CPU
+    da sessão do navegador (ver resources.ResourceSampler) e a duração total.
+
+    Parâmetros:
+    - iterations (int, opcional): Execuções por modo (padrão: 2).
+    - modes (tuple, opcional): Modos comparados (False = com janela, True = headless).
+
+    Retorno:
+    - dict: 'headed'/'headless' -> estatísticas de rss_peak_mb, rss_mean_mb, cpu_seconds e duração.
+    """
+
+    from action import Action
+
+    samples = {}
+    for iteration in range(1, iterations + 1):
+        for headless in modes:
+            mode = "headless" if headless else "headed"
+            log_message(f"🚀 Comparação headless: execução {iteration}/{iterations} ({mode})")
+
+            start_time = time.perf_counter()
+            action = Action(patient_name=f"Teste Automatizado Headless {iteration:02d}", autorun=False, headless=headless)
+            results = action.run()
+            duration = time.perf_counter() - start_time
+
+            resources = results.get("browser_resources") or {}
+            sample = samples.setdefault(mode, {"rss_peak_mb": [], "rss_mean_mb": [], "cpu_seconds": [], "duration": []})
+            for key in ("rss_peak_mb", "rss_mean_mb", "cpu_seconds"):
+                if resources.get(key) is not None:
+                    sample[key].append(resources[key])
+            sample["duration"].append(duration)
+
+    report = {mode: {key: summarize(values) for key, values in sample.items()} for mode, sample in samples.items()}
+
+    if "headed" in report and "headless" in report:
+        for key, label in (("rss_peak_mb", "pico de memória (MB)"), ("rss_mean_mb", "memória média (MB)"),
+                           ("cpu_seconds", "CPU (s)"), ("duration", "duração (s)")):
+            headed, headless = report["headed"][key].get("median"), report["headless"][key].get("median")
+            if headed and headless:
+                log_message(f"📊 {label:<22} com janela: {headed:>9.1f} | headless: {headless:>9.1f} "
+                            f"({(1 - headless / headed) * 100:+.0f}% de economia)")
+
+    with open(headless_results_filename, "w", encoding="utf-8") as results_file:
+        json.dump(report, results_file, ensure_ascii=False, indent=2)
+    log_message(f"✅ Comparação headless salva em {headless_results_filename}.")
+
+    return report
+
+
+def print_table(title, stats):
+    """
+    Imprime as estatísticas em formato de tabela.
+    """
+
+    log_message(f"📊 {title}")
+    log_message(f"{'nome':<34} {'n':>3} {'min':>9} {'mediana':>9} {'média':>9} {'max':>9}")
+    for name, values in stats.items():
+        if values["n"]:
+            log_message(f"{name:<34} {values['n']:>3} {values['min']:>9.3f} {values['median']:>9.3f} "
+                        f"{values['mean']:>9.3f} {values['max']:>9.3f}")
+
+
+def run_benchmark(iterations=3, repeats=5, delays=None, steps=True, helpers=True):
+    """
+    Sobe o servidor mock, executa o benchmark e salva o resultado em benchmark_results.json.
+
+    Parâmetros:
+    - iterations (int, opcional): Execuções completas do cenário (padrão: 3).
+    - repeats (int, opcional): Repetições de cada helper (padrão: 5).
+    - delays (dict, opcional): Atrasos simulados do mock (ver mock_server.DEFAULT_DELAYS).
+    - steps (bool, opcional): Mede as etapas do Action (padrão: True).
+    - helpers (bool, opcional): Mede os helpers do utils (padrão: True).
+
+    Retorno:
+    - dict: Estatísticas de etapas e helpers.
+    """
+
+    server = start_in_background(delays=delays)
+    configure_environment(server)
+    log_message(f"🔧 Servidor mock em {server.base_url} (atrasos: {server.state.delays})")
+
+    report = {"base_url": server.base_url, "delays": server.state.delays}
+    try:
+        if steps:
+            report["steps"] = benchmark_steps(iterations)
+            print_table("Etapas do Action (segundos)", report["steps"])
+        if helpers:
+            report["helpers"] = benchmark_helpers(server, repeats)
+            print_table("Helpers do utils (segundos)", report["helpers"])
+    finally:
+        server.shutdown()
+
+    with open(results_filename, "w", encoding="utf-8") as results_file:
+        json.dump(report, results_file, ensure_ascii=False, indent=2)
+    log_message(f"✅ Benchmark salvo em {results_filename}.")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline do harness contra o servidor mock do Voiston.")
+    parser.add_argument("--iterations", type=int, default=3, help="Execuções completas do cenário (padrão: 3)")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetições de cada helper (padrão: 5)")
+    parser.add_argument("--only", choices=["steps", "helpers"], help="Executa apenas uma parte do benchmark")
+    parser.add_argument("--fast", action="store_true", help="Usa o modo rápido de esperas")
+    parser.add_argument("--login-delay", type=float, default=0.5)
+    parser.add_argument("--upload-delay", type=float, default=1)
+    parser.add_argument("--processing-delay", type=float, default=5)
+    parser.add_argument("--exam-processing-delay", type=float, default=5)
+    args = parser.parse_args()
+
+    if args.fast:
+        from utils import set_fast_mode
+        set_fast_mode(True)
+
+    run_benchmark(
+        iterations=args.iterations,
+        repeats=args.repeats,
+        delays={
+            "login": args.login_delay,
+            "upload": args.upload_delay,
+            "processing": args.processing_delay,
+            "exam_processing": args.exam_processing_delay,
+        },
+        steps=args.only in (None, "steps"),
+        helpers=args.only in (None, "helpers"),
+    )
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+
+from logger import log_message
+
+
+# Pasta com o estado de cada execução (um arquivo por cenário: runs/<run_id>.json)
+runs_dir = os.getenv("RUNS_DIR", "runs")
+
+
+def checkpoint_path(checkpoint_id):
+    """
+    Retorna o caminho do arquivo de estado de uma execução.
+    """
+
+    return os.path.join(runs_dir, f"{checkpoint_id}.json")
+
+
+def save_checkpoint(checkpoint_id, state):
+    """
+    Grava o estado de uma execução (paciente, sessão e resultado das etapas).
+
+    Parâmetros:
+    - checkpoint_id (str): Identificador da execução (em geral, o run_id).
+    - state (dict): Estado serializável em JSON.
+
+    Retorno:
+    - str ou None: Caminho do arquivo, ou None em caso de erro.
+    """
+
+    path = checkpoint_path(checkpoint_id)
+    try:
+        os.makedirs(runs_dir, exist_ok=True)
+
+        # Escrita atômica: uma execução interrompida no meio da gravação não corrompe o estado anterior
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(dict(state, saved_at=time.time()), state_file, ensure_ascii=False, indent=2, default=str)
+        os.replace(temp_path, path)
+        return path
+
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível salvar o checkpoint da execução: {e}")
+        return None
+
+
+def load_checkpoint(checkpoint_id):
+    """
+    Lê o estado salvo de uma execução.
+
+    Parâmetros:
+    - checkpoint_id (str): Identificador da execução.
+
+    Retorno:
+    - dict ou None: Estado salvo, ou None se inexistente ou ilegível.
+    """
+
+    path = checkpoint_path(checkpoint_id)
+    if not os.path.exists(path):
+        log_message(f"❌ Checkpoint '{checkpoint_id}' não encontrado em {runs_dir}.")
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as state_file:
+            return json.load(state_file)
+    except Exception as e:
+        log_message(f"❌ Checkpoint '{checkpoint_id}' ilegível: {e}")
+        return None
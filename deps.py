@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import site
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+from logger import log_message
+
+
+# Arquivo com o resultado da última verificação de dependências
+deps_cache_filename = ".deps_cache.json"
+
+_installed_flag = False # Variável global
+
+
+def _base_path():
+    # Ajusta o caminho do requirements.txt corretamente
+    if getattr(sys, 'frozen', False):  # Se estiver rodando como executável do PyInstaller
+        return sys._MEIPASS  # Diretório temporário do PyInstaller
+    return os.path.dirname(os.path.abspath(__file__))  # Diretório do script
+
+
+def normalize_name(name):
+    """
+    Normaliza o nome de um pacote (PEP 503): 'PyAutoGUI' e 'pyautogui' são o mesmo pacote.
+    """
+
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_requirements(requirements_bytes):
+    """
+    Interpreta o conteúdo do requirements.txt, que pode estar em UTF-16 (com BOM) ou UTF-8.
+
+    Parâmetros:
+    - requirements_bytes (bytes): Conteúdo bruto do arquivo.
+
+    Retorno:
+    - dict: Nome normalizado -> versão exigida (None quando não há versão fixada com '==').
+    """
+
+    if requirements_bytes.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = requirements_bytes.decode("utf-16")
+    else:
+        text = requirements_bytes.decode("utf-8-sig")
+
+    required = {}
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+
+        match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(==\s*([^\s;]+))?", line)
+        if match:
+            required[normalize_name(match.group(1))] = match.group(3)
+
+    return required
+
+
+def installed_distributions():
+    """
+    Lista os pacotes instalados no interpretador atual, sem chamar o pip.
+
+    Retorno:
+    - dict: Nome normalizado -> versão instalada.
+    """
+
+    installed = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            installed[normalize_name(name)] = dist.version
+    return installed
+
+
+def find_missing(required, installed):
+    """
+    Compara as dependências exigidas com as instaladas.
+
+    Retorno:
+    - list: Requisitos ausentes ou com versão diferente (ex.: 'selenium==4.27.1').
+    """
+
+    missing = []
+    for name, version in required.items():
+        if name not in installed or (version and installed[name] != version):
+            missing.append(f"{name}=={version}" if version else name)
+    return missing
+
+
+def environment_key(requirements_bytes):
+    """
+    Gera uma assinatura do requirements.txt e do ambiente Python. Se nada mudar
+    (arquivo, interpretador ou pastas de pacotes), a verificação pode ser pulada.
+
+    Retorno:
+    - str: Hash SHA-256 em hexadecimal.
+    """
+
+    digest = hashlib.sha256(requirements_bytes)
+    digest.update(sys.executable.encode("utf-8"))
+    digest.update(sys.version.encode("utf-8"))
+
+    # Instalar ou remover pacotes altera a data de modificação das pastas site-packages
+    site_dirs = list(site.getsitepackages()) + [site.getusersitepackages()]
+    for path in sorted(set(site_dirs)):
+        if os.path.isdir(path):
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            return json.load(cache_file)
+    except Exception:
+        return {}
+
+
+def _write_cache(cache_path, key):
+    try:
+        with open(cache_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"key": key, "checked_at": time.time()}, cache_file)
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível salvar o cache de dependências: {e}")
+
+
+def load_env_file():
+    """
+    Carrega o arquivo .env corretamente, seja no ambiente de desenvolvimento ou no executável.
+
+    Retorno:
+    - Nenhum retorno, apenas carrega as variáveis do .env para o ambiente do sistema.
+    """
+
+    # Determina o diretório base conforme o ambiente de execução
+    if getattr(sys, 'frozen', False):  # Se estiver rodando como executável do PyInstaller
+        base_path = os.path.dirname(sys.executable)  # Obtém o diretório do executável
+        # Define o caminho do arquivo .env dentro da pasta _internal
+        env_path = os.path.join(base_path, "_internal", ".env")
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))  # Obtém o diretório do script Python
+        # Define o caminho do arquivo .env no ambiente de desenvolvimento
+        env_path = os.path.join(base_path, ".env")
+
+    # Verifica se o arquivo .env existe antes de carregá-lo
+    if os.path.exists(env_path):
+        from dotenv import load_dotenv
+
+        log_message(f"✅ Arquivo .env carregado de: {env_path}")
+        load_dotenv(env_path)  # Carrega as variáveis do .env para o ambiente
+    else:
+        log_message("⚠️ Aviso: Arquivo .env não encontrado. Verifique o caminho.")
+
+
+def install_requirements():
+    """
+    Verifica as dependências do requirements.txt e instala as que faltarem.
+
+    A verificação usa importlib.metadata (sem 'pip freeze') e é pulada por completo quando
+    o requirements.txt e o ambiente não mudaram desde a última verificação bem-sucedida.
+    """
+
+    global _installed_flag
+
+    if _installed_flag:
+        log_message("✅ Dependências já instaladas. Iniciando o teste...")
+        return
+    _installed_flag = True
+
+    start_time = time.time()
+
+    if getattr(sys, 'frozen', False):
+        # No executável do PyInstaller as dependências já vêm empacotadas
+        log_message("✅ Executável empacotado: verificação de dependências desnecessária.")
+        return
+
+    base_path = _base_path()
+    requirements_path = os.path.join(base_path, 'requirements.txt')
+
+    if not os.path.exists(requirements_path):
+        log_message(f"❌ Arquivo {requirements_path} não encontrado!")
+        sys.exit(1)
+
+    with open(requirements_path, "rb") as req_file:
+        requirements_bytes = req_file.read()
+
+    cache_path = os.path.join(base_path, deps_cache_filename)
+    key = environment_key(requirements_bytes)
+
+    if _read_cache(cache_path).get("key") == key:
+        execution_time = time.time() - start_time
+        log_message(f"✅ Dependências inalteradas desde a última verificação ({execution_time * 1000:.1f} ms).",
+                    duration=execution_time)
+        return
+
+    log_message("🔍 Verificando dependências...")
+
+    # Identifica os pacotes que ainda não estão instalados (consulta em dicionário, O(n + m))
+    missing_packages = find_missing(read_requirements(requirements_bytes), installed_distributions())
+
+    if not missing_packages:
+        _write_cache(cache_path, key)
+        execution_time = time.time() - start_time
+        log_message(f"✅ Todas as dependências já estão instaladas. Iniciando o teste... ({execution_time:.2f} segundos)",
+                    duration=execution_time)
+        return  # Se tudo estiver instalado, não abre o terminal e inicia o teste imediatamente
+
+    log_message(f"⚙️ Instalando pacotes necessários: {', '.join(missing_packages)}")
+
+    python_cmd = sys.executable  # Usa o Python atual
+    venv_path = os.path.join(base_path, "venv")  # Caminho do ambiente virtual
+    venv_python = os.path.join(venv_path, "Scripts", "python.exe") if os.name == "nt" else os.path.join(venv_path, "bin", "python")
+
+    # Testa se o pip está disponível
+    test_pip_cmd = f"{python_cmd} -m pip --version"
+    result = subprocess.run(test_pip_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Se pip não estiver disponível ou ambiente for restrito, cria um ambiente virtual
+    if b"externally-managed-environment" in result.stderr or not shutil.which("pip"):
+        log_message("⚠️ Ambiente do sistema restringe instalações. Criando ambiente virtual...")
+
+        if not os.path.exists(venv_path):
+            subprocess.run(f"{python_cmd} -m venv {venv_path}", shell=True)
+
+        python_cmd = venv_python  # Passa a usar o Python do ambiente virtual
+        subprocess.run(f"{python_cmd} -m pip install --upgrade pip", shell=True)
+
+    # Comando para instalar as dependências
+    install_cmd = f"{python_cmd} -m pip install -r \"{requirements_path}\""
+
+    # Execução no Windows
+    if os.name == "nt":
+        terminal_cmd = f'start cmd /k "{install_cmd} & timeout /t 2 & exit"'
+    else:  # Linux/macOS
+        terminal_cmd = f'x-terminal-emulator -e "sh -c \'{install_cmd}; sleep 2\'"'
+
+    subprocess.run(terminal_cmd, shell=True)
+
+    log_message("✅ Instalação concluída. Iniciando o teste...")
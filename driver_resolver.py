@@ -0,0 +1,178 @@
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+from logger import log_message
+from tracer import traced
+
+
+# Pasta local com drivers já baixados, organizados por versão principal do Chrome
+driver_cache_dir = os.getenv("DRIVER_CACHE_DIR", ".drivers")
+
+# Caminho do ChromeDriver do sistema (caso seja necessário em sistemas Linux)
+SYSTEM_CHROMEDRIVER = "/usr/bin/chromedriver"
+
+DRIVER_NAME = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+
+# Executáveis do Chrome consultados para descobrir a versão instalada
+CHROME_BINARIES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+def _run_version(command):
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+    except Exception:
+        return None
+    match = re.search(r"(\d+)\.\d+\.\d+\.\d+", output)
+    return match.group(0) if match else None
+
+
+def get_chrome_version():
+    """
+    Descobre a versão do Google Chrome instalado localmente, sem acesso à rede.
+
+    Retorno:
+    - str ou None: Versão completa (ex.: '131.0.6778.85'), ou None se não encontrada.
+    """
+
+    if os.name == "nt":
+        import winreg
+
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                    return winreg.QueryValueEx(key, "version")[0]
+            except OSError:
+                continue
+        return None
+
+    for binary in CHROME_BINARIES:
+        path = binary if os.path.isabs(binary) else shutil.which(binary)
+        if path and os.path.exists(path):
+            version = _run_version([path, "--version"])
+            if version:
+                return version
+
+    return None
+
+
+def get_driver_version(driver_path):
+    """
+    Retorna a versão de um executável do ChromeDriver.
+
+    Parâmetros:
+    - driver_path (str): Caminho do executável.
+
+    Retorno:
+    - str ou None: Versão completa, ou None se não for possível executá-lo.
+    """
+
+    return _run_version([driver_path, "--version"])
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+def find_cached_driver(major):
+    """
+    Procura um ChromeDriver compatível já baixado: primeiro na pasta local do projeto,
+    depois no cache do webdriver_manager (~/.wdm).
+
+    Parâmetros:
+    - major (str): Versão principal do Chrome (ex.: '131').
+
+    Retorno:
+    - str ou None: Caminho do driver encontrado.
+    """
+
+    local_path = os.path.join(driver_cache_dir, major, DRIVER_NAME)
+    if os.path.exists(local_path):
+        return local_path
+
+    wdm_root = os.path.join(os.path.expanduser("~"), ".wdm", "drivers", "chromedriver")
+    candidates = glob.glob(os.path.join(wdm_root, "**", f"{major}.*", "**", DRIVER_NAME), recursive=True)
+    return sorted(candidates)[-1] if candidates else None
+
+
+def store_in_cache(driver_path, major):
+    """
+    Copia um driver para a pasta local de cache, para as próximas execuções.
+
+    Retorno:
+    - str: Caminho do driver em cache.
+    """
+
+    target_dir = os.path.join(driver_cache_dir, major)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, DRIVER_NAME)
+    shutil.copy2(driver_path, target)
+    return target
+
+
+@traced(category="action")
+def resolve_chromedriver(allow_download=True):
+    """
+    Resolve o caminho do ChromeDriver sem acessar a rede no caminho comum:
+    1. versão principal do Chrome instalado;
+    2. driver compatível em cache local (.drivers/<versão> ou ~/.wdm);
+    3. ChromeDriver do sistema.
+    Somente se nada disso existir, baixa com o webdriver_manager e guarda no cache.
+
+    Parâmetros:
+    - allow_download (bool, opcional): Permite o download como último recurso (padrão: True).
+
+    Retorno:
+    - tuple: (caminho do driver ou None, origem, tempo de resolução em segundos).
+    """
+
+    start_time = time.time()
+    chrome_version = get_chrome_version()
+    major = _major(chrome_version)
+    driver_path, source = None, None
+
+    if major:
+        driver_path = find_cached_driver(major)
+        source = "cache" if driver_path else None
+
+    system_driver = SYSTEM_CHROMEDRIVER if os.path.exists(SYSTEM_CHROMEDRIVER) else shutil.which("chromedriver")
+
+    if driver_path is None and system_driver:
+        system_major = _major(get_driver_version(system_driver))
+        if major is None or system_major == major:
+            driver_path, source = system_driver, "sistema"
+        else:
+            log_message(f"⚠️ ChromeDriver do sistema ({system_major}) não corresponde ao Chrome ({major}).")
+
+    if driver_path is None and allow_download:
+        log_message("⚠️ Nenhum ChromeDriver local compatível. Baixando com o webdriver_manager...")
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        try:
+            driver_path, source = ChromeDriverManager().install(), "download"
+            if major:
+                driver_path = store_in_cache(driver_path, major)
+        except Exception as e:
+            log_message(f"❌ Erro ao baixar o ChromeDriver: {e}")
+
+    if driver_path is None and system_driver:
+        # Última opção: usa o driver do sistema mesmo com versão diferente
+        driver_path, source = system_driver, "sistema"
+
+    execution_time = time.time() - start_time
+    log_message(f"⏳ ChromeDriver resolvido ({source or 'não encontrado'}, Chrome {chrome_version or '?'}) "
+                f"em {execution_time:.2f} segundos: {driver_path}", duration=execution_time)
+
+    return driver_path, source, execution_time
+
+
+if __name__ == "__main__":
+    path, origin, elapsed = resolve_chromedriver(allow_download="--offline" not in sys.argv)
+    print(path)
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from logger import log_message
+
+
+# Manifesto das fixtures (hash de conteúdo de cada arquivo e bytes enviados por execução)
+manifest_filename = "manifest.json"
+
+# Pasta com as variantes re-codificadas das imagens (geradas uma vez e reaproveitadas)
+variant_cache_dir = os.getenv("FIXTURE_CACHE_DIR", ".fixture_cache")
+
+# Extensões re-codificadas; os demais arquivos (ex.: prontuários .txt) são enviados como estão
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Quantidade máxima de execuções mantidas no histórico do manifesto
+MAX_RUNS = 200
+
+_manifest_lock = threading.Lock()
+
+
+def _env_int(name):
+    value = os.getenv(name, "").strip()
+    return int(value) if value else None
+
+
+def get_settings():
+    """
+    Lê a configuração do envio de fixtures das variáveis de ambiente.
+
+    Retorno:
+    - dict: 'dedup' (FIXTURE_DEDUP, envia só conteúdo único), 'quality' (FIXTURE_QUALITY, 1-95,
+      qualidade JPEG das variantes) e 'max_side' (FIXTURE_MAX_SIDE, maior lado em pixels).
+      Sem FIXTURE_QUALITY e FIXTURE_MAX_SIDE, os arquivos originais são enviados.
+    """
+
+    return {
+        "dedup": os.getenv("FIXTURE_DEDUP", "0").lower() in ("1", "true", "sim"),
+        "quality": _env_int("FIXTURE_QUALITY"),
+        "max_side": _env_int("FIXTURE_MAX_SIDE"),
+    }
+
+
+def fixtures_root():
+    """
+    Retorna a pasta 'arquivos' com as fixtures, considerando o ambiente de execução.
+    """
+
+    if getattr(sys, 'frozen', False):  # Se for um executável criado com PyInstaller
+        return os.path.join(os.path.dirname(sys.executable), "_internal", "arquivos")
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "arquivos")
+
+
+def list_files(folder):
+    """
+    Lista os arquivos de uma pasta de fixtures (ex.: 'exames', 'txts'), em ordem alfabética.
+
+    Retorno:
+    - list: Caminhos absolutos dos arquivos (vazia se a pasta não existir).
+    """
+
+    folder_path = os.path.join(fixtures_root(), folder)
+    if not os.path.isdir(folder_path):
+        return []
+
+    return sorted(os.path.join(folder_path, file) for file in os.listdir(folder_path)
+                  if os.path.isfile(os.path.join(folder_path, file)))
+
+
+def _manifest_path():
+    return os.path.join(fixtures_root(), manifest_filename)
+
+
+def _read_manifest():
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except Exception:
+        return {"files": {}, "runs": []}
+
+
+def _write_manifest(manifest):
+    path = _manifest_path()
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fixture_file:
+        for chunk in iter(lambda: fixture_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(folders=("exames", "txts")):
+    """
+    Monta (ou atualiza) o manifesto das fixtures com o SHA-256 de cada arquivo e marca as duplicatas.
+    Arquivos com tamanho e data de modificação inalterados não são lidos de novo.
+
+    Parâmetros:
+    - folders (tuple, opcional): Pastas dentro de 'arquivos' (padrão: exames e txts).
+
+    Retorno:
+    - dict: Pasta -> lista de {'name', 'path', 'size', 'sha256', 'duplicate_of'}.
+    """
+
+    with _manifest_lock:
+        manifest = _read_manifest()
+        known = manifest.setdefault("files", {})
+        entries = {}
+        changed = False
+
+        for folder in folders:
+            first_by_hash = {}
+            entries[folder] = []
+
+            for path in list_files(folder):
+                stat = os.stat(path)
+                key = f"{folder}/{os.path.basename(path)}"
+                cached = known.get(key)
+
+                if not cached or cached["size"] != stat.st_size or cached["mtime_ns"] != stat.st_mtime_ns:
+                    cached = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _sha256(path)}
+                    known[key] = cached
+                    changed = True
+
+                entry = {
+                    "name": os.path.basename(path),
+                    "path": path,
+                    "size": cached["size"],
+                    "sha256": cached["sha256"],
+                    "duplicate_of": first_by_hash.get(cached["sha256"]),
+                }
+                first_by_hash.setdefault(cached["sha256"], entry["name"])
+                entries[folder].append(entry)
+
+        if changed:
+            _write_manifest(manifest)
+
+    return entries
+
+
+def _variant_path(entry, quality, max_side):
+    # Uma variante por conteúdo e configuração, mantendo o nome original do arquivo no upload
+    variant = f"q{quality or 'orig'}_m{max_side or 'orig'}"
+    return os.path.abspath(os.path.join(variant_cache_dir, variant, entry["sha256"][:16], entry["name"]))
+
+
+def get_variant(entry, quality=None, max_side=None):
+    """
+    Retorna o caminho de uma versão re-codificada da imagem (gerada uma única vez com o Pillow).
+
+    Parâmetros:
+    - entry (dict): Item do manifesto (ver build_manifest).
+    - quality (int, opcional): Qualidade JPEG (1-95).
+    - max_side (int, opcional): Maior lado da imagem em pixels (sem ampliação).
+
+    Retorno:
+    - str: Caminho da variante, ou o arquivo original se não for imagem ou se o Pillow faltar.
+    """
+
+    if not (quality or max_side) or not entry["name"].lower().endswith(IMAGE_EXTENSIONS):
+        return entry["path"]
+
+    target = _variant_path(entry, quality, max_side)
+    if os.path.exists(target):
+        return target
+
+    try:
+        from PIL import Image
+    except ImportError:
+        log_message("⚠️ Pillow não instalado: enviando as imagens originais.")
+        return entry["path"]
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    with Image.open(entry["path"]) as image:
+        image = image.convert("RGB")
+        if max_side:
+            image.thumbnail((max_side, max_side))  # Mantém a proporção e nunca amplia
+        image.save(temp_path, format="JPEG", quality=quality or 95, optimize=True)
+    os.replace(temp_path, target)
+
+    # Se a variante ficou maior que o original, usa o original (copiado para manter o cache válido)
+    if os.path.getsize(target) >= entry["size"]:
+        shutil.copyfile(entry["path"], target)
+
+    return target
+
+
+def select_files(folder, settings=None):
+    """
+    Escolhe os arquivos a enviar de uma pasta de fixtures, conforme a configuração.
+
+    Parâmetros:
+    - folder (str): Pasta dentro de 'arquivos' (ex.: 'exames').
+    - settings (dict, opcional): Ver get_settings (padrão: variáveis de ambiente).
+
+    Retorno:
+    - list: Caminhos dos arquivos a enviar.
+    """
+
+    settings = settings or get_settings()
+    entries = build_manifest((folder,))[folder]
+
+    if settings["dedup"]:
+        skipped = [entry["name"] for entry in entries if entry["duplicate_of"]]
+        if skipped:
+            log_message(f"♻️ {len(skipped)} arquivo(s) duplicado(s) ignorado(s) em '{folder}': {', '.join(skipped)}")
+        entries = [entry for entry in entries if not entry["duplicate_of"]]
+
+    return [get_variant(entry, settings["quality"], settings["max_side"]) for entry in entries]
+
+
+def record_run(run_id, patient_name, files, setup="ui", settings=None):
+    """
+    Registra no manifesto quantos arquivos e bytes foram enviados em uma execução.
+
+    Parâmetros:
+    - run_id (str): Identificador da execução (logger.run_id).
+    - patient_name (str): Paciente que recebeu os arquivos.
+    - files (dict): Pasta -> lista de caminhos enviados.
+    - setup (str, opcional): Caminho do cadastro ('ui' ou 'api').
+    - settings (dict, opcional): Configuração usada (ver get_settings).
+
+    Retorno:
+    - dict: Registro gravado ({'files', 'bytes', 'bytes_by_folder', ...}).
+    """
+
+    bytes_by_folder = {folder: sum(os.path.getsize(path) for path in paths) for folder, paths in files.items()}
+    record = dict(
+        settings or get_settings(),
+        run_id=run_id,
+        patient_name=patient_name,
+        setup=setup,
+        recorded_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        files=sum(len(paths) for paths in files.values()),
+        bytes=sum(bytes_by_folder.values()),
+        bytes_by_folder=bytes_by_folder,
+    )
+
+    try:
+        with _manifest_lock:
+            manifest = _read_manifest()
+            manifest["runs"] = (manifest.get("runs", []) + [record])[-MAX_RUNS:]
+            _write_manifest(manifest)
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível registrar o envio no manifesto: {e}")
+
+    return record
+
+
+def summarize(settings=None):
+    """
+    Imprime o manifesto: duplicatas e bytes por pasta (originais x configuração atual).
+    """
+
+    settings = settings or get_settings()
+    for folder, entries in build_manifest().items():
+        duplicates = [entry for entry in entries if entry["duplicate_of"]]
+        selected = select_files(folder, settings)
+        original = sum(entry["size"] for entry in entries)
+        sent = sum(os.path.getsize(path) for path in selected)
+
+        log_message(f"📁 {folder}: {len(entries)} arquivo(s), {original / 1024:.0f} KB; "
+                    f"{len(duplicates)} duplicata(s); com a configuração atual: {len(selected)} arquivo(s), "
+                    f"{sent / 1024:.0f} KB ({(1 - sent / original) * 100 if original else 0:.0f}% a menos).")
+        for entry in duplicates:
+            log_message(f"   {entry['name']} = {entry['duplicate_of']} ({entry['sha256'][:12]})")
@@ -0,0 +1,337 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import statistics
+import threading
+import time
+
+import logger
+from logger import log_message
+
+
+# Banco SQLite com o histórico das execuções (uma linha por cenário executado)
+db_filename = os.getenv("HISTORY_DB", "testeAutomatico_history.db")
+
+# Janela da linha de base, mínimo de execuções para comparar, limiar do z-score e variação mínima
+baseline_window = int(os.getenv("HISTORY_WINDOW", 20))
+min_baseline_runs = int(os.getenv("HISTORY_MIN_RUNS", 5))
+z_threshold = float(os.getenv("HISTORY_Z_THRESHOLD", 3.0))
+min_change = float(os.getenv("HISTORY_MIN_CHANGE", 0.10))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    base_url TEXT,
+    setup TEXT,
+    headless INTEGER,
+    patient_name TEXT,
+    results TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_run_id ON runs (run_id);
+CREATE TABLE IF NOT EXISTS steps (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    step TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+"""
+
+# Métricas em que um valor maior é uma piora (as demais são contagens: qualquer variação é sinalizada)
+SLOWER_IS_WORSE = re.compile(r"(_ms|_seconds)$")
+
+_write_lock = threading.Lock()  # Workers paralelos gravam no mesmo banco
+
+
+def is_enabled():
+    """
+    Indica se o histórico está ativo (variável HISTORY_ENABLED, padrão: ativo).
+    """
+
+    return os.getenv("HISTORY_ENABLED", "1").lower() not in ("0", "false", "nao", "não")
+
+
+def connect(path=None):
+    """
+    Abre o banco do histórico, criando as tabelas se necessário.
+
+    Parâmetros:
+    - path (str, opcional): Caminho do banco (padrão: variável HISTORY_DB ou testeAutomatico_history.db).
+
+    Retorno:
+    - sqlite3.Connection: Conexão aberta.
+    """
+
+    connection = sqlite3.connect(path or db_filename, timeout=30)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _number(value):
+    # get_number devolve texto ('12', '1.234'); extract_data já devolve inteiros
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    digits = re.sub(r"\D", "", str(value))
+    return float(digits) if digits else None
+
+
+def percentile(values, p):
+    """
+    Percentil pelo método do posto mais próximo (nearest-rank).
+
+    Parâmetros:
+    - values (list): Amostras.
+    - p (float): Percentil entre 0 e 100.
+
+    Retorno:
+    - float ou None: Valor do percentil, ou None sem amostras.
+    """
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def collect_metrics(results):
+    """
+    Extrai dos resultados do Action as medidas numéricas guardadas no histórico.
+
+    Parâmetros:
+    - results (dict): Resultados do Action.run.
+
+    Retorno:
+    - dict: Nome da métrica -> valor (ex.: 'processing_latency_ms', 'exames.measurements', 'medidas').
+    """
+
+    metrics = {}
+    for name in ("upload_latency_ms", "processing_latency_ms", "upload_files", "upload_bytes", "medidas", "erros"):
+        metrics[name] = _number(results.get(name))
+
+    # Execução retomada: as latências atravessariam a interrupção (ou repetiriam as da execução original)
+    if results.get("resumed_from"):
+        metrics.pop("upload_latency_ms")
+        metrics.pop("processing_latency_ms")
+
+    # Contagens do extract_data nas páginas de Prontuários e Exames
+    for section in ("prontuarios", "exames"):
+        for name, value in (results.get(section) or {}).items():
+            metrics[f"{section}.{name}"] = _number(value)
+
+    # Duração do Login por caminho ('full', 'cache', 'checkpoint'): a sessão reaproveitada leva menos
+    # de 1 s e o login completo dezenas, então cada caminho tem a sua série
+    login_duration = (results.get("steps") or {}).get("Login")
+    if results.get("login") and login_duration is not None:
+        metrics[f"login.{results['login']}_seconds"] = _number(login_duration)
+
+    # Maior duração das esperas por elemento e esperas que esgotaram o orçamento (ver timeouts)
+    for name, value in (results.get("waits") or {}).items():
+        metrics[f"waits.{name}_seconds"] = _number(value)
+    for name in results.get("timeouts_expired") or []:
+        metrics[f"expired.{name}"] = 1.0
+    for name, result in (results.get("step_results") or {}).items():
+        if result.get("status") == "failed":
+            metrics[f"failed.{name}"] = 1.0
+
+    resources = results.get("browser_resources") or {}
+    for name in ("rss_peak_mb", "cpu_seconds"):
+        metrics[f"browser.{name}"] = _number(resources.get(name))
+
+    return {name: value for name, value in metrics.items() if value is not None}
+
+
+def record_run(results, run_id=None, base_url=None, path=None):
+    """
+    Grava no histórico as durações das etapas e as métricas de um cenário executado.
+
+    Parâmetros:
+    - results (dict): Resultados do Action.run.
+    - run_id (str, opcional): Identificador da execução (padrão: logger.run_id).
+    - base_url (str, opcional): Ambiente testado (padrão: variável BASE_URL).
+    - path (str, opcional): Caminho do banco.
+
+    Retorno:
+    - int ou None: ID da linha gravada, ou None se o histórico estiver desativado ou falhar.
+    """
+
+    if not is_enabled():
+        return None
+
+    if base_url is None:
+        from action import get_base_url
+
+        base_url = get_base_url()
+
+    try:
+        with _write_lock:
+            connection = connect(path)
+            try:
+                with connection:
+                    cursor = connection.execute(
+                        "INSERT INTO runs (run_id, recorded_at, base_url, setup, headless, patient_name, results) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (run_id or logger.run_id, time.time(), base_url, results.get("setup"),
+                         int(bool(results.get("headless"))), results.get("patient_name"),
+                         json.dumps(results, ensure_ascii=False, default=str)),
+                    )
+                    row = cursor.lastrowid
+                    connection.executemany("INSERT INTO steps (run, step, duration) VALUES (?, ?, ?)",
+                                           [(row, step, duration) for step, duration in results.get("steps", {}).items()])
+                    connection.executemany("INSERT INTO metrics (run, name, value) VALUES (?, ?, ?)",
+                                           [(row, name, value) for name, value in collect_metrics(results).items()])
+            finally:
+                connection.close()
+    except sqlite3.Error as e:
+        log_message(f"⚠️ Não foi possível gravar o histórico da execução: {e}")
+        return None
+
+    log_message(f"🗄️ Execução gravada no histórico ({db_filename if path is None else path}).")
+    return row
+
+
+def load_series(connection, base_url):
+    """
+    Lê o histórico de um ambiente agrupado por execução (média dos cenários de uma mesma execução).
+
+    Parâmetros:
+    - connection (sqlite3.Connection): Conexão com o banco.
+    - base_url (str): Ambiente testado.
+
+    Retorno:
+    - list: [(run_id, recorded_at, {série: valor})] em ordem cronológica. As séries são
+      'step:<etapa>' (segundos) e 'metric:<nome>'.
+    """
+
+    runs = {}
+    queries = (
+        ("step:", "SELECT r.run_id, MIN(r.recorded_at), s.step, AVG(s.duration) FROM runs r "
+                  "JOIN steps s ON s.run = r.id WHERE r.base_url = ? GROUP BY r.run_id, s.step"),
+        ("metric:", "SELECT r.run_id, MIN(r.recorded_at), m.name, AVG(m.value) FROM runs r "
+                    "JOIN metrics m ON m.run = r.id WHERE r.base_url = ? GROUP BY r.run_id, m.name"),
+    )
+    for prefix, query in queries:
+        for run_id, recorded_at, name, value in connection.execute(query, (base_url,)):
+            entry = runs.setdefault(run_id, [recorded_at, {}])
+            entry[0] = min(entry[0], recorded_at)
+            entry[1][prefix + name] = value
+
+    return sorted(((run_id, recorded_at, values) for run_id, (recorded_at, values) in runs.items()),
+                  key=lambda run: run[1])
+
+
+def compare(run_id=None, base_url=None, window=None, threshold=None, change=None, path=None):
+    """
+    Compara uma execução com a linha de base móvel das execuções anteriores do mesmo ambiente.
+    Uma série é sinalizada quando o z-score passa do limiar e a variação relativa passa do
+    mínimo (evita alarmes em séries quase constantes).
+
+    Parâmetros:
+    - run_id (str, opcional): Execução avaliada (padrão: a mais recente).
+    - base_url (str, opcional): Ambiente (padrão: o da execução avaliada).
+    - window (int, opcional): Execuções anteriores na linha de base (padrão: HISTORY_WINDOW ou 20).
+    - threshold (float, opcional): Limiar do z-score (padrão: HISTORY_Z_THRESHOLD ou 3).
+    - change (float, opcional): Variação relativa mínima (padrão: HISTORY_MIN_CHANGE ou 0.10).
+    - path (str, opcional): Caminho do banco.
+
+    Retorno:
+    - dict ou None: {'run_id', 'base_url', 'baseline_runs', 'series': [...]}, ou None sem histórico.
+    """
+
+    window = window or baseline_window
+    threshold = threshold or z_threshold
+    change = min_change if change is None else change
+
+    connection = connect(path)
+    try:
+        if base_url is None:
+            query = "SELECT base_url FROM runs " + ("WHERE run_id = ? " if run_id else "") + "ORDER BY id DESC LIMIT 1"
+            row = connection.execute(query, (run_id,) if run_id else ()).fetchone()
+            if row is None:
+                return None
+            base_url = row[0]
+        runs = load_series(connection, base_url)
+    finally:
+        connection.close()
+
+    positions = {run[0]: index for index, run in enumerate(runs)}
+    if not runs or (run_id and run_id not in positions):
+        return None
+
+    position = positions[run_id] if run_id else len(runs) - 1
+    latest = runs[position]
+    baseline = runs[max(position - window, 0):position]
+
+    series = []
+    for name, value in sorted(latest[2].items()):
+        history = [run[2][name] for run in baseline if name in run[2]]
+        item = {"name": name, "value": round(value, 3), "baseline_runs": len(history), "status": "ok"}
+        series.append(item)
+
+        if len(history) < min_baseline_runs:
+            item["status"] = "insufficient"
+            continue
+
+        mean = statistics.fmean(history)
+        stdev = statistics.stdev(history)
+        relative = (value - mean) / mean if mean else 0.0
+        if stdev:
+            z = (value - mean) / stdev
+        else:
+            z = 0.0 if value == mean else float("inf") if value > mean else float("-inf")
+        item.update(mean=round(mean, 3), stdev=round(stdev, 3), z=round(z, 2), change=round(relative, 3))
+
+        # Etapas e latências: só o aumento é regressão; contagens: qualquer variação é sinalizada
+        slower_is_worse = name.startswith("step:") or SLOWER_IS_WORSE.search(name)
+        if slower_is_worse:
+            if z >= threshold and relative >= change:
+                item["status"] = "regression"
+            elif z <= -threshold and relative <= -change:
+                item["status"] = "improvement"
+        elif abs(z) >= threshold and abs(relative) >= change:
+            item["status"] = "changed"
+
+    return {"run_id": latest[0], "base_url": base_url, "baseline_runs": len(baseline), "series": series}
+
+
+def print_report(report):
+    """
+    Imprime o relatório de compare em forma de tabela.
+
+    Retorno:
+    - int: Quantidade de regressões encontradas.
+    """
+
+    logger.flush()  # Mensagens de log pendentes saem antes da tabela
+
+    if report is None:
+        print("Nenhuma execução encontrada no histórico.")
+        return 0
+
+    print(f"Execução {report['run_id']} em {report['base_url']} "
+          f"(linha de base: {report['baseline_runs']} execução(ões) anteriores)")
+    print(f"{'série':<42} {'atual':>10} {'média':>10} {'desvio':>9} {'z':>7} {'var.':>7}  estado")
+
+    labels = {"ok": "", "insufficient": "histórico insuficiente", "regression": "❌ regressão",
+              "improvement": "✅ melhora", "changed": "⚠️ alterado"}
+    for item in report["series"]:
+        if "mean" in item:
+            print(f"{item['name']:<42} {item['value']:>10} {item['mean']:>10} {item['stdev']:>9} "
+                  f"{item['z']:>7} {item['change'] * 100:>6.0f}%  {labels[item['status']]}")
+        else:
+            print(f"{item['name']:<42} {item['value']:>10} {'-':>10} {'-':>9} {'-':>7} {'-':>7}  {labels[item['status']]}")
+
+    regressions = [item["name"] for item in report["series"] if item["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regressão(ões) significativa(s): {', '.join(regressions)}")
+    return len(regressions)
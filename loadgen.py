@@ -0,0 +1,326 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from history import percentile
+from logger import log_message, log_context
+from tracer import span
+
+
+# Arquivo com o relatório da geração de carga
+results_filename = "loadgen_results.json"
+
+# Prefixo dos pacientes virtuais (removidos ao final e também pelo 'sweep')
+PATIENT_PREFIX = "Teste Automatizado Carga"
+
+# Estados da API que indicam processamento pendente
+PENDING_STATES = ("empty", "waiting", "processing")
+
+# Textos da interface durante o processamento dos prontuários
+PENDING_TEXTS = ['Aguardando processamento', 'Processando:']
+
+# Tempo máximo para a interface exibir um texto pendente depois de carregada (probe 'browser')
+pending_seen_timeout = 30
+
+
+def latency_stats(values):
+    """
+    Resume latências (segundos): quantidade, p50, p95, p99 e máximo.
+    """
+
+    return {
+        "n": len(values),
+        "p50": round(percentile(values, 50), 2) if values else None,
+        "p95": round(percentile(values, 95), 2) if values else None,
+        "p99": round(percentile(values, 99), 2) if values else None,
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+class BrowserPool:
+    """
+    Sessões headless já autenticadas, reaproveitadas pelos pacientes virtuais para observar
+    os textos de PENDING_TEXTS na página de prontuários.
+    """
+
+    def __init__(self, size):
+        from action import Action
+
+        self.sessions = queue.Queue()
+        self.actions = []
+        for _ in range(size):
+            action = Action(autorun=False, headless=True)
+            action.open_browser()
+            action.Login()
+            self.actions.append(action)
+            self.sessions.put(action)
+
+    def acquire(self):
+        return self.sessions.get()
+
+    def release(self, action):
+        self.sessions.put(action)
+
+    def close(self):
+        for action in self.actions:
+            try:
+                action.driver.quit()
+            except Exception:
+                pass
+
+
+class LoadGenerator:
+    """
+    Gera carga no pipeline de processamento: pacientes virtuais criados e abastecidos com as
+    fixtures pela API, em estágios de taxa crescente (pacientes por minuto). Para cada paciente,
+    mede o tempo do fim do upload até o processamento dos prontuários terminar.
+    """
+
+    def __init__(self, rates, stage_minutes=2.0, probe="api", browsers=2, timeout=600,
+                 poll_interval=1.0, max_in_flight=100, keep=False):
+        """
+        Parâmetros:
+        - rates (list): Pacientes por minuto em cada estágio (ex.: [2, 4, 8]).
+        - stage_minutes (float, opcional): Duração de cada estágio (padrão: 2 minutos).
+        - probe (str, opcional): 'api' consulta o estado pela API; 'browser' observa os textos
+          da interface em sessões headless (padrão: 'api').
+        - browsers (int, opcional): Sessões headless do probe 'browser' (padrão: 2).
+        - timeout (float, opcional): Tempo máximo de processamento por paciente (padrão: 600 s).
+        - poll_interval (float, opcional): Intervalo entre consultas do probe 'api' (padrão: 1 s).
+        - max_in_flight (int, opcional): Limite de pacientes simultâneos (padrão: 100).
+        - keep (bool, opcional): Mantém os pacientes criados (padrão: False, exclui ao final).
+        """
+
+        if not rates or any(rate <= 0 for rate in rates):
+            raise ValueError(f"As taxas da rampa devem ser maiores que zero: {rates}")
+
+        self.rates = rates
+        self.stage_seconds = stage_minutes * 60
+        self.probe = probe
+        self.browsers = browsers
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_in_flight = max_in_flight
+        self.keep = keep
+
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.records = []
+        self.pool = None
+
+    def _wait_api(self, client, patient_id, upload_done):
+        # Consulta o estado até os prontuários saírem de 'waiting'/'processing'
+        while time.time() - upload_done < self.timeout:
+            status = client.patient_status(patient_id)
+            if status.get("docs") not in PENDING_STATES:
+                return time.time()
+            time.sleep(self.poll_interval)
+        return None
+
+    def _wait_browser(self, client, patient_id, upload_done, record):
+        # Mesma verificação do Action.awaiting_processing, em uma sessão headless do pool
+        from action import get_base_url
+        from utils import wait_conditions, wait_page_settled
+
+        # Espera por uma sessão livre: registrada à parte, não é tempo de observação
+        acquire_start = time.time()
+        action = self.pool.acquire()
+        record["acquire_seconds"] = round(time.time() - acquire_start, 3)
+        try:
+            action.driver.get(f"{get_base_url()}/patient/{patient_id}/prontuarios")
+            wait_page_settled(action.driver, 60, selector="mat-expansion-panel-header")
+
+            # 'all_gone' só vale depois de um texto pendente aparecer: logo após a carga a lista
+            # pode ainda não estar renderizada e os textos ausentes dariam latência quase zero
+            remaining = self.timeout - (time.time() - upload_done)
+            seen = wait_conditions(action.driver, [("pendente", "any_present", PENDING_TEXTS)],
+                                   timeout=max(min(remaining, pending_seen_timeout), 0))
+            if seen["met"] != "pendente":
+                if client.patient_status(patient_id).get("docs") not in PENDING_STATES:
+                    # Processado enquanto o paciente esperava uma sessão: o fim não foi observado
+                    record["error"] = "unobserved"
+                    log_message(f"⚠️ Paciente virtual {record['index']} processado antes de ser observado "
+                                f"({record['acquire_seconds']:.1f} s aguardando uma sessão).")
+                else:
+                    # Ainda pendente pela API, mas a interface não exibiu o estado: não é timeout do processamento
+                    record["error"] = "not_rendered"
+                    log_message(f"⚠️ Paciente virtual {record['index']} pendente, mas sem texto de processamento "
+                                f"na interface após {pending_seen_timeout} segundos.")
+                return None
+
+            remaining = self.timeout - (time.time() - upload_done)
+            wait = wait_conditions(action.driver, [("processado", "all_gone", PENDING_TEXTS)], timeout=max(remaining, 0))
+            if wait["met"] != "processado":
+                return None
+            return wait["timestamp"] / 1000 if wait["timestamp"] else time.time()
+        finally:
+            self.pool.release(action)
+
+    def virtual_patient(self, index, stage, rate, files):
+        """
+        Executa um paciente virtual: cadastro e upload pela API, espera do processamento e exclusão.
+
+        Retorno:
+        - dict: Registro do paciente (estágio, concorrência no upload, latências, erro).
+        """
+
+        from api_client import get_client
+
+        log_context.prefix = f"[vp {index:03d}]"
+        client = get_client()
+        record = {"index": index, "stage": stage, "rate": rate, "started": time.time()}
+
+        try:
+            with span("loadgen.patient", category="load", index=index, rate=rate):
+                patient_id = client.create_patient(f"{PATIENT_PREFIX} {index:03d}")
+                record["patient_id"] = patient_id
+
+                upload = client.upload_files(patient_id, files)
+                upload_done = time.time()
+                record["upload_seconds"] = upload["duration"]
+                record["bytes"] = upload["bytes"]
+
+                # Concorrência vista por este paciente: quantos estavam em processamento no fim do upload
+                with self.lock:
+                    self.in_flight += 1
+                    record["concurrency"] = self.in_flight
+
+                try:
+                    if self.probe == "browser":
+                        processed = self._wait_browser(client, patient_id, upload_done, record)
+                    else:
+                        processed = self._wait_api(client, patient_id, upload_done)
+                finally:
+                    with self.lock:
+                        self.in_flight -= 1
+
+                record["finished"] = time.time()
+                if processed is None:
+                    if "error" not in record:
+                        record["error"] = "timeout"
+                        log_message(f"❌ Paciente virtual {index} não processado em {self.timeout} segundos.")
+                else:
+                    record["processing_seconds"] = round(processed - upload_done, 3)
+                    log_message(f"✅ Paciente virtual {index} processado em {record['processing_seconds']:.1f} s "
+                                f"(concorrência {record['concurrency']}).", duration=record["processing_seconds"])
+
+        except Exception as e:
+            record["error"] = str(e)
+            log_message(f"❌ Erro no paciente virtual {index}: {e}")
+
+        finally:
+            log_context.__dict__.clear()
+            with self.lock:
+                self.records.append(record)
+
+        return record
+
+    def run(self):
+        """
+        Executa todos os estágios e devolve o relatório (também salvo em loadgen_results.json).
+
+        Retorno:
+        - dict: Relatório por estágio e por nível de concorrência.
+        """
+
+        from api_client import get_client
+        from fixtures import select_files
+
+        files = {folder: select_files(folder) for folder in ("exames", "txts")}
+        if self.probe == "browser":
+            self.pool = BrowserPool(self.browsers)
+
+        start_time = time.time()
+        index = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="vp") as executor:
+                for stage, rate in enumerate(self.rates, start=1):
+                    log_message(f"📈 Estágio {stage}/{len(self.rates)}: {rate} paciente(s) por minuto "
+                                f"durante {self.stage_seconds / 60:.1f} minuto(s).")
+                    stage_start = time.time()
+                    launches = max(int(rate * self.stage_seconds / 60), 1)
+
+                    for launch in range(launches):
+                        # Chegadas em intervalos regulares dentro do estágio
+                        delay = stage_start + launch * 60 / rate - time.time()
+                        if delay > 0:
+                            time.sleep(delay)
+                        index += 1
+                        executor.submit(self.virtual_patient, index, stage, rate, files)
+
+                    remaining = stage_start + self.stage_seconds - time.time()
+                    if remaining > 0:
+                        time.sleep(remaining)
+
+                log_message("⏳ Todos os pacientes virtuais iniciados. Aguardando o processamento...")
+        finally:
+            if self.pool:
+                self.pool.close()
+
+        if not self.keep:
+            get_client().delete_patients(record["patient_id"] for record in self.records if record.get("patient_id"))
+
+        report = self.report(time.time() - start_time)
+        with open(results_filename, "w", encoding="utf-8") as results_file:
+            json.dump(report, results_file, ensure_ascii=False, indent=2)
+        log_message(f"✅ Relatório de carga salvo em {results_filename}.")
+        return report
+
+    def report(self, duration):
+        """
+        Agrupa os registros por estágio (taxa) e por nível de concorrência.
+
+        Retorno:
+        - dict: {'stages', 'concurrency', 'records', ...}.
+        """
+
+        def group(records):
+            done = [record for record in records if "processing_seconds" in record]
+            window = (max((record["finished"] for record in done), default=0)
+                      - min((record["started"] for record in records), default=0))
+            return {
+                "patients": len(records),
+                "completed": len(done),
+                "errors": len(records) - len(done),
+                # Pacientes concluídos por minuto na janela do grupo
+                "throughput_per_min": round(len(done) / window * 60, 2) if done and window > 0 else 0.0,
+                "processing": latency_stats([record["processing_seconds"] for record in done]),
+                "upload": latency_stats([record["upload_seconds"] for record in records if "upload_seconds" in record]),
+                # Probe 'browser': espera por uma sessão livre e pacientes processados sem observação
+                "acquire": latency_stats([record["acquire_seconds"] for record in records if "acquire_seconds" in record]),
+                "unobserved": sum(1 for record in records if record.get("error") == "unobserved"),
+                "not_rendered": sum(1 for record in records if record.get("error") == "not_rendered"),
+            }
+
+        stages = {}
+        for stage, rate in enumerate(self.rates, start=1):
+            stages[f"{stage}:{rate}/min"] = group([record for record in self.records if record["stage"] == stage])
+
+        levels = sorted({record["concurrency"] for record in self.records if "concurrency" in record})
+        concurrency = {str(level): group([record for record in self.records if record.get("concurrency") == level])
+                       for level in levels}
+
+        log_message(f"📊 {'estágio':<12} {'pac.':>5} {'ok':>4} {'/min':>6} {'p50':>7} {'p95':>7} {'p99':>7}")
+        for name, stats in stages.items():
+            latency = stats["processing"]
+            log_message(f"   {name:<12} {stats['patients']:>5} {stats['completed']:>4} {stats['throughput_per_min']:>6} "
+                        f"{latency['p50'] or '-':>7} {latency['p95'] or '-':>7} {latency['p99'] or '-':>7}")
+
+        log_message(f"📊 {'concorrência':<12} {'pac.':>5} {'p50':>7} {'p95':>7} {'p99':>7}")
+        for level, stats in concurrency.items():
+            latency = stats["processing"]
+            log_message(f"   {level:<12} {stats['patients']:>5} {latency['p50'] or '-':>7} "
+                        f"{latency['p95'] or '-':>7} {latency['p99'] or '-':>7}")
+
+        return {
+            "rates": self.rates,
+            "stage_minutes": self.stage_seconds / 60,
+            "probe": self.probe,
+            "duration": round(duration, 2),
+            "overall": group(self.records),
+            "stages": stages,
+            "concurrency": concurrency,
+            "records": sorted(self.records, key=lambda record: record["index"]),
+        }
@@ -0,0 +1,181 @@
+import atexit
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+# Gera o nome do arquivo de log (uma linha JSON por mensagem)
+log_filename = "testeAutomatico.log"
+
+# Tamanho máximo do arquivo antes da rotação e quantidade de arquivos antigos mantidos
+max_bytes = int(os.getenv("LOG_MAX_BYTES", 5 * 1024 * 1024))
+backup_count = int(os.getenv("LOG_BACKUP_COUNT", 3))
+
+# Eco das mensagens no console (LOG_CONSOLE=0 desativa; o arquivo JSON continua completo)
+console_enabled = os.getenv("LOG_CONSOLE", "1").lower() not in ("0", "false", "nao", "não")
+
+# Identificador desta execução, presente em todas as linhas do log
+run_id = os.getenv("RUN_ID") or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+# Contexto de log por thread: arquivo, prefixo do worker e etapa atual
+log_context = threading.local()
+
+# Substituir emojis por texto alternativo caso a codificação falhe
+replacements = {
+    "✅": "[OK]",
+    "⚠️": "[ALERTA]",
+    "❌": "[ERRO]",
+    "⏳": "[AGUARDANDO]",
+    "🚀": "[INICIANDO]",
+    "🔍": "[VERIFICANDO]",
+    "🔧": "[CONFIGURANDO]"
+}
+_replacements_pattern = re.compile("|".join(re.escape(emoji) for emoji in replacements))
+
+# Nível derivado do emoji da mensagem
+_levels = (("[ERRO]", "error"), ("[ALERTA]", "warning"))
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+_console_encoding = sys.stdout.encoding or "utf-8"
+
+
+def set_run_id(new_run_id):
+    """
+    Define o identificador da execução usado nas próximas mensagens.
+
+    Parâmetros:
+    - new_run_id (str): Novo identificador.
+    """
+
+    global run_id
+    run_id = new_run_id
+
+
+def log_message(message, step=None, duration=None, **fields):
+    """
+    Registra uma mensagem no log e imprime no console sem erros de codificação.
+
+    A escrita em arquivo e no console é feita por uma thread em segundo plano: a chamada apenas
+    coloca a mensagem na fila, sem abrir o arquivo nem esperar o terminal.
+
+    Parâmetros:
+    - message (str): Texto da mensagem.
+    - step (str, opcional): Etapa à qual a mensagem pertence (padrão: etapa atual da thread).
+    - duration (float, opcional): Duração em segundos, quando a mensagem encerra uma ação.
+    - fields: Campos adicionais gravados na linha JSON.
+    """
+
+    message = _replacements_pattern.sub(lambda match: replacements[match.group(0)], message)
+
+    # Prefixo do worker (quando executado pelo runner paralelo)
+    prefix = getattr(log_context, 'prefix', None)
+    console_message = (f"{prefix} {message}" if prefix else message) if console_enabled else None
+
+    level = next((name for tag, name in _levels if message.startswith(tag)), "info")
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "run_id": run_id,
+        "worker": prefix,
+        "step": step or getattr(log_context, 'step', None),
+        "level": level,
+        "message": message,
+    }
+    if duration is not None:
+        record["duration"] = round(duration, 3)
+    record.update(fields)
+
+    _ensure_writer()
+    _queue.put((getattr(log_context, 'log_filename', log_filename), record, console_message))
+
+
+def flush(timeout=5):
+    """
+    Aguarda a thread de escrita gravar (no arquivo e no console) todas as mensagens pendentes.
+
+    Parâmetros:
+    - timeout (float, opcional): Tempo máximo de espera (padrão: 5 segundos).
+    """
+
+    deadline = time.time() + timeout
+    while _queue.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def _ensure_writer():
+    global _writer
+
+    if _writer is not None:
+        return
+
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="log-writer", daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+
+def _rotate(filename):
+    # Renomeia testeAutomatico.log -> .1 -> .2 ... descartando o mais antigo
+    for index in range(backup_count - 1, 0, -1):
+        source = f"{filename}.{index}"
+        if os.path.exists(source):
+            os.replace(source, f"{filename}.{index + 1}")
+    if backup_count > 0:
+        os.replace(filename, f"{filename}.1")
+    else:
+        os.remove(filename)
+
+
+def _write_loop():
+    files = {}  # Arquivos mantidos abertos entre as mensagens
+
+    while True:
+        batch = [_queue.get()]
+
+        # Agrupa tudo o que já estiver na fila em uma única escrita
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Console: uma única escrita por lote, forçada para a codificação do terminal
+        lines = [console_message for _, _, console_message in batch if console_message is not None]
+        if lines:
+            try:
+                text = "\n".join(lines) + "\n"
+                sys.stdout.write(text.encode(_console_encoding, errors='replace').decode(_console_encoding))
+                sys.stdout.flush()
+            except Exception:
+                pass
+
+        try:
+            for filename, record, _ in batch:
+                log_file = files.get(filename)
+                if log_file is None:
+                    log_file = files[filename] = open(filename, "a", encoding="utf-8")
+
+                log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+                if max_bytes and log_file.tell() >= max_bytes:
+                    log_file.close()
+                    _rotate(filename)
+                    files[filename] = open(filename, "a", encoding="utf-8")
+
+            for log_file in files.values():
+                log_file.flush()
+
+        except Exception as e:
+            print(f"[ERRO] Falha ao gravar o log: {e}", file=sys.stderr)
+
+        finally:
+            for _ in batch:
+                _queue.task_done()
@@ -0,0 +1,614 @@
+# Servidor local que imita o Voiston (staging) com os mesmos contratos de DOM usados pelo
+# start.py e pelo utils.py, para medir o harness sem o ruído do ambiente de staging.
+#
+# Uso:
+#     python mock_server.py --port 8765 --processing-delay 20
+#     BASE_URL=http://127.0.0.1:8765 URL_API=http://127.0.0.1:8765/api/DataPartner/v1/Patient/Delete/ python start.py
+#     BASE_URL=... URL_API=... API_KEY=qualquer python start.py run --setup api
+
+import argparse
+import html
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# Atrasos simulados (em segundos), configuráveis por variável de ambiente ou argumento
+DEFAULT_DELAYS = {
+    "login": float(os.getenv("MOCK_LOGIN_DELAY", 2)),
+    "upload": float(os.getenv("MOCK_UPLOAD_DELAY", 3)),
+    "processing": float(os.getenv("MOCK_PROCESSING_DELAY", 10)),
+    "exam_processing": float(os.getenv("MOCK_EXAM_PROCESSING_DELAY", 10)),
+}
+
+# Pacientes processados ao mesmo tempo pelo pipeline simulado (0 = sem limite, sem fila)
+DEFAULT_CAPACITY = int(os.getenv("MOCK_PROCESSING_CAPACITY", 0))
+
+# Mensagens de estado vazio exibidas nos widgets do Panorama
+EMPTY_WIDGETS = [
+    ("Acompanhamento", "Esse paciente não possui um histórico de acompanhamento."),
+    ("Prescrição de óculos", "Nenhuma prescrição de óculos"),
+    ("Refração dinâmica", "Nenhuma refração dinâmica"),
+    ("Auto-tonômetro", "Nenhum exame de auto-tonômetro"),
+]
+FILLED_WIDGETS = ["Medidas", "Medicamentos", "Palavras-chave", "Procedimentos"]
+
+
+APP_JS = r"""
+const $ = (selector, root) => (root || document).querySelector(selector);
+const api = (path, options) => fetch(path, options).then(response => response.json());
+const show = (element) => element.removeAttribute('hidden');
+const hide = (element) => element.setAttribute('hidden', '');
+
+function initLogin(config) {
+    $('.access').addEventListener('click', () => { hide($('.access')); show($('#login-form')); });
+    $('#next').addEventListener('click', async () => {
+        // O texto só existe no DOM enquanto a requisição está em andamento (como no sistema real)
+        const waiting = document.createElement('p');
+        waiting.textContent = 'Aguarde enquanto processamos sua requisição...';
+        document.body.appendChild(waiting);
+        const result = await api('/mock/api/login', {
+            method: 'POST', headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({email: $('#email').value, password: $('#password').value})
+        });
+        setTimeout(() => {
+            localStorage.setItem('voiston_token', result.token);
+            location.href = '/patients';
+        }, config.loginDelay * 1000);
+    });
+}
+
+function initPatients() {
+    $('#new-patient').addEventListener('click', () => show($('#patient-form')));
+    $('#gender').addEventListener('click', () => show($('#gender-options')));
+    document.querySelectorAll('#gender-options span').forEach(option => option.addEventListener('click', () => {
+        $('#gender').setAttribute('data-value', option.textContent);
+        $('#gender .value').textContent = option.textContent;
+        hide($('#gender-options'));
+    }));
+    $('#save-patient').addEventListener('click', async () => {
+        const result = await api('/mock/api/patients', {
+            method: 'POST', headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                name: $('input[formcontrolname=name]').value,
+                birth: $('input[placeholder="DD/MM/AAAA"]').value,
+                gender: $('#gender').getAttribute('data-value')
+            })
+        });
+        location.href = `/patient/${result.id}/panorama`;
+    });
+}
+
+function initUpload(config) {
+    const input = $('input[type=file]');
+    const selected = {exames: [], txts: []};
+    let category = 'exames';
+
+    $('#add-files').addEventListener('click', () => show($('#upload-dialog')));
+    document.querySelectorAll('[data-category]').forEach(button => button.addEventListener('click', () => {
+        category = button.getAttribute('data-category');
+        input.click();
+    }));
+    input.addEventListener('change', () => {
+        for (const file of input.files) { selected[category].push(file); }
+        $('#selected').textContent = `${selected.exames.length} exame(s), ${selected.txts.length} prontuário(s)`;
+        input.value = '';
+    });
+    $('#upload-save').addEventListener('click', async () => {
+        hide($('#upload-dialog'));
+        const sending = document.createElement('p');
+        sending.textContent = 'Enviando arquivos...';
+        $('#status').appendChild(sending);
+        const form = new FormData();
+        for (const [name, files] of Object.entries(selected)) {
+            for (const file of files) { form.append(name, file, file.name); }
+        }
+        await fetch(`/mock/api/patient/${config.patientId}/upload`, {method: 'POST', body: form});
+        sending.remove();
+    });
+}
+
+function initStatusPolling(config) {
+    setInterval(async () => {
+        const status = await api(`/mock/api/patient/${config.patientId}/status`);
+        const list = $('#documents');
+        if (list && status[config.kind] !== list.getAttribute('data-status')) {
+            const response = await fetch(location.pathname + '?fragment=1');
+            list.outerHTML = await response.text();
+        }
+    }, 1000);
+}
+
+function initRefreshButton() {
+    const update = $('#update');
+    if (!update) { return; }
+    update.addEventListener('click', async () => {
+        const bar = document.createElement('mat-progress-bar');
+        bar.className = 'mat-progress-bar-buffer';
+        bar.style.display = 'block';
+        bar.style.height = '4px';
+        document.body.prepend(bar);
+        const response = await fetch(location.pathname + '?fragment=1');
+        $('#documents').outerHTML = await response.text();
+        setTimeout(() => bar.remove(), 200);
+    });
+}
+
+function initPanels() {
+    // Delegação de eventos: vale também para painéis recriados pelo polling de status
+    document.addEventListener('click', (event) => {
+        const header = event.target.closest('mat-expansion-panel-header');
+        if (!header) { return; }
+        const body = header.parentElement.querySelector('.mat-expansion-panel-body');
+        if (header.getAttribute('aria-expanded') === 'true') {
+            header.setAttribute('aria-expanded', 'false');
+            if (body) { hide(body); }
+        } else {
+            header.setAttribute('aria-expanded', 'true');
+            if (body) { setTimeout(() => show(body), 150); }  // Simula a animação de expansão
+        }
+    });
+}
+"""
+
+ICON_SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24"><rect width="24" height="24" fill="#1f6feb"/></svg>'
+
+
+class MockState:
+    """
+    Estado em memória do servidor mock: sessões, pacientes, uploads e exclusões.
+    """
+
+    def __init__(self, delays=None, capacity=None):
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.capacity = DEFAULT_CAPACITY if capacity is None else capacity
+        self.slots = [0.0] * self.capacity  # Horário em que cada vaga do pipeline fica livre
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.patients = {}
+        self.next_id = 1000
+        self.deleted = []
+        self.bytes_received = 0
+
+    def create_patient(self, name, birth="", gender=""):
+        with self.lock:
+            self.next_id += 1
+            patient_id = self.next_id
+            self.patients[patient_id] = {
+                "id": patient_id,
+                "name": name,
+                "birth": birth,
+                "gender": gender,
+                "files": {"exames": [], "txts": []},
+                "uploaded_at": None,
+            }
+        return self.patients[patient_id]
+
+    def status(self, patient):
+        """
+        Calcula o estado de processamento de prontuários ('docs') e exames ('exams').
+        """
+
+        if patient["uploaded_at"] is None:
+            return {"docs": "empty", "exams": "empty", "progress": 0}
+
+        # Com capacidade limitada, o processamento só começa quando uma vaga do pipeline libera
+        elapsed = time.time() - patient.get("processing_start", patient["uploaded_at"])
+        processing = self.delays["processing"]
+
+        if elapsed < processing / 2:
+            docs = "waiting"
+        elif elapsed < processing:
+            docs = "processing"
+        else:
+            docs = "done"
+
+        exams = "done" if elapsed >= self.delays["exam_processing"] else "waiting"
+        progress = min(int(elapsed / processing * 100), 100) if processing else 100
+        return {"docs": docs, "exams": exams, "progress": progress}
+
+    def mark_uploaded(self, patient):
+        """
+        Registra o fim do upload e, com capacidade limitada, coloca o paciente na fila (FIFO).
+        """
+
+        now = time.time()
+        with self.lock:
+            patient["uploaded_at"] = now
+            if self.capacity:
+                slot = min(range(self.capacity), key=lambda index: self.slots[index])
+                start = max(now, self.slots[slot])
+                self.slots[slot] = start + max(self.delays["processing"], self.delays["exam_processing"])
+                patient["processing_start"] = start
+
+
+def _layout(title, body, patient_id=None, script=""):
+    nav = ""
+    if patient_id is not None:
+        nav = (
+            '<nav>'
+            f'<a href="/patient/{patient_id}/panorama"><img src="/assets/icon/VOISTON_ICONS-01.svg" alt="Panorama"></a>'
+            f'<a href="/patient/{patient_id}/prontuarios"><img src="/assets/icon/VOISTON_ICONS-16.svg" alt="Prontuários"></a>'
+            f'<a href="/patient/{patient_id}/exames"><img src="/assets/icon/VOISTON_ICONS-11.svg" alt="Exames"></a>'
+            '</nav>'
+        )
+
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)} - Voiston (mock)</title>'
+        '<style>[hidden]{display:none !important} mat-chip,mat-icon,mat-select{display:inline-block;cursor:pointer}'
+        ' mat-expansion-panel-header{display:block;cursor:pointer} button{margin:4px}</style>'
+        '<script src="/mock/app.js"></script></head>'
+        f'<body>{nav}<main>{body}</main>'
+        f'<script>{script}</script></body></html>'
+    )
+
+
+def _documents_fragment(state, patient, kind):
+    status = state.status(patient)
+    key = "docs" if kind == "docs" else "exams"
+    folder = "txts" if kind == "docs" else "exames"
+    rows = []
+
+    for name in patient["files"][folder]:
+        if status[key] == "waiting":
+            label = "Exame aguardando processamento" if kind == "exams" else "Aguardando processamento"
+        elif status[key] == "processing":
+            label = f"Processando: {status['progress']}%"
+        else:
+            label = "Processado"
+        rows.append(
+            '<mat-expansion-panel>'
+            f'<mat-expansion-panel-header aria-expanded="false">{html.escape(name)}</mat-expansion-panel-header>'
+            f'<div class="mat-expansion-panel-body" hidden><span>{label}</span></div>'
+            f'<div class="row-status">{label}</div>'
+            '</mat-expansion-panel>'
+        )
+
+    if kind == "docs":
+        rows.insert(0, _chips(patient, "docs", status["docs"] == "done"))
+
+    if kind == "exams" and status["exams"] == "done":
+        measures = 4 * len(patient["files"]["exames"])
+        rows.append(f'<p><span>{measures}</span> Medidas encontradas</p><p>Erros: 0</p>')
+
+    if not rows:
+        rows.append('<mat-expansion-panel><mat-expansion-panel-header aria-expanded="false">'
+                    'Nenhum arquivo</mat-expansion-panel-header></mat-expansion-panel>')
+
+    return f'<section id="documents" data-status="{status[key]}">{"".join(rows)}</section>'
+
+
+def _chips(patient, kind, done):
+    if not done:
+        return ""
+
+    exames = len(patient["files"]["exames"])
+    txts = len(patient["files"]["txts"])
+
+    if kind == "docs":
+        values = [
+            ("Quantidade de prescrições encontradas no prontuário", txts),
+            ("Evidências de procedimentos encontradas no prontuário", max(txts - 2, 0)),
+            ("Quantidade de medidas extraídas do prontuário", 3 * txts),
+        ]
+        return "".join(f'<mat-chip class="mat-chip" aria-label="{label}">{value}</mat-chip>' for label, value in values)
+
+    values = [
+        ("Quantidade de medidas extraídas do exame", 4 * exames),
+        ("Quantidade de grupos encontrados no exame", exames // 2),
+    ]
+    return "".join(
+        f'<mat-chip class="mat-chip" aria-label="{label}">Exames<span class="mat-badge-content">{value}</span></mat-chip>'
+        for label, value in values
+    )
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Responde às páginas e endpoints do Voiston simulado.
+    """
+
+    server_version = "VoistonMock/1.0"
+    protocol_version = "HTTP/1.1"  # Mantém a conexão aberta (keep-alive), como o servidor real
+    state = None  # MockState compartilhado, definido em make_server
+
+    def log_message(self, format, *args):
+        pass  # Silencia o log padrão do http.server
+
+    # ---------- utilitários ----------
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8", headers)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _session(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        token = cookie.get("mock_session")
+        return token.value if token and token.value in self.state.sessions else None
+
+    def _patient(self, patient_id):
+        return self.state.patients.get(int(patient_id))
+
+    # ---------- GET ----------
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/") or "/"
+        fragment = "fragment=1" in parsed.query
+
+        if path == "/mock/app.js":
+            return self._send(200, APP_JS, "application/javascript; charset=utf-8")
+
+        if path.startswith("/assets/icon/"):
+            return self._send(200, ICON_SVG, "image/svg+xml")
+
+        if path in ("/", "/user/login"):
+            return self._send(200, self._login_page())
+
+        if path == "/api/DataPartner/v1/Patient/List":
+            if not self.headers.get("apiKey"):
+                return self._json(401, {"error": "apiKey obrigatória"})
+            prefix = parse_qs(parsed.query).get("name", [""])[0]
+            with self.state.lock:
+                patients = [{"id": patient["id"], "name": patient["name"]} for patient in self.state.patients.values()
+                            if patient["name"].startswith(prefix)]
+            return self._json(200, patients)
+
+        match = re.fullmatch(r"/api/DataPartner/v1/Patient/Status/(\d+)", path)
+        if match:
+            if not self.headers.get("apiKey"):
+                return self._json(401, {"error": "apiKey obrigatória"})
+            patient = self._patient(match.group(1))
+            if patient is None:
+                return self._json(404, {"error": "Paciente não encontrado"})
+            return self._json(200, self.state.status(patient))
+
+        match = re.fullmatch(r"/mock/api/patient/(\d+)/status", path)
+        if match and self._patient(match.group(1)):
+            return self._json(200, self.state.status(self._patient(match.group(1))))
+
+        # As demais páginas exigem sessão autenticada
+        if not self._session():
+            return self._send(302, "", headers={"Location": "/user/login"})
+
+        if path == "/patients":
+            return self._send(200, self._patients_page())
+
+        match = re.fullmatch(r"/patient/(\d+)/(panorama|prontuarios|exames|exames/enviados)", path)
+        if match and self._patient(match.group(1)):
+            patient = self._patient(match.group(1))
+            page = match.group(2)
+
+            if fragment:
+                kind = "docs" if page == "prontuarios" else "exams"
+                return self._send(200, _documents_fragment(self.state, patient, kind))
+
+            return self._send(200, self._patient_page(patient, page))
+
+        self._send(404, _layout("Não encontrado", "<p>Página não encontrada</p>"))
+
+    # ---------- POST / DELETE ----------
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip("/")
+
+        if path == "/mock/api/login":
+            self._read_body()
+            token = uuid.uuid4().hex
+            self.state.sessions.add(token)
+            return self._json(200, {"token": token}, {"Set-Cookie": f"mock_session={token}; Path=/"})
+
+        if path == "/mock/api/patients":
+            payload = json.loads(self._read_body() or b"{}")
+            patient = self.state.create_patient(payload.get("name", ""), payload.get("birth", ""), payload.get("gender", ""))
+            return self._json(200, {"id": patient["id"]})
+
+        # Endpoints do DataPartner (usados pelo setup via API)
+        if path.startswith("/api/DataPartner/") and not self.headers.get("apiKey"):
+            self._read_body()
+            return self._json(401, {"error": "apiKey obrigatória"})
+
+        if path == "/api/DataPartner/v1/Patient/Create":
+            payload = json.loads(self._read_body() or b"{}")
+            patient = self.state.create_patient(payload.get("name", ""), payload.get("birthDate", ""), payload.get("gender", ""))
+            return self._json(200, {"id": patient["id"]})
+
+        match = (re.fullmatch(r"/mock/api/patient/(\d+)/upload", path)
+                 or re.fullmatch(r"/api/DataPartner/v1/Patient/Upload/(\d+)", path))
+        if match and self._patient(match.group(1)):
+            body = self._read_body()
+            patient = self._patient(match.group(1))
+            self._store_files(patient, body)
+            time.sleep(self.state.delays["upload"])  # Simula o tempo de envio/armazenamento
+            self.state.mark_uploaded(patient)
+            return self._json(200, {"ok": True, "bytes": len(body)})
+
+        self._read_body()  # Consome o corpo para manter a conexão reutilizável
+        self._json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        path = urlparse(self.path).path.rstrip("/")
+
+        match = re.fullmatch(r"/api/DataPartner/v1/Patient/Delete/(\d+)", path)
+        if match:
+            if not self.headers.get("apiKey"):
+                return self._json(401, {"error": "apiKey obrigatória"})
+
+            with self.state.lock:
+                patient = self.state.patients.pop(int(match.group(1)), None)
+            if patient is None:
+                return self._json(404, {"error": "Paciente não encontrado"})
+
+            self.state.deleted.append(patient["id"])
+            return self._json(200, {"deleted": patient["id"]})
+
+        self._json(404, {"error": "not found"})
+
+    def _store_files(self, patient, body):
+        # Lê apenas os cabeçalhos das partes multipart (campo e nome do arquivo)
+        self.state.bytes_received += len(body)
+        for field, filename in re.findall(rb'name="([^"]+)"; filename="([^"]*)"', body):
+            folder = field.decode("utf-8", "replace")
+            if folder in patient["files"]:
+                patient["files"][folder].append(filename.decode("utf-8", "replace"))
+
+    # ---------- páginas ----------
+
+    def _login_page(self):
+        body = (
+            '<button class="access">Acessar</button>'
+            '<form id="login-form" hidden onsubmit="return false">'
+            '<input id="email" type="email"><input id="password" type="password">'
+            '<button id="next" type="button">Entrar</button></form>'
+        )
+        return _layout("Login", body, script=f"initLogin({{loginDelay: {self.state.delays['login']}}});")
+
+    def _patients_page(self):
+        rows = "".join(
+            f'<li><a href="/patient/{patient["id"]}/panorama"><span>{html.escape(patient["name"])}</span></a></li>'
+            for patient in self.state.patients.values()
+        )
+        body = (
+            '<button id="new-patient"><span>Adicionar novo paciente</span></button>'
+            f'<ul>{rows}</ul>'
+            '<form id="patient-form" hidden onsubmit="return false">'
+            '<input formcontrolname="name"><input placeholder="DD/MM/AAAA">'
+            '<mat-select id="gender" formcontrolname="gender"><span class="value">Gênero</span></mat-select>'
+            '<div id="gender-options" hidden><span>Feminino</span> <span>Masculino</span></div>'
+            '<button id="save-patient" type="button"><span>Salvar</span></button></form>'
+        )
+        return _layout("Pacientes", body, script="initPatients();")
+
+    def _patient_page(self, patient, page):
+        patient_id = patient["id"]
+        status = self.state.status(patient)
+        config = f"{{patientId: {patient_id}, kind: '{'docs' if page == 'prontuarios' else 'exams'}'}}"
+        header = f'<h1>{html.escape(patient["name"])}</h1><div id="status"></div>'
+
+        if page == "panorama":
+            panels = []
+            for index, (title, message) in enumerate(EMPTY_WIDGETS):
+                panels.append(self._widget(title, f"<p>{message}</p>", expanded=index % 2 == 0))
+            for title in FILLED_WIDGETS:
+                panels.append(self._widget(title, f"<p>{title}: dados disponíveis</p>", expanded=False))
+            upload = (
+                '<button id="add-files" mattooltip="Adicionar exames, prontuários">+</button>'
+                '<div id="upload-dialog" hidden>'
+                '<button data-category="exames"><span>Clique para enviar Exames</span></button>'
+                '<button data-category="txts"><span>Clique para enviar Prontuários</span></button>'
+                '<input type="file" accept="image/*,.pdf,.zip" multiple hidden>'
+                '<span id="selected"></span>'
+                '<button id="upload-save"><span>Salvar</span></button></div>'
+            )
+            body = header + upload + "".join(panels)
+            return _layout("Panorama", body, patient_id, f"initUpload({config}); initPanels();")
+
+        if page == "prontuarios":
+            body = header + _documents_fragment(self.state, patient, "docs")
+            return _layout("Prontuários", body, patient_id, f"initStatusPolling({config}); initPanels();")
+
+        if page == "exames":
+            body = (
+                header
+                + f'<a href="/patient/{patient_id}/exames/enviados"><mat-icon>cloud_download</mat-icon></a>'
+                + _chips(patient, "exams", status["exams"] == "done")
+                + '<mat-expansion-panel><mat-expansion-panel-header aria-expanded="false">Exames'
+                  '</mat-expansion-panel-header></mat-expansion-panel>'
+            )
+            return _layout("Exames", body, patient_id, "initPanels();")
+
+        body = header + '<mat-icon id="update">update</mat-icon>' + _documents_fragment(self.state, patient, "exams")
+        return _layout("Exames enviados", body, patient_id, f"initRefreshButton(); initStatusPolling({config}); initPanels();")
+
+    @staticmethod
+    def _widget(title, content, expanded):
+        return (
+            '<mat-expansion-panel>'
+            f'<mat-expansion-panel-header aria-expanded="{str(expanded).lower()}">{html.escape(title)}</mat-expansion-panel-header>'
+            f'<div class="mat-expansion-panel-body"{"" if expanded else " hidden"}>'
+            f'<mat-card><mat-card-content>{content}</mat-card-content></mat-card></div>'
+            '</mat-expansion-panel>'
+        )
+
+
+def make_server(host="127.0.0.1", port=0, delays=None, capacity=None):
+    """
+    Cria o servidor mock (sem iniciá-lo).
+
+    Parâmetros:
+    - host (str, opcional): Endereço de escuta (padrão: 127.0.0.1).
+    - port (int, opcional): Porta de escuta; 0 escolhe uma porta livre (padrão: 0).
+    - delays (dict, opcional): Atrasos simulados ('login', 'upload', 'processing', 'exam_processing').
+    - capacity (int, opcional): Pacientes processados em paralelo (padrão: MOCK_PROCESSING_CAPACITY ou 0, sem limite).
+
+    Retorno:
+    - ThreadingHTTPServer: Servidor com o atributo 'state' (MockState) e 'base_url'.
+    """
+
+    state = MockState(delays, capacity)
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def start_in_background(host="127.0.0.1", port=0, delays=None, capacity=None):
+    """
+    Inicia o servidor mock em uma thread em segundo plano.
+
+    Retorno:
+    - ThreadingHTTPServer: Servidor em execução (use server.shutdown() para encerrar).
+    """
+
+    server = make_server(host, port, delays, capacity)
+    threading.Thread(target=server.serve_forever, name="mock-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que simula o Voiston para testes offline.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--login-delay", type=float, default=DEFAULT_DELAYS["login"])
+    parser.add_argument("--upload-delay", type=float, default=DEFAULT_DELAYS["upload"])
+    parser.add_argument("--processing-delay", type=float, default=DEFAULT_DELAYS["processing"])
+    parser.add_argument("--exam-processing-delay", type=float, default=DEFAULT_DELAYS["exam_processing"])
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, {
+        "login": args.login_delay,
+        "upload": args.upload_delay,
+        "processing": args.processing_delay,
+        "exam_processing": args.exam_processing_delay,
+    }, args.capacity)
+    print(f"Servidor mock do Voiston em {server.base_url}")
+    print(f"  BASE_URL={server.base_url}")
+    print(f"  URL_API={server.base_url}/api/DataPartner/v1/Patient/Delete/")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
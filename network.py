@@ -0,0 +1,302 @@
+import json
+import os
+import threading
+
+from logger import log_message
+
+
+# Métodos HTTP considerados envio de arquivos
+UPLOAD_METHODS = ("POST", "PUT", "PATCH")
+
+# Tamanho mínimo do corpo (bytes) para uma requisição entrar no relatório de upload
+min_upload_bytes = int(os.getenv("NETWORK_MIN_UPLOAD_BYTES", 1024))
+
+
+# Domínios de análise de uso, rastreamento e chat
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*",
+    "*clarity.ms*", "*facebook.net*", "*intercom.io*", "*segment.io*", "*mixpanel.com*",
+]
+
+# Perfis de bloqueio de recursos (padrões do Network.setBlockedURLs, '*' como curinga).
+# Os ícones SVG em /assets/icon/ nunca são bloqueados: os seletores clicam nessas imagens.
+BLOCK_PROFILES = {
+    "off": [],
+    "light": TRACKER_PATTERNS,
+    # Também fontes e imagens raster (o harness lê apenas texto do DOM e badges dos mat-chip)
+    "full": TRACKER_PATTERNS + [
+        "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+    ],
+}
+
+
+def get_block_profile(profile=None):
+    """
+    Retorna o nome do perfil de bloqueio em uso (padrão: variável BLOCK_PROFILE ou 'off').
+    """
+
+    return (profile or os.getenv("BLOCK_PROFILE", "off")).lower()
+
+
+def get_block_patterns(profile=None):
+    """
+    Retorna os padrões de URL bloqueados de um perfil, mais os extras da variável BLOCK_URLS
+    (separados por vírgula).
+
+    Parâmetros:
+    - profile (str, opcional): 'off', 'light' ou 'full' (padrão: variável BLOCK_PROFILE ou 'off').
+
+    Retorno:
+    - list: Padrões de URL.
+    """
+
+    profile = get_block_profile(profile)
+    if profile not in BLOCK_PROFILES:
+        log_message(f"⚠️ Perfil de bloqueio '{profile}' desconhecido. Nenhum recurso será bloqueado.")
+        profile = "off"
+
+    extra = [pattern.strip() for pattern in os.getenv("BLOCK_URLS", "").split(",") if pattern.strip()]
+    return BLOCK_PROFILES[profile] + (extra if profile != "off" else [])
+
+
+def apply_block_profile(driver, profile=None):
+    """
+    Aplica (ou remove, com 'off') o perfil de bloqueio no navegador via DevTools.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver (Chrome).
+    - profile (str, opcional): Nome do perfil (ver get_block_patterns).
+
+    Retorno:
+    - list: Padrões aplicados (vazia se nada foi bloqueado ou em caso de erro).
+    """
+
+    patterns = get_block_patterns(profile)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível aplicar o perfil de bloqueio: {e}")
+        return []
+
+    if patterns:
+        log_message(f"🚫 Perfil de bloqueio '{get_block_profile(profile)}' aplicado ({len(patterns)} padrão(ões)).")
+    return patterns
+
+
+def enable_performance_log(options):
+    """
+    Ativa o log de desempenho do Chrome com os eventos de rede do DevTools (Network.*),
+    lidos depois com driver.get_log('performance').
+
+    Parâmetros:
+    - options (ChromeOptions): Opções do Chrome antes de iniciar o WebDriver.
+    """
+
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def _header(headers, name):
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+class NetworkCapture:
+    """
+    Acumula os eventos de rede do DevTools de uma janela de tempo (ex.: do envio dos arquivos
+    até o fim do upload) e calcula, por requisição de upload, tamanho, TTFB, tempo de envio,
+    tempo do servidor e vazão.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.requests = {}
+        self.lock = threading.Lock()
+        self.available = True
+
+    def start(self):
+        """
+        Descarta os eventos anteriores; a janela de captura começa agora.
+        """
+
+        self.requests = {}
+        self._read_log()
+
+    def _read_log(self):
+        # get_log esvazia o buffer do ChromeDriver a cada chamada
+        try:
+            return self.driver.get_log("performance")
+        except Exception as e:
+            if self.available:
+                log_message(f"⚠️ Log de desempenho indisponível (eventos de rede não serão medidos): {e}")
+            self.available = False
+            return []
+
+    def poll(self):
+        """
+        Lê os eventos de rede acumulados desde a última leitura.
+
+        Retorno:
+        - int: Quantidade de eventos de rede processados.
+        """
+
+        count = 0
+        with self.lock:
+            for entry in self._read_log():
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, ValueError):
+                    continue
+
+                method = message.get("method", "")
+                if not method.startswith("Network."):
+                    continue
+
+                params = message.get("params", {})
+                request_id = params.get("requestId")
+                if not request_id:
+                    continue
+
+                count += 1
+                item = self.requests.setdefault(request_id, {})
+
+                if method == "Network.requestWillBeSent":
+                    request = params.get("request", {})
+                    item.update(url=request.get("url"), method=request.get("method"),
+                                headers=request.get("headers", {}), post_data=request.get("postData"),
+                                has_post_data=request.get("hasPostData", False),
+                                started=params.get("timestamp"), wall_time=params.get("wallTime"))
+                elif method == "Network.requestWillBeSentExtraInfo":
+                    item.setdefault("extra_headers", {}).update(params.get("headers", {}))
+                elif method == "Network.responseReceived":
+                    response = params.get("response", {})
+                    item.update(status=response.get("status"), timing=response.get("timing"))
+                elif method == "Network.loadingFinished":
+                    item.update(finished=params.get("timestamp"), response_bytes=params.get("encodedDataLength"))
+                elif method == "Network.loadingFailed":
+                    item.update(finished=params.get("timestamp"), error=params.get("errorText"),
+                                blocked=params.get("blockedReason"))
+
+        return count
+
+    def upload_requests(self):
+        """
+        Calcula as métricas de cada requisição de upload capturada.
+
+        Retorno:
+        - list: Dicionários com url, status, request_bytes, ttfb_ms (início do envio até o primeiro
+          byte da resposta), upload_ms (envio do corpo), server_ms (fim do envio até o primeiro byte),
+          total_ms e throughput_mbps (MB/s do envio), em ordem de início.
+        """
+
+        uploads = []
+        for item in self.requests.values():
+            if item.get("method") not in UPLOAD_METHODS:
+                continue
+
+            size = _header(item.get("extra_headers"), "Content-Length") or _header(item.get("headers"), "Content-Length")
+            request_bytes = int(size) if size else len((item.get("post_data") or "").encode("utf-8"))
+            if request_bytes < min_upload_bytes:
+                continue
+
+            # Tempos do Chrome em ms, relativos a timing.requestTime
+            timing = item.get("timing") or {}
+            send_start, send_end = timing.get("sendStart", -1), timing.get("sendEnd", -1)
+            headers_end = timing.get("receiveHeadersEnd", -1)
+
+            upload_ms = send_end - send_start if send_start >= 0 and send_end >= 0 else None
+            server_ms = headers_end - send_end if headers_end >= 0 and send_end >= 0 else None
+            ttfb_ms = headers_end - send_start if headers_end >= 0 and send_start >= 0 else None
+            total_ms = (item["finished"] - item["started"]) * 1000 if item.get("finished") and item.get("started") else None
+
+            uploads.append({
+                "url": item.get("url"),
+                "method": item.get("method"),
+                "status": item.get("status"),
+                "error": item.get("error"),
+                "request_bytes": request_bytes,
+                "ttfb_ms": round(ttfb_ms, 1) if ttfb_ms is not None else None,
+                "upload_ms": round(upload_ms, 1) if upload_ms is not None else None,
+                "server_ms": round(server_ms, 1) if server_ms is not None else None,
+                "total_ms": round(total_ms, 1) if total_ms is not None else None,
+                "throughput_mbps": round(request_bytes / upload_ms / 1000, 3) if upload_ms else None,
+                "started": item.get("started"),
+                "wall_time": item.get("wall_time"),
+                "finished": item.get("finished"),
+            })
+
+        return sorted(uploads, key=lambda upload: upload["started"] or 0)
+
+    def totals(self):
+        """
+        Totaliza todas as requisições capturadas na janela (não apenas os uploads).
+
+        Retorno:
+        - dict: {'requests', 'bytes' (recebidos, comprimidos), 'blocked', 'failed'}.
+        """
+
+        items = list(self.requests.values())
+        return {
+            "requests": sum(1 for item in items if item.get("url")),
+            "bytes": sum(item.get("response_bytes") or 0 for item in items),
+            "blocked": sum(1 for item in items if item.get("blocked")),
+            "failed": sum(1 for item in items if item.get("error") and not item.get("blocked")),
+        }
+
+    def summary(self, ui_wait_ms=None):
+        """
+        Resume os uploads da janela: bytes, tempo de rede, tempo do servidor e vazão efetiva.
+
+        Parâmetros:
+        - ui_wait_ms (float, opcional): Tempo total que a interface levou (ex.: latência do upload);
+          a diferença para o tempo de rede é atribuída à interface.
+
+        Retorno:
+        - dict: {'requests', 'bytes', 'network_ms', 'upload_ms', 'server_ms', 'throughput_mbps', 'ui_ms', 'uploads'}.
+        """
+
+        uploads = self.upload_requests()
+        result = {"requests": len(uploads), "bytes": sum(upload["request_bytes"] for upload in uploads), "uploads": uploads}
+        if not uploads:
+            return result
+
+        # Janela de rede: do início do primeiro upload ao fim do último (requisições paralelas se sobrepõem)
+        starts = [upload["started"] for upload in uploads if upload["started"]]
+        ends = [upload["finished"] for upload in uploads if upload["finished"]]
+        network_ms = (max(ends) - min(starts)) * 1000 if starts and ends else None
+
+        result.update(
+            network_ms=round(network_ms, 1) if network_ms is not None else None,
+            upload_ms=round(sum(upload["upload_ms"] or 0 for upload in uploads), 1),
+            server_ms=round(sum(upload["server_ms"] or 0 for upload in uploads), 1),
+            throughput_mbps=round(result["bytes"] / network_ms / 1000, 3) if network_ms else None,
+        )
+        if ui_wait_ms is not None and network_ms is not None:
+            result["ui_ms"] = round(max(ui_wait_ms - network_ms, 0), 1)
+
+        return result
+
+
+def log_summary(summary):
+    """
+    Registra no log o resumo dos uploads e cada requisição medida.
+    """
+
+    if not summary.get("requests"):
+        log_message("⚠️ Nenhuma requisição de upload capturada nos eventos de rede.")
+        return
+
+    log_message(f"📡 {summary['requests']} requisição(ões) de upload, {summary['bytes'] / 1024 / 1024:.2f} MB "
+                f"em {(summary['network_ms'] or 0) / 1000:.2f} s ({summary['throughput_mbps'] or 0:.2f} MB/s): "
+                f"envio {summary['upload_ms'] / 1000:.2f} s, servidor {summary['server_ms'] / 1000:.2f} s"
+                + (f", interface {summary['ui_ms'] / 1000:.2f} s." if "ui_ms" in summary else "."),
+                **{key: value for key, value in summary.items() if key != "uploads"})
+
+    for upload in summary["uploads"]:
+        log_message(f"   {upload['method']} {upload['url']} [{upload['status'] or upload['error']}] "
+                    f"{upload['request_bytes'] / 1024:.0f} KB, TTFB {upload['ttfb_ms']} ms, envio {upload['upload_ms']} ms, "
+                    f"servidor {upload['server_ms']} ms, {upload['throughput_mbps']} MB/s")
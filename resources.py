@@ -0,0 +1,111 @@
+import threading
+import time
+
+from logger import log_message
+
+
+# Intervalo entre as amostras de memória (segundos)
+SAMPLE_INTERVAL = 1.0
+
+
+def browser_processes(driver):
+    """
+    Retorna os processos da sessão do navegador: o ChromeDriver e todos os processos do Chrome
+    que ele iniciou (navegador, renderizadores, GPU, utilitários).
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+
+    Retorno:
+    - list: Processos psutil (vazia se o psutil não estiver instalado).
+    """
+
+    try:
+        import psutil
+    except ImportError:
+        return []
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        return [root] + root.children(recursive=True)
+    except Exception:
+        return []
+
+
+class ResourceSampler:
+    """
+    Amostra em segundo plano a memória (RSS) da sessão do navegador e, ao final, soma o tempo
+    de CPU gasto por todos os seus processos.
+    """
+
+    def __init__(self, driver, interval=SAMPLE_INTERVAL):
+        self.driver = driver
+        self.interval = interval
+        self.samples = []
+        self.cpu = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started = None
+
+    def _sample(self):
+        total = 0
+        for process in browser_processes(self.driver):
+            try:
+                total += process.memory_info().rss
+                times = process.cpu_times()
+                # Guarda o último tempo de CPU de cada processo (processos encerrados mantêm o valor)
+                self.cpu[process.pid] = times.user + times.system
+            except Exception:
+                continue
+        if total:
+            self.samples.append(total)
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """
+        Inicia a amostragem. Sem psutil, não faz nada.
+        """
+
+        if not browser_processes(self.driver):
+            log_message("⚠️ psutil indisponível ou navegador sem processo local: memória e CPU não serão medidas.")
+            return self
+
+        self.started = time.time()
+        self._sample()
+        self.thread = threading.Thread(target=self._loop, name="resource-sampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Encerra a amostragem (chame antes de driver.quit()).
+
+        Retorno:
+        - dict ou None: {'processes', 'rss_peak_mb', 'rss_mean_mb', 'cpu_seconds', 'wall_seconds',
+          'cpu_percent'}, ou None se nada foi medido.
+        """
+
+        if self.thread is None:
+            return None
+
+        self.stop_event.set()
+        self.thread.join()
+        self._sample()
+
+        wall = time.time() - self.started
+        cpu_seconds = sum(self.cpu.values())
+        result = {
+            "processes": len(self.cpu),
+            "rss_peak_mb": round(max(self.samples) / 1024 / 1024, 1) if self.samples else None,
+            "rss_mean_mb": round(sum(self.samples) / len(self.samples) / 1024 / 1024, 1) if self.samples else None,
+            "cpu_seconds": round(cpu_seconds, 2),
+            "wall_seconds": round(wall, 2),
+            "cpu_percent": round(cpu_seconds / wall * 100, 1) if wall else None,
+        }
+        log_message(f"🧮 Navegador: pico de {result['rss_peak_mb']} MB, média de {result['rss_mean_mb']} MB, "
+                    f"{result['cpu_seconds']:.1f} s de CPU ({result['cpu_percent']}% de um núcleo) "
+                    f"em {result['processes']} processo(s).", **result)
+        return result
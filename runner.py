@@ -0,0 +1,111 @@
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import logger
+from action import Action
+from logger import log_message, log_context
+
+
+# Arquivo com o resumo da execução paralela
+results_filename = "resultadosParalelos.json"
+
+
+def run_worker(index, patient_prefix="Teste Automatizado"):
+    """
+    Executa um cenário completo (login → cadastro → upload → processamento → exclusão)
+    em uma sessão do Chrome independente.
+
+    Parâmetros:
+    - index (int): Número do cenário, usado no nome do paciente e no arquivo de log.
+    - patient_prefix (str, opcional): Prefixo do nome do paciente cadastrado.
+
+    Retorno:
+    - dict: Resultado do cenário (status, duração, etapas e dados extraídos).
+    """
+
+    # Cada cenário escreve no seu próprio arquivo de log
+    log_context.log_filename = f"testeAutomatico_worker{index:02d}.log"
+    log_context.prefix = f"[worker {index:02d}]"
+
+    start_time = time.time()
+    patient_name = f"{patient_prefix} {index:02d}"
+    result = {"worker": index, "patient_name": patient_name, "log_file": log_context.log_filename}
+
+    try:
+        log_message(f"🚀 Iniciando cenário do paciente '{patient_name}'...")
+        action = Action(patient_name=patient_name, exclusive=False, checkpoint_id=f"{logger.run_id}-w{index:02d}")
+        result.update(action.results)
+        # Etapa com falha (ou ignorada por dependência) conta como cenário falho
+        result["status"] = "ok" if action.results.get("success") else "falha"
+
+    except Exception as e:
+        log_message(f"❌ Erro no cenário do paciente '{patient_name}': {e}")
+        result["status"] = "erro"
+        result["error"] = str(e)
+        result["traceback"] = traceback.format_exc()
+
+    finally:
+        result["duration"] = round(time.time() - start_time, 2)
+        log_message(f"⏳ Cenário do paciente '{patient_name}' concluído em {result['duration']:.2f} segundos.",
+                    duration=result["duration"])
+        log_context.__dict__.clear()
+
+    return result
+
+
+def run_parallel(workers, patients, patient_prefix="Teste Automatizado"):
+    """
+    Executa vários cenários de paciente em paralelo usando um pool de sessões do navegador.
+
+    Parâmetros:
+    - workers (int): Quantidade máxima de sessões do Chrome abertas ao mesmo tempo.
+    - patients (int): Quantidade total de pacientes (cenários) a executar.
+    - patient_prefix (str, opcional): Prefixo do nome dos pacientes cadastrados.
+
+    Retorno:
+    - list: Resultados de cada cenário, ordenados pelo número do worker.
+    """
+
+    start_time = time.time()
+    log_message(f"🚀 Iniciando {patients} cenário(s) com {workers} sessão(ões) em paralelo...")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worker") as executor:
+        futures = [executor.submit(run_worker, index, patient_prefix) for index in range(1, patients + 1)]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "✅" if result["status"] == "ok" else "❌"
+            log_message(f"{status} Worker {result['worker']:02d} finalizado em {result['duration']:.2f} segundos.")
+
+    results.sort(key=lambda item: item["worker"])
+
+    # Pacientes que ficaram para trás (cenário interrompido ou exclusão com falha) são removidos em lote
+    leftovers = [result["patient_id"] for result in results if result.get("patient_id") and not result.get("patient_deleted")]
+    if leftovers:
+        from api_client import get_client
+
+        log_message(f"🧹 Excluindo {len(leftovers)} paciente(s) que ficaram para trás...")
+        get_client().delete_patients(leftovers)
+
+    execution_time = time.time() - start_time
+
+    summary = {
+        "workers": workers,
+        "patients": patients,
+        "duration": round(execution_time, 2),
+        "failed": sum(1 for result in results if result["status"] != "ok"),
+        "results": results,
+    }
+
+    with open(results_filename, "w", encoding="utf-8") as results_file:
+        json.dump(summary, results_file, ensure_ascii=False, indent=2)
+
+    log_message(f"⏳ Execução paralela concluída em {execution_time:.2f} segundos "
+                f"({summary['failed']} falha(s)). Resultados salvos em {results_filename}.", duration=execution_time)
+
+    return results
+
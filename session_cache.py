@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from logger import log_message
+from tracer import traced
+
+
+# Pasta onde as sessões autenticadas são salvas
+cache_dir = os.getenv("SESSION_CACHE_DIR", ".session_cache")
+
+# Validade máxima de uma sessão salva (padrão: 8 horas)
+session_ttl = float(os.getenv("SESSION_TTL", 8 * 3600))
+
+# Elemento que só aparece para um usuário autenticado (tela de pacientes)
+LOGGED_IN_LOCATOR = (By.XPATH, "//button[span[contains(., 'Adicionar novo paciente')]]")
+
+
+def is_enabled():
+    """
+    Indica se o cache de sessão está ativo (desative com SESSION_CACHE=0).
+    """
+
+    return os.getenv("SESSION_CACHE", "1").lower() not in ("0", "false", "nao", "não")
+
+
+def _cache_path(email, base_url):
+    # Uma sessão por combinação de usuário e ambiente
+    key = hashlib.sha256(f"{email}|{base_url}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"session_{key}.json")
+
+
+def load_session(email, base_url):
+    """
+    Lê a sessão salva para o usuário e ambiente, se ainda for válida.
+
+    Parâmetros:
+    - email (str): E-mail usado no login.
+    - base_url (str): Endereço base do sistema.
+
+    Retorno:
+    - dict ou None: Sessão salva (cookies, localStorage, URL inicial), ou None se inexistente/expirada.
+    """
+
+    path = _cache_path(email, base_url)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as cache_file:
+            session = json.load(cache_file)
+    except Exception as e:
+        log_message(f"⚠️ Cache de sessão ilegível, ignorando: {e}")
+        return None
+
+    if time.time() >= session.get("expires_at", 0):
+        log_message("⚠️ Sessão salva expirada. Será feito login completo.")
+        invalidate_session(email, base_url)
+        return None
+
+    return session
+
+
+def invalidate_session(email, base_url):
+    """
+    Remove a sessão salva do usuário e ambiente.
+    """
+
+    try:
+        os.remove(_cache_path(email, base_url))
+    except FileNotFoundError:
+        pass
+
+
+def capture_session(driver):
+    """
+    Captura cookies, localStorage e a URL atual de um navegador autenticado.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver autenticada.
+
+    Retorno:
+    - dict: {'landing_url', 'expires_at', 'cookies', 'local_storage'}.
+    """
+
+    cookies = driver.get_cookies()
+    local_storage = driver.execute_script(
+        "const data = {};"
+        "for (let i = 0; i < localStorage.length; i++) {"
+        "  const key = localStorage.key(i); data[key] = localStorage.getItem(key);"
+        "}"
+        "return data;"
+    )
+
+    # A sessão vale até o menor vencimento entre os cookies (limitado pelo TTL)
+    expires_at = time.time() + session_ttl
+    cookie_expiries = [cookie["expiry"] for cookie in cookies if cookie.get("expiry")]
+    if cookie_expiries:
+        expires_at = min(expires_at, min(cookie_expiries))
+
+    return {
+        "landing_url": driver.current_url,
+        "expires_at": expires_at,
+        "cookies": cookies,
+        "local_storage": local_storage,
+    }
+
+
+@traced(category="action")
+def save_session(driver, email, base_url):
+    """
+    Salva cookies e localStorage do navegador após um login bem-sucedido.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver autenticada.
+    - email (str): E-mail usado no login.
+    - base_url (str): Endereço base do sistema.
+
+    Retorno:
+    - str ou None: Caminho do arquivo salvo, ou None em caso de erro.
+    """
+
+    try:
+        session = {"email": email, "base_url": base_url, "saved_at": time.time(), **capture_session(driver)}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _cache_path(email, base_url)
+
+        # Escrita atômica: workers paralelos podem ler o arquivo ao mesmo tempo
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(session, cache_file)
+        os.replace(temp_path, path)
+
+        log_message(f"✅ Sessão salva em {path}.")
+        return path
+
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível salvar a sessão: {e}")
+        return None
+
+
+@traced(category="action")
+def restore_session(driver, email, base_url, timeout=10):
+    """
+    Reaplica uma sessão salva no navegador e confirma que ela ainda é aceita pelo sistema.
+    Se a sessão for rejeitada, descarta o cache e limpa o navegador para um login completo.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver (já no domínio do sistema).
+    - email (str): E-mail usado no login.
+    - base_url (str): Endereço base do sistema.
+    - timeout (int, opcional): Tempo máximo para confirmar a sessão (padrão: 10 segundos).
+
+    Retorno:
+    - bool: True se a sessão foi reaproveitada, False se é necessário fazer login.
+    """
+
+    session = load_session(email, base_url)
+    if session is None:
+        return False
+
+    if apply_session(driver, session, base_url, timeout):
+        return True
+
+    invalidate_session(email, base_url)
+    return False
+
+
+def apply_session(driver, session, base_url, timeout=10):
+    """
+    Aplica cookies e localStorage de uma sessão capturada e confirma que ela ainda é aceita.
+    Se for rejeitada, limpa o navegador e volta à página de login.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver (já no domínio do sistema).
+    - session (dict): Sessão de capture_session (ou do cache).
+    - base_url (str): Endereço base do sistema.
+    - timeout (int, opcional): Tempo máximo para confirmar a sessão (padrão: 10 segundos).
+
+    Retorno:
+    - bool: True se a sessão foi aceita.
+    """
+
+    if time.time() >= session.get("expires_at", 0):
+        log_message("⚠️ Sessão expirada. Será feito login completo.")
+        return False
+
+    login_url = driver.current_url
+
+    try:
+        log_message("🔑 Reaproveitando sessão salva...")
+
+        for cookie in session["cookies"]:
+            cookie = {key: value for key, value in cookie.items() if key != "sameSite" or value in ("Strict", "Lax", "None")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                # Cookies de outros domínios (ex.: API) não podem ser aplicados a partir desta página
+                log_message(f"⚠️ Cookie '{cookie.get('name')}' ignorado: {e}")
+
+        driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) { localStorage.setItem(key, value); }",
+            session["local_storage"],
+        )
+
+        driver.get(session.get("landing_url") or base_url)
+
+        WebDriverWait(driver, timeout).until(
+            lambda d: "/user/login" not in d.current_url and d.find_elements(*LOGGED_IN_LOCATOR)
+        )
+        return True
+
+    except Exception as e:
+        log_message(f"⚠️ Sessão salva rejeitada, fazendo login completo: {e}")
+
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script("localStorage.clear();")
+            driver.get(login_url)
+        except Exception as reset_error:
+            log_message(f"❌ Erro ao limpar a sessão rejeitada: {reset_error}")
+
+        return False
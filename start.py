@@ -1,484 +1,511 @@
 import time
-from selenium import webdriver
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-import psutil
-from utils import fill_field, click_element, check_text_on_page, send_files, get_number, identify_fields, delete_patient, install_requirements, load_env_file, extract_data, check_and_refresh
+
+_startup_begin = time.perf_counter()  # Marca o início da inicialização do script
+
+import argparse
+import atexit
 import os
+import subprocess
 import sys
-import re
-from datetime import datetime
-import threading
-
-# Gera o nome do arquivo de log
-log_filename = "testeAutomatico.log"
 
-def log_message(message):
-    """
-    Registra uma mensagem no log e imprime no console sem erros de codificação.
-    """
+from logger import log_message
+
+
+# Arquivo de bloqueio (PID) que impede duas execuções simultâneas do harness
+lock_filename = "testeAutomatico.pid"
+
+# Módulos carregados por cada subcomando (usados pelo --profile-startup)
+COMMAND_MODULES = {
+    "run": ["action", "tracer", "checkpoint"],
+    "parallel": ["runner", "tracer"],
+    "benchmark": ["benchmark", "action"],
+    "mock": ["mock_server"],
+    "sweep": ["api_client"],
+    "fixtures": ["fixtures"],
+    "blocking": ["benchmark", "action"],
+    "headless": ["benchmark", "action"],
+    "loadgen": ["loadgen", "api_client", "fixtures"],
+    "report": ["history"],
+}
+
+
+def _pid_alive(pid):
+    # Verifica se o processo ainda existe, sem depender do psutil
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
 
-    # Substituir emojis por texto alternativo caso a codificação falhe
-    replacements = {
-        "✅": "[OK]",
-        "⚠️": "[ALERTA]",
-        "❌": "[ERRO]",
-        "⏳": "[AGUARDANDO]",
-        "🚀": "[INICIANDO]",
-        "🔍": "[VERIFICANDO]",
-        "🔧": "[CONFIGURANDO]"
-    }
-
-    for emoji, replacement in replacements.items():
-        message = message.replace(emoji, replacement)
-
-    # Força a saída no console para UTF-8
     try:
-        print(message.encode(sys.stdout.encoding, errors='replace').decode(sys.stdout.encoding))
-    except UnicodeEncodeError:
-        print(message.encode("utf-8", "ignore").decode("utf-8"))  # Se der erro, ignora caracteres inválidos
-
-    # Salvar no arquivo de log com UTF-8 para evitar erros ao ler depois
-    with open(log_filename, "a", encoding="utf-8") as log_file:
-        log_file.write(message + "\n")
-
-# Bloqueio para evitar múltiplas execuções
-lock = threading.Lock()
-
-# Caminho do próprio executável (se estiver rodando como PyInstaller)
-if getattr(sys, 'frozen', False):
-    exe_name = os.path.basename(sys.executable)  # Nome do executável
-    current_pid = os.getpid()  # Pega o PID atual
-
-    # Conta quantas instâncias do mesmo executável estão rodando
-    instances = [p.info for p in psutil.process_iter(attrs=['pid', 'name']) if p.info['name'] == exe_name]
-    
-    if len(instances) > 1:  # Se já existir uma instância, encerra
-        log_message(f"⚠️ O executável '{exe_name}' já está rodando! Evitando múltiplas execuções.")
-        sys.exit(0)  # Sai imediatamente para evitar loops
-
-# Define flag global para evitar execuções repetidas
-if hasattr(sys, '_running') and sys._running:
-    log_message("⚠️ O script já está em execução. Evitando loop!")
-    sys.exit(0)
-
-sys._running = True  # Marca como rodando
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
-# Carrega variáveis de ambiente
-load_env_file()
 
-# Executa instalação de dependências **somente uma vez**
-with lock:
-    install_requirements()
+def acquire_instance_lock():
+    """
+    Garante uma única execução do harness por vez usando um arquivo de PID.
+    Um arquivo deixado por uma execução que morreu é descartado automaticamente.
 
-log_message("✅ Ambiente configurado. Iniciando execução...")
-
-class Action:
-
-    _instance_lock = threading.Lock()
-    def __init__(self):
-        with self._instance_lock:
-            self.driver = None
-            self.wait = None
-            load_env_file()
-            self.open_browser()
-            self.Login()    
-            self.Register_patient()
-            self.awaiting_processing()
-            self.check_exams()
-            self.check_widgets()
-            self.del_patient()
-            self.logout()
-
-    def open_browser(self):
-        """
-        Inicializa o navegador Google Chrome com configurações específicas.
-
-        Retorno:
-        - Nenhum. Apenas inicia o navegador e acessa o site desejado.
-        """
+    Retorno:
+    - bool: True se o bloqueio foi obtido, False se outra execução está ativa.
+    """
 
+    for _ in range(2):
         try:
-            log_message("🔧 Configurando navegador...")
-
-            # Configurações do Chrome
-            options = webdriver.ChromeOptions()
-
-            # Caminho do ChromeDriver (caso seja necessário em sistemas Linux)
-            chromedriver_path = "/usr/bin/chromedriver"
-            service = Service(chromedriver_path)  
-
-            # Define opções para melhorar a execução do Selenium
-            options.add_argument("--start-maximized")  # Inicia o navegador maximizado
-            options.add_argument("--disable-headless")  # Garante que o modo gráfico esteja ativado
-            options.add_argument("--disable-gpu")  # Evita possíveis bugs gráficos em alguns sistemas
-            options.add_argument("--disable-blink-features=AutomationControlled")  # 🔹 Evita que o site detecte que é um bot
-            options.add_argument("--no-sandbox")  # 🔹 Necessário para alguns sistemas Linux
-            options.add_argument("--disable-dev-shm-usage")  # 🔹 Evita uso excessivo de memória em contêineres
-
-            # Evita que o Selenium seja detectado pelo Chrome
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option("useAutomationExtension", False)
-
-            # Instala e configura o ChromeDriver automaticamente
-            service = Service(ChromeDriverManager().install())
-
-            # Inicializa o WebDriver com as opções configuradas
-            self.driver = webdriver.Chrome(service=service, options=options)
-            log_message("✅ Navegador inicializado.")
+            fd = os.open(lock_filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(lock_filename, "r") as lock_file:
+                    pid = int(lock_file.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+
+            if pid and pid != os.getpid() and _pid_alive(pid):
+                log_message(f"⚠️ O script já está em execução (PID {pid}). Evitando múltiplas execuções.")
+                return False
+
+            # Bloqueio órfão de uma execução anterior
+            try:
+                os.remove(lock_filename)
+            except FileNotFoundError:
+                pass
+            continue
+
+        with os.fdopen(fd, "w") as lock_file:
+            lock_file.write(str(os.getpid()))
+        atexit.register(release_instance_lock)
+        return True
+
+    return False
+
+
+def release_instance_lock():
+    """
+    Remove o arquivo de PID se ele pertencer a este processo.
+    """
 
-            # Define um tempo de espera implícito para encontrar elementos
-            self.driver.implicitly_wait(2)
-            self.wait = WebDriverWait(self.driver, 10)
+    try:
+        with open(lock_filename, "r") as lock_file:
+            if lock_file.read().strip() == str(os.getpid()):
+                os.remove(lock_filename)
+    except OSError:
+        pass
 
-            log_message("🌐 Abrindo site...")
-            self.driver.get("https://staging.voiston.ai/user/login?dp_id=MTA0")  # URL do sistema a ser acessado
-            log_message("✅ Site aberto com sucesso!")
 
-        except Exception as e:
-            log_message(f"❌ Erro durante a inicialização do navegador: {e}")
+def prepare_environment():
+    """
+    Carrega o .env e verifica as dependências (apenas nos subcomandos que executam testes).
+    """
 
-    def Login(self):
-        """
-        Realiza login automático no sistema usando as credenciais armazenadas no .env.
+    from deps import load_env_file, install_requirements
 
-        Retorno:
-        - Nenhum. Apenas executa a ação e exibe mensagens de status.
-        """
+    load_env_file()
+    install_requirements()
+    log_message("✅ Ambiente configurado. Iniciando execução...")
 
-        # Obtém as credenciais do arquivo .env
-        email = os.getenv('EMAIL')  # Recupera o e-mail armazenado
-        password = os.getenv('PASSWORD')  # Recupera a senha armazenada
 
-        try:
-            start_time = time.time()  # Marca o início do login
-            time.sleep(5)  # Pequeno atraso para garantir que a página carregue
+def profile_startup(command):
+    """
+    Imprime o tempo de importação dos módulos usados pelo subcomando, agrupado por pacote.
 
-            log_message("🔑 Realizando login...")
+    Parâmetros:
+    - command (str): Subcomando a ser perfilado.
+    """
 
-            # Clica no botão de acesso
-            click_element(self.driver, 'access', 'class_name', 'Click de acesso')
-            time.sleep(5)  # Aguarda a interface carregar
+    cli_time = time.perf_counter() - _startup_begin
+    modules = COMMAND_MODULES.get(command, [])
+    print(f"Inicialização do CLI (start.py): {cli_time * 1000:.1f} ms")
+
+    if not modules:
+        print(f"O subcomando '{command}' não importa módulos pesados.")
+        return
+
+    if getattr(sys, 'frozen', False):
+        # Sem '-X importtime' no executável: mede cada módulo como um todo
+        for module in modules:
+            module_start = time.perf_counter()
+            __import__(module)
+            print(f"{module:<30} {(time.perf_counter() - module_start) * 1000:>10.1f} ms")
+        return
+
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+    if result.returncode != 0:
+        # Dependência ausente: o tempo medido cobre apenas o que foi importado até o erro
+        print(f"⚠️ Falha ao importar {', '.join(modules)}: {result.stderr.strip().splitlines()[-1]}")
+
+    # Linhas no formato: "import time:  self [us] | cumulative | imported package"
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        packages[top] = packages.get(top, 0) + int(self_us)
+
+    total = sum(packages.values())
+    print(f"Importações do subcomando '{command}' ({', '.join(modules)}): {total / 1000:.1f} ms")
+    print(f"{'pacote':<30} {'tempo':>10} {'%':>6}")
+    for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:20]:
+        print(f"{name:<30} {self_us / 1000:>8.1f} ms {self_us / total * 100:>5.1f}%")
+
+
+def cmd_run(args):
+    from action import Action
+    from tracer import export_chrome_trace
+
+    if args.keep_on_failure:
+        os.environ["KEEP_FAILED_PATIENT"] = "1"
+
+    if args.resume:
+        import checkpoint
+
+        state = checkpoint.load_checkpoint(args.resume)
+        if state is None:
+            return
+        if state.get("finished") and state.get("results", {}).get("success"):
+            log_message(f"✅ A execução '{args.resume}' já foi concluída com sucesso. Nada a retomar.")
+            return
+        Action(checkpoint_id=args.resume, resume=True)
+    else:
+        Action()
+    export_chrome_trace()
+
+
+def cmd_parallel(args):
+    from runner import run_parallel
+    from tracer import export_chrome_trace
+
+    run_parallel(args.workers, args.patients or args.workers)
+    export_chrome_trace()
+
+
+def cmd_benchmark(args):
+    from benchmark import run_benchmark
+
+    run_benchmark(
+        iterations=args.iterations,
+        repeats=args.repeats,
+        delays={
+            "login": args.login_delay,
+            "upload": args.upload_delay,
+            "processing": args.processing_delay,
+            "exam_processing": args.exam_processing_delay,
+        },
+        steps=args.only in (None, "steps"),
+        helpers=args.only in (None, "helpers"),
+    )
+
+
+def _start_mock(args):
+    # Sobe o servidor mock em segundo plano e aponta o harness para ele (opção --mock)
+    if not getattr(args, "mock", False):
+        return None
+
+    from benchmark import configure_environment
+    from mock_server import start_in_background
+
+    server = start_in_background()
+    configure_environment(server)
+    return server
+
+
+def cmd_blocking(args):
+    from benchmark import benchmark_blocking
+
+    server = _start_mock(args)
+    try:
+        benchmark_blocking(args.profile, args.repeats, args.patient_id)
+    finally:
+        if server:
+            server.shutdown()
 
-            # Preenche os campos de login com as credenciais
-            fill_field(self.driver, 'email', 'id', email, 'Preenchimento de Email')
-            fill_field(self.driver, 'password', 'id', password, 'Preenchimento de Password')
 
-            # Clica no botão "Entrar"
-            click_element(self.driver, 'next', 'id', 'Click entrar')
-            timeout = 400  # Define um tempo limite de 5 minutos
+def cmd_headless(args):
+    from benchmark import benchmark_headless
 
-            time.sleep(1)  # Aguarda redirecionamento
-            while time.time() - start_time < timeout:
-                if not check_text_on_page(self.driver, 'Aguarde enquanto processamos sua requisição...', timeout=timeout):    
-                    log_message("✅ Log-in OK. Continuando ...")
-                    break
-                time.sleep(1)
-                log_message("⏳ Aguarde enquanto processamos sua requisição...")
-                
-            else:
-                execution_time = time.time() - start_time
-                log_message(f"❌ Timeout: Texto 'Aguarde enquanto processamos sua requisição...' ainda presente após {execution_time:.2f}")
-                return  # Encerra a função caso o tempo de espera exceda o limite
+    server = _start_mock(args)
+    try:
+        benchmark_headless(args.iterations)
+    finally:
+        if server:
+            server.shutdown()
 
-            log_message("✅ Login realizado com sucesso!")
-            time.sleep(2)  # Aguarda redirecionamento
 
-            # Possível clique para acessar uma seção específica após login (desativado por enquanto)
-            # click_element(self.driver, "//span[contains(text(), 'TESTE AUTOMATIZADO')]", 'xpath', 'Clicar no paciente')
+def cmd_mock(args):
+    from mock_server import make_server
 
-        except Exception as e:
-            log_message(f"❌ Erro durante login: {e}")
+    server = make_server(args.host, args.port, {
+        "login": args.login_delay,
+        "upload": args.upload_delay,
+        "processing": args.processing_delay,
+        "exam_processing": args.exam_processing_delay,
+    }, args.capacity)
+    log_message(f"🌐 Servidor mock do Voiston em {server.base_url}")
+    log_message(f"   BASE_URL={server.base_url}")
+    log_message(f"   URL_API={server.base_url}/api/DataPartner/v1/Patient/Delete/")
 
-        finally:
-            execution_time = time.time() - start_time  # Calcula o tempo total do login
-            log_message(f"⏳ Ação Login concluída em {execution_time:.2f} segundos.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
 
-    def Register_patient(self):
-        """
-        Realiza o cadastro automático de um paciente no sistema.
 
-        Retorno:
-        - Nenhum. Apenas executa a ação e exibe mensagens de status.
-        """
+def _positive_float(value):
+    # Taxas da rampa: o intervalo entre chegadas é 60 / taxa
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {value}")
+    return number
 
-        try:
-            start_time = time.time()  # Marca o início da execução
-            time.sleep(5)  # Aguarda carregamento da página
 
-            log_message("📝 Realizando cadastro de paciente...")
+def cmd_loadgen(args):
+    from loadgen import LoadGenerator
 
-            # Clica no botão para adicionar um novo paciente
-            click_element(self.driver, "//button[span[contains(., 'Adicionar novo paciente')]]", 'xpath', 'Click novo Paciente')
+    if args.probe == "browser":
+        # O probe pelo navegador abre sessões do Chrome: mesmo preparo dos demais subcomandos com navegador
+        if not acquire_instance_lock():
+            return
+        prepare_environment()
+    else:
+        from deps import load_env_file
 
-            # Preenche os campos do paciente
-            fill_field(self.driver, "//input[@formcontrolname='name']", 'xpath', 'Teste Automatizado', 'Preencher campo nome')
-            fill_field(self.driver, "//input[@placeholder='DD/MM/AAAA']", 'xpath', '20051995', 'Preencher campo data de nascimento')
+        load_env_file()
 
-            # Seleciona o gênero
-            click_element(self.driver, "//mat-select[@formcontrolname='gender']", 'xpath', 'Abrir seletor de gênero')
-            click_element(self.driver, "//span[text()='Feminino']", 'xpath', 'Selecionar gênero')
+    server = None
+    if args.mock:
+        from benchmark import configure_environment
+        from mock_server import start_in_background
 
-            # Clica no botão "Salvar" para concluir o cadastro inicial
-            click_element(self.driver, "//button//span[text()='Salvar']", 'xpath', 'Click salvar')
+        server = start_in_background(delays={
+            "login": args.login_delay,
+            "upload": args.upload_delay,
+            "processing": args.processing_delay,
+            "exam_processing": args.exam_processing_delay,
+        }, capacity=args.capacity)
+        configure_environment(server)
 
-            time.sleep(5)  # Aguarda a página atualizar antes de prosseguir
+    try:
+        LoadGenerator(args.rates, args.stage_minutes, probe=args.probe, browsers=args.browsers,
+                      timeout=args.timeout, poll_interval=args.poll_interval,
+                      max_in_flight=args.max_in_flight, keep=args.keep).run()
+    finally:
+        if server:
+            server.shutdown()
 
-            # Clica no botão para adicionar exames e prontuários
-            click_element(self.driver, "//button[@mattooltip='Adicionar exames, prontuários']", 'xpath', 'Click adicionar exames, prontuários')
 
-            # Envio de exames
-            click_element(self.driver, "//button[.//span[text()='Clique para enviar Exames']]", 'xpath', 'Clique para enviar Exames')
-            send_files(self.driver,'exames', 'Selecionando exames')
+def cmd_report(args):
+    import history
 
-            time.sleep(1)  # Pequeno delay para estabilidade
+    report = history.compare(args.run_id, args.base_url, args.window, args.threshold, args.min_change)
+    regressions = history.print_report(report)
+    if regressions and args.strict:
+        sys.exit(1)
 
-            # Envio de prontuários
-            click_element(self.driver, "//button[.//span[text()='Clique para enviar Prontuários']]", 'xpath', 'Clique para enviar Prontuários')
-            send_files(self.driver,'txts', 'Selecionando Prontuários')
 
-            time.sleep(3)  # Aguarda o upload ser concluído
+def cmd_sweep(args):
+    from deps import load_env_file
+    from api_client import ApiClient
 
-            # Clica no botão "Salvar" para finalizar o processo
-            click_element(self.driver, "//button[span[text()='Salvar']]", 'xpath', 'Click Salvar')
+    load_env_file()
+    client = ApiClient(workers=args.workers)
 
-        except Exception as e:
-            log_message(f"❌ Erro durante preenchimento dos dados do paciente: {e}")
+    try:
+        if args.ids:
+            client.delete_patients(args.ids)
+        else:
+            client.sweep(args.prefix, dry_run=args.dry_run)
+    finally:
+        client.close()
 
-        finally:
-            execution_time = time.time() - start_time  # Calcula o tempo total da execução
-            log_message(f"⏳ Ação Registrar paciente concluída em {execution_time:.2f} segundos.")
 
-    def awaiting_processing(self):
-        """
-        Aguarda o processamento dos arquivos enviados (exames e prontuários).
+def cmd_fixtures(args):
+    import fixtures
 
-        Retorno:
-        - Nenhum. Apenas monitora o progresso e exibe mensagens de status.
-        """
+    settings = fixtures.get_settings()
+    settings.update({key: value for key, value in
+                     (("dedup", args.dedup or None), ("quality", args.quality), ("max_side", args.max_side)) if value})
+    fixtures.summarize(settings)
 
-        try:
-            start_time = time.time()  # Marca o início do tempo de espera
-            time.sleep(5)  # Pequena pausa para garantir que a página carregue
-
-            log_message("⏳ Aguardando processamento...")
-
-            # Define o tempo máximo de espera (5 minutos)
-            timeout = 600  
-            
-            # Verifica se a mensagem "Enviando arquivos..." desaparece
-            while time.time() - start_time < timeout:
-                if not check_text_on_page(self.driver, 'Enviando arquivos...', timeout=timeout):
-                    execution_time = time.time() - start_time
-                    log_message(f"✅ Enviando arquivos... Upload executado em {execution_time:.2f} segundos.")
-                    break
-                time.sleep(3)  # Pausa de 5 segundos para estabilidade
-                log_message("⏳ Processamento ainda em andamento...")
-            else:
-                log_message("❌ Timeout: Texto 'Enviando arquivos...' ainda presente após 5 minutos.")
-                return  # Encerra a função caso o tempo de espera exceda o limite
-
-            time.sleep(4)  # Pausa adicional para garantir estabilidade na página
-
-            # Clica na aba "Prontuários"
-            click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-16.svg']", 'xpath', 'Click Prontuários')
-
-            time.sleep(2)  # Pausa adicional para garantir estabilidade na página
-
-            # Segunda verificação: espera até que "Aguardando processamento" ou "Processando:" desapareça
-            while time.time() - start_time < timeout:
-                aguarde = check_and_refresh(self.driver, 'Aguardando processamento', timeout=timeout)
-                processando = check_and_refresh(self.driver, 'Processando:', timeout=timeout)
-
-                if not aguarde and not processando:
-                    # Se ambos os textos desapareceram, o processamento terminou
-                    execution_time1 = time.time() - start_time
-                    log_message(f"✅ Processamento de prontuarios executado em {execution_time1:.2f}.")
-                    break
-
-            else:
-                log_message("❌ Timeout atingido em processamento dos prontuários.")
-
-            time.sleep(1)  # Pequena pausa para estabilidade
-            extract_data(self.driver)
-            time.sleep(1)  # Pequena pausa antes de finalizar
-
-        except Exception as e:
-            log_message(f"❌ Erro durante processamento dos prontuarios: {e}")
-
-        finally:
-            execution_time2 = time.time() - start_time  # Calcula o tempo total de execução
-            log_message(f"⏳ Processamento dos prontuarios concluída em {execution_time2:.2f} segundos.")
-    
-    def check_exams(self):
-        """
-        Verifica o processamento dos exames enviados, aguardando a conclusão antes de prosseguir.
-
-        Retorno:
-        - Nenhum. Apenas monitora o processamento e exibe mensagens de status.
-        """
 
-        try:
-            start_time = time.time()  # Marca o início do tempo de execução
-            medidas = None  # Inicializa a variável de medidas
-            erros = None  # Inicializa a variável de erros
-            time.sleep(5)  # Pequena pausa para garantir que a página carregue
-
-            log_message("🔍 Verificando processamento dos exames...")
-
-            # Clica no menu de exames
-            click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-11.svg']", 'xpath', 'Click Exames')
-
-            # Clica na aba de exames enviados
-            click_element(self.driver, "//mat-icon[text()='cloud_download']/parent::a", 'xpath', 'Click Exames enviados')
-            time.sleep(2)  # Pausa para garantir que a página carregue
-            # Tempo limite para o processamento (5 minutos)
-            timeout = 600
-            start_time = time.time()
-
-            # Aguarda o desaparecimento dos textos de "Aguardando processamento" ou "Exame aguardando processamento"
-            while time.time() - start_time < timeout:
-                waiting = check_text_on_page(self.driver, 'Aguardando processamento', timeout=timeout)
-                exam = check_text_on_page(self.driver, 'Exame aguardando processamento', timeout=timeout)
-
-                if not waiting and not exam:
-                    # Se ambos os textos desapareceram, o processamento terminou
-                    execution_time = time.time() - start_time
-                    log_message(f"✅ Processamento dos exames concluído em {execution_time:.2f} segundos.")
-                    break
-
-                log_message("⏳ Processamento ainda em andamento...")
-                time.sleep(3)  # Pausa de 5 segundos para estabilidade
-                click_element(self.driver, "//mat-icon[text()='update']", 'xpath', 'Click Atualizando Envios')
-                time.sleep(1)  # Pequena pausa para garantir estabilidade
-                WebDriverWait(self.driver, 60).until_not(
-                        EC.presence_of_element_located((By.CLASS_NAME, "mat-progress-bar-buffer"))
-                    )
-                WebDriverWait(self.driver, 20).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "mat-expansion-panel-header"))
-                    )
-
-            else:
-                log_message("❌ Timeout: Texto 'Aguardando processamento' ainda presente após 5 minutos.")
-
-            # Após a conclusão do processamento, captura os números de medidas e erros
-            time.sleep(1)
-            medidas = get_number(self.driver, "//p/span[1]", 'xpath', 'Verificação de Medidas')
-            erros = get_number(self.driver, "//p[contains(text(), 'Erros')]", 'xpath', 'Verificação de Erros')
-            time.sleep(1)
-            log_message(f" Foram encontrados nos Arquivos de Exames Enviados {medidas} Medidas e {erros} Erros.")
-            click_element(self.driver, "//a//img[@src='/assets/icon/VOISTON_ICONS-11.svg']", 'xpath', 'Click Exames')
-            time.sleep(1)  # Pequena pausa para garantir estabilidade
-            WebDriverWait(self.driver, 60).until_not(
-                        EC.presence_of_element_located((By.CLASS_NAME, "mat-progress-bar-buffer"))
-                    )
-            time.sleep(2)
-            extract_data(self.driver)
-            time.sleep(1)  # Pequena pausa antes de finalizar
-
-        except Exception as e:
-            log_message(f"❌ Erro durante processamento: {e}")
-
-        finally:
-            execution_time = time.time() - start_time  # Calcula o tempo total da execução
-            log_message(f"⏳ Ação 'checando exames' concluída em {execution_time:.2f} segundos.")
-    
-    def check_widgets(self):
-        """
-        Expande e verifica os widgets disponíveis na página.
-
-        Retorno:
-        - Nenhum. Apenas expande os widgets e registra mensagens de status.
-        """
+def build_parser():
+    """
+    Monta o parser de argumentos do CLI.
 
-        try:
-            start_time = time.time()  # Marca o início da execução
-            time.sleep(5)  # Pausa para garantir carregamento da página
+    Retorno:
+    - argparse.ArgumentParser: Parser com os subcomandos run, parallel, benchmark, blocking, headless, loadgen, mock,
+      sweep, fixtures e report.
+    """
 
-            log_message("🔍 Verificando widgets...")
+    parser = argparse.ArgumentParser(description="Teste automatizado do Voiston.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mostra o tempo de importação do subcomando e encerra")
+
+    # --profile-startup também aceito depois do subcomando (SUPPRESS: não sobrescreve o valor do parser principal)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--profile-startup", action="store_true", default=argparse.SUPPRESS,
+                        help="Mostra o tempo de importação do subcomando e encerra")
+
+    subparsers = parser.add_subparsers(dest="command", parser_class=lambda **kwargs: argparse.ArgumentParser(
+        parents=[common], **kwargs))
+
+    run = subparsers.add_parser("run", help="Executa o cenário completo com um paciente (padrão)")
+    run.add_argument("--fast", action="store_true", help="Usa esperas por prontidão em vez de pausas fixas")
+    run.add_argument("--setup", choices=["ui", "api"], help="Cadastro e upload pela interface ou pela API (padrão: ui)")
+    run.add_argument("--block-profile", choices=["off", "light", "full"], help="Recursos bloqueados no navegador (padrão: off)")
+    run.add_argument("--headless", action="store_true", help="Chrome sem janela, com viewport fixo")
+    run.add_argument("--resume", metavar="RUN_ID",
+                     help="Retoma a execução salva em runs/<RUN_ID>.json a partir da primeira etapa não concluída")
+    run.add_argument("--keep-on-failure", action="store_true",
+                     help="Não exclui o paciente de um cenário com falha, para retomá-lo com --resume")
+    run.set_defaults(func=cmd_run, needs_browser=True)
+
+    parallel = subparsers.add_parser("parallel", help="Executa vários pacientes em sessões paralelas")
+    parallel.add_argument("--workers", type=int, default=2, help="Sessões do Chrome simultâneas (padrão: 2)")
+    parallel.add_argument("--patients", type=int, default=None, help="Total de pacientes (padrão: igual a --workers)")
+    parallel.add_argument("--fast", action="store_true", help="Usa esperas por prontidão em vez de pausas fixas")
+    parallel.add_argument("--setup", choices=["ui", "api"], help="Cadastro e upload pela interface ou pela API (padrão: ui)")
+    parallel.add_argument("--block-profile", choices=["off", "light", "full"], help="Recursos bloqueados no navegador (padrão: off)")
+    parallel.add_argument("--headless", action="store_true", help="Chrome sem janela, com viewport fixo")
+    parallel.set_defaults(func=cmd_parallel, needs_browser=True)
+
+    benchmark = subparsers.add_parser("benchmark", help="Mede etapas e helpers contra o servidor mock")
+    benchmark.add_argument("--iterations", type=int, default=3, help="Execuções completas do cenário (padrão: 3)")
+    benchmark.add_argument("--repeats", type=int, default=5, help="Repetições de cada helper (padrão: 5)")
+    benchmark.add_argument("--only", choices=["steps", "helpers"], help="Executa apenas uma parte do benchmark")
+    benchmark.add_argument("--fast", action="store_true", help="Usa o modo rápido de esperas")
+    benchmark.add_argument("--setup", choices=["ui", "api"], help="Cadastro e upload pela interface ou pela API (padrão: ui)")
+    benchmark.add_argument("--block-profile", choices=["off", "light", "full"], help="Recursos bloqueados no navegador (padrão: off)")
+    benchmark.add_argument("--headless", action="store_true", help="Chrome sem janela, com viewport fixo")
+    benchmark.set_defaults(func=cmd_benchmark, needs_browser=True)
+
+    blocking = subparsers.add_parser("blocking", help="Compara o carregamento das páginas com e sem o perfil de bloqueio")
+    blocking.add_argument("--profile", choices=["light", "full"], default="full", help="Perfil comparado com 'off' (padrão: full)")
+    blocking.add_argument("--repeats", type=int, default=3, help="Carregamentos de cada página por perfil (padrão: 3)")
+    blocking.add_argument("--patient-id", help="Paciente existente (padrão: cria um pela API e exclui ao final)")
+    blocking.add_argument("--mock", action="store_true", help="Executa contra o servidor mock local")
+    blocking.add_argument("--headless", action="store_true", help="Chrome sem janela, com viewport fixo")
+    blocking.set_defaults(func=cmd_blocking, needs_browser=True)
+
+    headless = subparsers.add_parser("headless", help="Compara memória e CPU do Chrome com janela e headless")
+    headless.add_argument("--iterations", type=int, default=2, help="Execuções do cenário por modo (padrão: 2)")
+    headless.add_argument("--mock", action="store_true", help="Executa contra o servidor mock local")
+    headless.add_argument("--fast", action="store_true", help="Usa esperas por prontidão em vez de pausas fixas")
+    headless.set_defaults(func=cmd_headless, needs_browser=True)
+
+    loadgen = subparsers.add_parser("loadgen", help="Gera carga no processamento de documentos e mede vazão e latência")
+    loadgen.add_argument("--rates", type=_positive_float, nargs="+", default=[2, 4, 8],
+                         help="Pacientes por minuto em cada estágio da rampa (padrão: 2 4 8)")
+    loadgen.add_argument("--stage-minutes", type=float, default=2, help="Duração de cada estágio (padrão: 2)")
+    loadgen.add_argument("--probe", choices=["api", "browser"], default="api",
+                         help="Detecta o fim do processamento pela API ou pelos textos da interface (padrão: api)")
+    loadgen.add_argument("--browsers", type=int, default=2, help="Sessões headless do probe 'browser' (padrão: 2)")
+    loadgen.add_argument("--timeout", type=float, default=600, help="Tempo máximo de processamento por paciente (padrão: 600)")
+    loadgen.add_argument("--poll-interval", type=float, default=1, help="Intervalo entre consultas do probe 'api' (padrão: 1)")
+    loadgen.add_argument("--max-in-flight", type=int, default=100, help="Pacientes virtuais simultâneos (padrão: 100)")
+    loadgen.add_argument("--keep", action="store_true", help="Não exclui os pacientes criados")
+    loadgen.add_argument("--mock", action="store_true", help="Executa contra o servidor mock local")
+    loadgen.set_defaults(func=cmd_loadgen, needs_browser=False)
+
+    mock = subparsers.add_parser("mock", help="Sobe o servidor mock do Voiston")
+    mock.add_argument("--host", default="127.0.0.1")
+    mock.add_argument("--port", type=int, default=8765)
+    mock.set_defaults(func=cmd_mock, needs_browser=False)
+
+    sweep = subparsers.add_parser("sweep", help="Exclui pela API os pacientes de teste deixados para trás")
+    sweep.add_argument("ids", nargs="*", help="IDs específicos a excluir (padrão: todos com o prefixo)")
+    sweep.add_argument("--prefix", default="Teste Automatizado", help="Prefixo do nome dos pacientes de teste")
+    sweep.add_argument("--workers", type=int, default=None, help="Exclusões simultâneas (padrão: API_WORKERS ou 8)")
+    sweep.add_argument("--dry-run", action="store_true", help="Apenas lista os pacientes encontrados")
+    sweep.set_defaults(func=cmd_sweep, needs_browser=False)
+
+    fixture = subparsers.add_parser("fixtures", help="Mostra o manifesto das fixtures (duplicatas e bytes enviados)")
+    fixture.add_argument("--dedup", action="store_true", help="Simula o envio apenas de conteúdo único")
+    fixture.add_argument("--quality", type=int, help="Qualidade JPEG das variantes (1-95)")
+    fixture.add_argument("--max-side", type=int, help="Maior lado das imagens, em pixels")
+    fixture.set_defaults(func=cmd_fixtures, needs_browser=False)
+
+    report = subparsers.add_parser("report", help="Compara a última execução com o histórico e aponta regressões")
+    report.add_argument("--run-id", help="Execução avaliada (padrão: a mais recente)")
+    report.add_argument("--base-url", help="Ambiente comparado (padrão: o da execução avaliada)")
+    report.add_argument("--window", type=int, default=None, help="Execuções anteriores na linha de base (padrão: 20)")
+    report.add_argument("--threshold", type=float, default=None, help="Limiar do z-score (padrão: 3)")
+    report.add_argument("--min-change", type=float, default=None, help="Variação relativa mínima (padrão: 0.10)")
+    report.add_argument("--strict", action="store_true", help="Termina com código 1 se houver regressão")
+    report.set_defaults(func=cmd_report, needs_browser=False)
+
+    # Atrasos simulados do mock (usados pelo benchmark, pela geração de carga e pelo servidor avulso)
+    for subparser, defaults in ((benchmark, (0.5, 1, 5, 5)), (mock, (2, 3, 10, 10)), (loadgen, (0.5, 1, 10, 10))):
+        subparser.add_argument("--login-delay", type=float, default=defaults[0])
+        subparser.add_argument("--upload-delay", type=float, default=defaults[1])
+        subparser.add_argument("--processing-delay", type=float, default=defaults[2])
+        subparser.add_argument("--exam-processing-delay", type=float, default=defaults[3])
+
+    # Vagas do pipeline simulado (0 = sem fila)
+    for subparser in (mock, loadgen):
+        subparser.add_argument("--capacity", type=int, default=None,
+                               help="Pacientes processados em paralelo pelo mock (padrão: MOCK_PROCESSING_CAPACITY ou 0)")
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Ponto de entrada do CLI. Sem subcomando, executa o cenário completo ('run').
+    """
 
-            # Clica no botão para acessar a aba "Panorama"
-            click_element(self.driver, "//img[@src='/assets/icon/VOISTON_ICONS-01.svg']", 'xpath', 'Click Panorama')
+    parser = build_parser()
+    argv = list(argv if argv is not None else sys.argv[1:])
 
-            time.sleep(5)  # Tempo de espera para carregamento dos widgets
+    # Sem subcomando (ex.: 'start.py --fast'), as opções são do 'run'. As opções do parser principal
+    # não recebem valor, então o primeiro argumento posicional é sempre o subcomando.
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command not in COMMAND_MODULES and not {"-h", "--help"} & set(argv[:1]):
+        argv.insert(0, "run")
 
-            # Encontra todos os elementos de expansão na página
-            expansion = self.driver.find_elements(By.TAG_NAME, "mat-expansion-panel-header")
+    args = parser.parse_args(argv)
 
-            for expansions in expansion:
-                state_expansions = expansions.get_attribute("aria-expanded")  # Verifica se o painel está expandido
+    if args.profile_startup:
+        profile_startup(args.command)
+        return 0
 
-                if state_expansions == "false":  # Se o painel estiver fechado, expande
-                    log_message("🔽 Expansor fechado. Expandindo agora...")
-                    time.sleep(1)
-                    expansions.click()
-                else:
-                    log_message("✅ Expansor já está aberto.")
+    if args.needs_browser:
+        if not acquire_instance_lock():
+            return 0
+        prepare_environment()
 
-            time.sleep(5)  # Tempo de espera para garantir carregamento das informações
+    if getattr(args, "setup", None):
+        os.environ["SETUP_MODE"] = args.setup
 
-            # Chama a função para identificar os campos da página
-            teste = identify_fields(self.driver)
+    if getattr(args, "block_profile", None):
+        os.environ["BLOCK_PROFILE"] = args.block_profile
 
-            time.sleep(1)  # Pequena pausa antes de finalizar
+    if getattr(args, "headless", False) is True:
+        os.environ["HEADLESS"] = "1"
 
-        except Exception as e:
-            log_message(f"❌ Erro durante verificação dos widgets: {e}")
-        
-        finally:
-            execution_time = time.time() - start_time  # Calcula o tempo total da execução
-            log_message(f"Não foram encontrados: {teste}.")
-            log_message(f"⏳ Ação 'checando widgets' concluída em {execution_time:.2f} segundos.")
+    if getattr(args, "fast", False):
+        from utils import set_fast_mode
 
-    def del_patient(self):
-        """
-        Exclui um paciente com base no ID extraído da URL atual.
+        set_fast_mode(True)
 
-        Retorno:
-        - Nenhum. Apenas exclui o paciente e exibe mensagens de status.
-        """
+    args.func(args)
+    return 0
 
-        try:
-            start_time = time.time()  # Marca o início da execução
-            time.sleep(5)  # Aguarda possíveis carregamentos da página
-
-            # Obtém a URL atual da página
-            url = self.driver.current_url
-
-            # Usa regex para extrair o ID do paciente da URL
-            match = re.search(r'/patient/(\d+)/', url)  
-            patient_id = match.group(1) if match else None
-
-            if patient_id:
-                # Chama a função que realiza a exclusão do paciente
-                delete_patient(patient_id, 'delete_patient')
-                log_message(f"✅ Paciente {patient_id} excluído com sucesso!")
-            else:
-                log_message("❌ Erro: ID do paciente não encontrado na URL!")
-
-        except Exception as e:
-            log_message(f"❌ Erro durante exclusão do paciente {patient_id} : {e}")
-
-        finally:
-            execution_time = time.time() - start_time  # Calcula o tempo total da execução
-            log_message(f"⏳ Ação 'excluir paciente {patient_id}' concluída em {execution_time:.2f} segundos.")
-
-    def logout(self):
-        """
-        Encerra a sessão do navegador e registra a ação.
-    
-        Retorno:
-        - Nenhum. Apenas fecha o navegador e exibe mensagens de status.
-        """
-    
-        self.driver.quit()  # Fecha todas as janelas do navegador e encerra a sessão
-
-        log_message("🚪 Sessão encerrada.")
 
 if __name__ == "__main__":
-    if not hasattr(sys, '_frozen') or (hasattr(sys, '_frozen') and not getattr(sys, '_running', False)):
-        setattr(sys, '_running', True)  # Evita múltiplas execuções
-        Action() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do harness ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logger  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_log(tmp_path, monkeypatch):
+    # Cada teste grava o seu log em uma pasta temporária, sem tocar no testeAutomatico.log
+    monkeypatch.setattr(logger, "log_filename", str(tmp_path / "teste.log"))
+    monkeypatch.setattr(logger, "console_enabled", False)
+    yield
+    logger.flush()
@@ -0,0 +1,39 @@
+import os
+
+from deps import find_missing, normalize_name, read_requirements
+
+
+def test_read_requirements_utf16_with_bom():
+    content = "selenium==4.27.1\r\nPyAutoGUI==0.9.54\r\n".encode("utf-16")
+    assert content.startswith(b"\xff\xfe")
+    assert read_requirements(content) == {"selenium": "4.27.1", "pyautogui": "0.9.54"}
+
+
+def test_read_requirements_utf8_comments_extras_and_options():
+    content = (
+        "\ufeff# dependências do harness\n"
+        "-r base.txt\n"
+        "requests[socks] == 2.32.3  # cliente HTTP\n"
+        "python_dotenv\n"
+        "urllib3>=2 ; python_version >= '3.8'\n"
+        "\n"
+    ).encode("utf-8")
+    assert read_requirements(content) == {"requests": "2.32.3", "python-dotenv": None, "urllib3": None}
+
+
+def test_read_requirements_repository_file():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
+    with open(path, "rb") as requirements_file:
+        required = read_requirements(requirements_file.read())
+    assert required["selenium"] == "4.27.1"
+    assert "python-dotenv" in required
+
+
+def test_normalize_name():
+    assert normalize_name("Typing_Extensions") == normalize_name("typing.extensions") == "typing-extensions"
+
+
+def test_find_missing_reports_absent_and_mismatched_versions():
+    required = {"selenium": "4.27.1", "requests": "2.32.3", "psutil": None, "pillow": None}
+    installed = {"selenium": "4.27.1", "requests": "2.31.0", "pillow": "11.1.0"}
+    assert find_missing(required, installed) == ["requests==2.32.3", "psutil"]
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+import fixtures
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path, monkeypatch):
+    # Pasta 'arquivos' temporária: exames com uma duplicata (mesmo conteúdo, outro nome)
+    root = tmp_path / "arquivos"
+    (root / "exames").mkdir(parents=True)
+    (root / "txts").mkdir()
+    (root / "exames" / "a.pdf").write_bytes(b"exame 1")
+    (root / "exames" / "b.pdf").write_bytes(b"exame 2")
+    (root / "exames" / "c.pdf").write_bytes(b"exame 1")
+    (root / "txts" / "prontuario.txt").write_text("texto", encoding="utf-8")
+    monkeypatch.setattr(fixtures, "fixtures_root", lambda: str(root))
+    return root
+
+
+def test_build_manifest_marks_duplicates_by_content(fixtures_dir):
+    entries = fixtures.build_manifest(("exames",))["exames"]
+
+    assert [entry["name"] for entry in entries] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert entries[0]["sha256"] == entries[2]["sha256"] != entries[1]["sha256"]
+    assert [entry["duplicate_of"] for entry in entries] == [None, None, "a.pdf"]
+
+    manifest = json.loads((fixtures_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert set(manifest["files"]) == {"exames/a.pdf", "exames/b.pdf", "exames/c.pdf"}
+
+
+def test_build_manifest_reuses_hashes_of_unchanged_files(fixtures_dir, monkeypatch):
+    fixtures.build_manifest(("exames",))
+
+    # Sem mudança de tamanho ou data, nenhum arquivo é lido de novo
+    monkeypatch.setattr(fixtures, "_sha256", lambda path: pytest.fail(f"{path} lido de novo"))
+    assert len(fixtures.build_manifest(("exames",))["exames"]) == 3
+
+
+def test_select_files_with_dedup_skips_duplicates(fixtures_dir):
+    settings = {"dedup": True, "quality": None, "max_side": None}
+    selected = fixtures.select_files("exames", settings)
+    assert [os.path.basename(path) for path in selected] == ["a.pdf", "b.pdf"]
+
+    settings["dedup"] = False
+    assert len(fixtures.select_files("exames", settings)) == 3
+
+
+def test_record_run_counts_files_and_bytes(fixtures_dir):
+    files = {"exames": fixtures.select_files("exames", {"dedup": True, "quality": None, "max_side": None}),
+             "txts": fixtures.select_files("txts", {"dedup": False, "quality": None, "max_side": None})}
+    record = fixtures.record_run("run-1", "Teste Automatizado 01", files, setup="api",
+                                 settings={"dedup": True, "quality": None, "max_side": None})
+
+    assert record["files"] == 3
+    assert record["bytes_by_folder"] == {"exames": 14, "txts": 5}
+    assert record["bytes"] == 19
+
+    manifest = json.loads((fixtures_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["runs"][-1]["run_id"] == "run-1"
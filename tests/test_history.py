@@ -0,0 +1,93 @@
+import pytest
+
+import history
+
+
+BASE_URL = "http://mock.local"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORY_ENABLED", "1")
+    return str(tmp_path / "history.db")
+
+
+def record(db_path, run_id, login, processing_ms, **results):
+    results.setdefault("steps", {"Login": login})
+    results.setdefault("processing_latency_ms", processing_ms)
+    return history.record_run(results, run_id=run_id, base_url=BASE_URL, path=db_path)
+
+
+def series(report):
+    return {item["name"]: item for item in report["series"]}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert history.percentile(values, 50) == 50
+    assert history.percentile(values, 99) == 99
+    assert history.percentile(values, 100) == 100
+    assert history.percentile([7.5], 99) == 7.5
+    assert history.percentile([], 50) is None
+
+
+def test_collect_metrics_skips_non_numeric_and_resumed_latency():
+    metrics = history.collect_metrics({
+        "processing_latency_ms": 1500.0,
+        "medidas": "1.234",
+        "erros": None,
+        "exames": {"measurements": 12, "status": True},
+        "timeouts_expired": ["check_exams"],
+        "step_results": {"Login": {"status": "failed"}, "open_browser": {"status": "ok"}},
+        "steps": {"Login": 42.0},
+        "login": "full",
+    })
+    assert metrics == {
+        "processing_latency_ms": 1500.0,
+        "medidas": 1234.0,
+        "exames.measurements": 12.0,
+        "login.full_seconds": 42.0,
+        "expired.check_exams": 1.0,
+        "failed.Login": 1.0,
+    }
+
+    resumed = history.collect_metrics({"processing_latency_ms": 1500.0, "resumed_from": "run-1"})
+    assert "processing_latency_ms" not in resumed
+
+
+def test_compare_flags_regression_above_threshold(db_path):
+    for index, (login, processing) in enumerate([(10.0, 1000), (10.5, 1010), (9.5, 990), (10.2, 1005), (9.8, 995)]):
+        record(db_path, f"base-{index}", login, processing)
+    record(db_path, "slow", 20.0, 1002)
+
+    report = history.compare(path=db_path)
+    assert report["run_id"] == "slow"
+    assert report["baseline_runs"] == 5
+
+    items = series(report)
+    assert items["step:Login"]["status"] == "regression"
+    assert items["metric:processing_latency_ms"]["status"] == "ok"
+
+
+def test_compare_requires_min_change_and_baseline(db_path):
+    # z-score alto, mas variação de 1%: série quase constante não é sinalizada
+    for index, login in enumerate([10.0, 10.01, 9.99, 10.0, 10.01]):
+        record(db_path, f"base-{index}", login, 1000)
+    record(db_path, "latest", 10.1, 1000)
+
+    items = series(history.compare(path=db_path))
+    assert items["step:Login"]["z"] > history.z_threshold
+    assert items["step:Login"]["status"] == "ok"
+
+    # Com menos execuções que HISTORY_MIN_RUNS, não há comparação
+    items = series(history.compare(run_id="base-2", path=db_path))
+    assert items["step:Login"]["status"] == "insufficient"
+
+
+def test_compare_improvement_and_unknown_run(db_path):
+    for index, login in enumerate([20.0, 21.0, 19.0, 20.5, 19.5]):
+        record(db_path, f"base-{index}", login, 1000)
+    record(db_path, "fast", 5.0, 1000)
+
+    assert series(history.compare(path=db_path))["step:Login"]["status"] == "improvement"
+    assert history.compare(run_id="inexistente", path=db_path) is None
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+import requests
+
+from api_client import ApiClient
+from mock_server import start_in_background
+
+
+@pytest.fixture
+def server():
+    server = start_in_background(delays={"login": 0, "upload": 0, "processing": 0.4, "exam_processing": 0.4})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = ApiClient(url_api=f"{server.base_url}/api/DataPartner/v1/Patient/Delete/", api_key="mock-api-key")
+    yield client
+    client.close()
+
+
+def test_api_setup_processing_and_sweep(server, client, tmp_path):
+    exam = tmp_path / "exame.pdf"
+    exam.write_bytes(b"%PDF-1.4 exame")
+    note = tmp_path / "prontuario.txt"
+    note.write_text("prontuário", encoding="utf-8")
+
+    patient_id = client.create_patient("Teste Automatizado Smoke")
+    assert client.patient_status(patient_id)["docs"] == "empty"
+
+    upload = client.upload_files(patient_id, {"exames": [str(exam)], "txts": [str(note)]})
+    assert upload["files"] == 2
+    assert server.state.patients[int(patient_id)]["files"] == {"exames": ["exame.pdf"], "txts": ["prontuario.txt"]}
+
+    # O processamento simulado passa por 'waiting'/'processing' até 'done'
+    deadline = time.time() + 5
+    while client.patient_status(patient_id)["docs"] != "done":
+        assert time.time() < deadline, "processamento do mock não terminou"
+        time.sleep(0.05)
+
+    assert client.list_patients("Teste Automatizado") == [{"id": patient_id, "name": "Teste Automatizado Smoke"}]
+    swept = client.sweep("Teste Automatizado")
+    assert [patient["result"]["ok"] for patient in swept] == [True]
+    assert server.state.deleted == [int(patient_id)]
+
+    # Excluir de novo responde 404, que conta como sucesso
+    assert client.delete_patient(patient_id)["ok"] is True
+
+
+def test_api_requires_key(server):
+    response = requests.get(f"{server.base_url}/api/DataPartner/v1/Patient/List", timeout=5)
+    assert response.status_code == 401
@@ -0,0 +1,72 @@
+import pytest
+
+import history
+import timeouts
+
+
+BASE_URL = "http://mock.local"
+
+
+@pytest.fixture(autouse=True)
+def empty_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORY_ENABLED", "1")
+    monkeypatch.setenv("TIMEOUT_MODE", "adaptive")
+    monkeypatch.setattr(history, "db_filename", str(tmp_path / "history.db"))
+    monkeypatch.setattr(timeouts, "_budgets", {})  # Orçamentos calculados uma vez por processo
+
+
+def record_logins(durations, mode="full", **results):
+    for index, duration in enumerate(durations):
+        history.record_run(dict(results, steps={"Login": duration}, login=mode), run_id=f"{mode}-{index}",
+                           base_url=BASE_URL)
+
+
+def test_without_history_uses_static_ceiling():
+    assert timeouts.get_timeout("Login", BASE_URL) == timeouts.LIMITS["Login"][1]
+    assert timeouts.get_timeout("check_exams", BASE_URL) == timeouts.LIMITS["check_exams"][1]
+
+
+def test_budget_is_p99_times_factor_clamped(monkeypatch):
+    monkeypatch.setattr(timeouts, "safety_factor", 2.0)
+    record_logins([50.0] * 9 + [80.0])
+
+    # p99 de 10 amostras é a maior (80 s) × 2 = 160 s, dentro de 60-400 s
+    assert timeouts.get_timeout("Login", BASE_URL) == 160.0
+
+
+def test_budget_respects_floor(monkeypatch):
+    monkeypatch.setattr(timeouts, "safety_factor", 2.0)
+    record_logins([5.0] * 12)
+    assert timeouts.get_timeout("Login", BASE_URL) == timeouts.LIMITS["Login"][0]
+
+
+def test_login_budget_ignores_cached_sessions(monkeypatch):
+    monkeypatch.setattr(timeouts, "safety_factor", 2.0)
+    monkeypatch.setattr(timeouts, "min_samples", 5)
+
+    # Só logins com sessão reaproveitada: amostras insuficientes para o login completo
+    record_logins([0.4] * 20, mode="cache")
+    assert timeouts.get_timeout("Login", BASE_URL) == timeouts.LIMITS["Login"][1]
+
+    monkeypatch.setattr(timeouts, "_budgets", {})
+    record_logins([100.0] * 5)
+    assert timeouts.get_timeout("Login", BASE_URL) == 200.0
+
+
+def test_expired_and_failed_runs_are_not_samples(monkeypatch):
+    monkeypatch.setattr(timeouts, "min_samples", 5)
+    record_logins([100.0] * 4)
+    record_logins([300.0] * 3, timeouts_expired=["Login"])
+    assert timeouts.get_timeout("Login", BASE_URL) == timeouts.LIMITS["Login"][1]
+
+
+def test_fixed_mode_and_observations(monkeypatch):
+    monkeypatch.setenv("TIMEOUT_MODE", "fixed")
+    record_logins([50.0] * 20)
+    assert timeouts.get_timeout("Login", BASE_URL) == timeouts.LIMITS["Login"][1]
+
+    timeouts.reset_observations()
+    timeouts.record_duration("click_element", 1.5)
+    timeouts.record_duration("click_element", 0.5)
+    timeouts.record_expired("fill_field", 20)
+    assert timeouts.get_observations() == {"waits": {"click_element": 1.5}, "expired": ["fill_field"]}
@@ -0,0 +1,161 @@
+import os
+import threading
+
+from logger import log_message
+
+
+# Orçamentos fixos de cada etapa/espera (segundos): (mínimo, máximo). O máximo é o antigo valor fixo,
+# usado também quando não há histórico suficiente.
+LIMITS = {
+    "Login": (60, 400),
+    "awaiting_processing": (120, 600),
+    "check_exams": (120, 600),
+    "click_element": (5, 20),
+    "fill_field": (5, 20),
+}
+
+# Esperas por elemento medidas em cada execução (as demais entradas de LIMITS são etapas do Action)
+WAITS = ("click_element", "fill_field")
+
+# Etapas cujas amostras vêm de uma métrica própria: o orçamento do Login vale para o login completo,
+# e as execuções com sessão reaproveitada (menos de 1 s) não podem entrar no seu histórico
+SAMPLE_METRICS = {"Login": "login.full_seconds"}
+
+# Fator de segurança sobre o p99, execuções consideradas e mínimo de amostras para adaptar
+safety_factor = float(os.getenv("TIMEOUT_FACTOR", 2.0))
+history_window = int(os.getenv("TIMEOUT_WINDOW", 50))
+min_samples = int(os.getenv("TIMEOUT_MIN_SAMPLES", 10))
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+# Maior duração e esperas esgotadas de cada etapa/espera, por thread (um Action por thread)
+_observed = threading.local()
+
+
+def is_adaptive():
+    """
+    Indica se os timeouts são derivados do histórico (variável TIMEOUT_MODE: 'adaptive' ou 'fixed').
+    """
+
+    return os.getenv("TIMEOUT_MODE", "adaptive").lower() != "fixed"
+
+
+def _load_samples(name, base_url):
+    # Durações das execuções anteriores bem-sucedidas (esgotadas ou com falha não contam)
+    import history
+
+    if name in WAITS or name in SAMPLE_METRICS:
+        query = ("SELECT m.value FROM metrics m JOIN runs r ON r.id = m.run "
+                 "WHERE r.base_url = ? AND m.name = ? AND NOT EXISTS "
+                 "(SELECT 1 FROM metrics e WHERE e.run = r.id AND e.name IN (?, ?)) ORDER BY r.id DESC LIMIT ?")
+        params = (base_url, SAMPLE_METRICS.get(name, f"waits.{name}_seconds"), f"expired.{name}", f"failed.{name}",
+                  history_window)
+    else:
+        query = ("SELECT s.duration FROM steps s JOIN runs r ON r.id = s.run "
+                 "WHERE r.base_url = ? AND s.step = ? AND NOT EXISTS "
+                 "(SELECT 1 FROM metrics e WHERE e.run = r.id AND e.name IN (?, ?)) ORDER BY r.id DESC LIMIT ?")
+        params = (base_url, name, f"expired.{name}", f"failed.{name}", history_window)
+
+    connection = history.connect()
+    try:
+        return [row[0] for row in connection.execute(query, params)]
+    finally:
+        connection.close()
+
+
+def get_timeout(name, base_url=None):
+    """
+    Retorna o orçamento de tempo de uma etapa ou espera: p99 das durações recentes no mesmo
+    ambiente multiplicado pelo fator de segurança, limitado ao mínimo e ao máximo de LIMITS.
+    Sem histórico suficiente (ou com TIMEOUT_MODE=fixed), usa o máximo. O Login usa apenas
+    os logins completos (ver SAMPLE_METRICS).
+
+    Parâmetros:
+    - name (str): Nome da etapa ('Login', 'awaiting_processing', 'check_exams') ou da espera
+      ('click_element', 'fill_field').
+    - base_url (str, opcional): Ambiente cujo histórico é usado (padrão: variável BASE_URL).
+
+    Retorno:
+    - float: Timeout em segundos.
+    """
+
+    floor, ceiling = LIMITS[name]
+    if not is_adaptive():
+        return ceiling
+
+    with _budgets_lock:
+        if name in _budgets:
+            return _budgets[name]
+
+        from history import percentile
+
+        if base_url is None:
+            from action import get_base_url
+
+            base_url = get_base_url()
+
+        budget = ceiling
+        try:
+            samples = _load_samples(name, base_url)
+        except Exception as e:
+            log_message(f"⚠️ Histórico indisponível para o timeout de '{name}': {e}")
+            samples = []
+
+        if len(samples) >= min_samples:
+            p99 = percentile(samples, 99)
+            budget = round(min(max(p99 * safety_factor, floor), ceiling), 1)
+            log_message(f"⏱️ Timeout de '{name}': {budget:.0f} s (p99 de {len(samples)} execuções: "
+                        f"{p99:.1f} s × {safety_factor:g}, limites {floor}-{ceiling} s).", timeout=budget)
+
+        _budgets[name] = budget
+        return budget
+
+
+def reset_observations():
+    """
+    Limpa as durações e esperas esgotadas registradas na thread atual.
+    """
+
+    _observed.durations = {}
+    _observed.expired = set()
+
+
+def record_duration(name, duration):
+    """
+    Registra a duração de uma espera (guarda a maior da execução).
+    """
+
+    durations = getattr(_observed, 'durations', None)
+    if durations is None:
+        durations = _observed.durations = {}
+    durations[name] = max(durations.get(name, 0), duration)
+
+
+def record_expired(name, timeout):
+    """
+    Registra que uma etapa ou espera esgotou o orçamento. Com timeout adaptativo, isso indica
+    uma lentidão real em relação ao histórico, e não apenas uma falha.
+    """
+
+    expired = getattr(_observed, 'expired', None)
+    if expired is None:
+        expired = _observed.expired = set()
+    expired.add(name)
+
+    if is_adaptive() and timeout < LIMITS[name][1]:
+        log_message(f"⏱️ '{name}' excedeu o timeout adaptativo de {timeout:.0f} s: mais lento que o histórico recente.")
+
+
+def get_observations():
+    """
+    Retorna as esperas medidas na thread atual.
+
+    Retorno:
+    - dict: {'waits': {nome: maior duração}, 'expired': [nomes que esgotaram o orçamento]}.
+    """
+
+    return {
+        "waits": {name: round(value, 3) for name, value in getattr(_observed, 'durations', {}).items()},
+        "expired": sorted(getattr(_observed, 'expired', set())),
+    }
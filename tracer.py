@@ -0,0 +1,180 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import logger
+from logger import log_message, log_context
+
+
+# Spans finalizados de todas as threads
+_spans = []
+_spans_lock = threading.Lock()
+
+# Pilha de spans abertos por thread (para relacionar etapas aninhadas)
+_stack = threading.local()
+
+# Trilha do trace de cada nome de thread (ex.: prefixo do worker). A chave é o nome, e não o id
+# da thread: as threads do pool são reaproveitadas por vários workers e o sistema reutiliza ids
+_thread_names = {}
+
+# Origem do relógio monotônico do trace
+_origin_ns = time.perf_counter_ns()
+
+
+@contextmanager
+def span(name, category="step", **args):
+    """
+    Mede um trecho de código como um span aninhado, usando relógio monotônico.
+
+    Parâmetros:
+    - name (str): Nome do span (ex.: nome da etapa ou da ação).
+    - category (str, opcional): Categoria exibida no trace (padrão: 'step').
+    - args: Informações adicionais gravadas no span.
+
+    Retorno:
+    - dict: O span em andamento; campos podem ser adicionados em 'args' durante a execução.
+    """
+
+    stack = getattr(_stack, 'spans', None)
+    if stack is None:
+        stack = _stack.spans = []
+
+    thread_name = getattr(log_context, 'prefix', None) or threading.current_thread().name
+    with _spans_lock:
+        thread_id = _thread_names.setdefault(thread_name, len(_thread_names) + 1)
+
+    current = {
+        "name": name,
+        "cat": category,
+        "tid": thread_id,
+        "depth": len(stack),
+        "parent": stack[-1]["name"] if stack else None,
+        "args": {key: value for key, value in args.items() if value is not None},
+        "start_ns": time.perf_counter_ns(),
+    }
+    stack.append(current)
+
+    try:
+        yield current
+    except BaseException as e:
+        current["args"]["error"] = repr(e)
+        raise
+    finally:
+        current["end_ns"] = time.perf_counter_ns()
+        stack.pop()
+        with _spans_lock:
+            _spans.append(current)
+
+
+def traced(name=None, category="step", args=()):
+    """
+    Decorador que executa a função dentro de um span.
+
+    Parâmetros:
+    - name (str, opcional): Nome do span (padrão: nome da função).
+    - category (str, opcional): Categoria do span (padrão: 'step').
+    - args (tuple, opcional): Nomes de parâmetros da função cujos valores são gravados no span.
+
+    Retorno:
+    - Função decorada.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*call_args, **call_kwargs):
+            span_args = {}
+            if args:
+                bound = signature.bind_partial(*call_args, **call_kwargs)
+                span_args = {arg: bound.arguments.get(arg) for arg in args}
+
+            with span(span_name, category, **span_args):
+                return func(*call_args, **call_kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_spans():
+    """
+    Retorna uma cópia dos spans finalizados até o momento.
+
+    Retorno:
+    - list: Spans com nome, categoria, thread, profundidade e duração em segundos.
+    """
+
+    with _spans_lock:
+        spans = list(_spans)
+
+    return [
+        {
+            "name": item["name"],
+            "cat": item["cat"],
+            "tid": item["tid"],
+            "depth": item["depth"],
+            "parent": item["parent"],
+            "duration": (item["end_ns"] - item["start_ns"]) / 1e9,
+            "args": item["args"],
+        }
+        for item in spans
+    ]
+
+
+def reset_spans():
+    """
+    Descarta todos os spans registrados.
+    """
+
+    with _spans_lock:
+        _spans.clear()
+
+
+def export_chrome_trace(path=None):
+    """
+    Exporta os spans no formato Chrome trace-event JSON, para visualizar a execução
+    como uma cascata (waterfall) em chrome://tracing, ui.perfetto.dev ou speedscope.
+
+    Parâmetros:
+    - path (str, opcional): Caminho do arquivo de saída (padrão: trace_<run_id>.json).
+
+    Retorno:
+    - str: Caminho do arquivo gerado.
+    """
+
+    # Arquivo de saída no formato Chrome trace-event (abrir em chrome://tracing ou ui.perfetto.dev)
+    path = path or f"trace_{logger.run_id}.json"
+    pid = os.getpid()
+
+    with _spans_lock:
+        spans = list(_spans)
+
+    events = [
+        {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"Teste automatizado {logger.run_id}"}}
+    ]
+    for thread_name, thread_id in _thread_names.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+
+    for item in sorted(spans, key=lambda entry: entry["start_ns"]):
+        events.append({
+            "name": item["name"],
+            "cat": item["cat"],
+            "ph": "X",
+            "ts": (item["start_ns"] - _origin_ns) / 1000,
+            "dur": (item["end_ns"] - item["start_ns"]) / 1000,
+            "pid": pid,
+            "tid": item["tid"],
+            "args": {key: str(value) for key, value in item["args"].items()},
+        })
+
+    with open(path, "w", encoding="utf-8") as trace_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file, ensure_ascii=False)
+
+    log_message(f"📊 Trace da execução exportado para {path} ({len(spans)} spans).")
+    return path
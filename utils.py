@@ -2,50 +2,158 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import contextlib
 import time
 import os
 import sys
-import subprocess
-import requests
-import shutil 
-from dotenv import load_dotenv
-import pyautogui
+import threading
+from logger import log_message
+from tracer import traced
+from fixtures import select_files
+import timeouts
+
+
+# Modo rápido: troca as pausas fixas por esperas baseadas em sinais reais de prontidão
+fast_mode = os.getenv("FAST_MODE", "").lower() in ("1", "true", "sim")
+
+# Estatísticas de pausas por thread (cada worker paralelo contabiliza as suas)
+_sleep_stats = threading.local()
+
+# Condição de página pronta: documento carregado e nenhum overlay/progresso bloqueando a tela
+PAGE_READY_SCRIPT = """
+if (document.readyState !== 'complete') { return false; }
+const blockers = document.querySelectorAll(
+    '.cdk-overlay-backdrop-showing, mat-progress-bar, mat-spinner, mat-progress-spinner');
+for (const el of blockers) {
+    const rect = el.getBoundingClientRect();
+    if (rect.width > 0 && rect.height > 0) { return false; }
+}
+return true;
+"""
+
+# Condição de elemento pronto: visível, habilitado e sem outro elemento sobreposto ao seu centro
+ELEMENT_READY_SCRIPT = """
+const el = arguments[0];
+const rect = el.getBoundingClientRect();
+if (rect.width === 0 || rect.height === 0 || el.disabled) { return false; }
+const style = window.getComputedStyle(el);
+if (style.visibility === 'hidden' || style.pointerEvents === 'none') { return false; }
+el.scrollIntoView({block: 'center', inline: 'center'});
+const box = el.getBoundingClientRect();
+const top = document.elementFromPoint(box.left + box.width / 2, box.top + box.height / 2);
+return !!top && (top === el || el.contains(top) || top.contains(el));
+"""
+
+
+def set_fast_mode(enabled):
+    """
+    Ativa ou desativa o modo rápido de esperas.
 
+    Parâmetros:
+    - enabled (bool): True para esperar apenas por sinais reais de prontidão.
+    """
 
-# Gera o nome do arquivo de log
-log_filename = "testeAutomatico.log"
+    global fast_mode
+    fast_mode = bool(enabled)
+    log_message(f"🔧 Modo rápido {'ativado' if fast_mode else 'desativado'}.")
 
-def log_message(message):
+
+def get_sleep_stats():
     """
-    Registra uma mensagem no log e imprime no console sem erros de codificação.
+    Retorna as estatísticas de pausas da thread atual.
+
+    Retorno:
+    - dict: 'planned' (segundos das pausas fixas originais), 'spent' (segundos realmente
+      aguardados) e 'saved' (diferença entre os dois).
     """
 
-    # Substituir emojis por texto alternativo caso a codificação falhe
-    replacements = {
-        "✅": "[OK]",
-        "⚠️": "[ALERTA]",
-        "❌": "[ERRO]",
-        "⏳": "[AGUARDANDO]",
-        "🚀": "[INICIANDO]",
-        "🔍": "[VERIFICANDO]",
-        "🔧": "[CONFIGURANDO]"
-    }
+    planned = getattr(_sleep_stats, 'planned', 0.0)
+    spent = getattr(_sleep_stats, 'spent', 0.0)
+    return {"planned": round(planned, 2), "spent": round(spent, 2), "saved": round(planned - spent, 2)}
 
-    for emoji, replacement in replacements.items():
-        message = message.replace(emoji, replacement)
 
-    # Força a saída no console para UTF-8
-    try:
-        print(message.encode(sys.stdout.encoding, errors='replace').decode(sys.stdout.encoding))
-    except UnicodeEncodeError:
-        print(message.encode("utf-8", "ignore").decode("utf-8"))  # Se der erro, ignora caracteres inválidos
+def reset_sleep_stats():
+    """
+    Zera as estatísticas de pausas da thread atual.
+    """
+
+    _sleep_stats.planned = 0.0
+    _sleep_stats.spent = 0.0
+
+
+def _record_sleep(planned, spent):
+    _sleep_stats.planned = getattr(_sleep_stats, 'planned', 0.0) + planned
+    _sleep_stats.spent = getattr(_sleep_stats, 'spent', 0.0) + spent
+
+
+@traced(category="sleep", args=("seconds",))
+def pause(seconds, driver=None):
+    """
+    Substitui uma pausa fixa. No modo normal dorme o tempo pedido; no modo rápido aguarda
+    apenas até a página estar pronta (limitado ao tempo da pausa original).
+
+    Parâmetros:
+    - seconds (float): Duração da pausa fixa original.
+    - driver (WebDriver, opcional): Se informado, o modo rápido aguarda a página ficar pronta.
+    """
+
+    start_time = time.time()
+
+    if not fast_mode:
+        time.sleep(seconds)
+    elif driver is not None:
+        try:
+            WebDriverWait(driver, seconds, poll_frequency=0.1).until(
+                lambda d: d.execute_script(PAGE_READY_SCRIPT)
+            )
+        except TimeoutException:
+            pass  # Página ainda ocupada: mantém o comportamento original de esperar o tempo todo
+        except Exception as e:
+            log_message(f"⚠️ Erro ao verificar prontidão da página: {e}")
+
+    _record_sleep(seconds, time.time() - start_time)
+
+
+def element_ready(locator):
+    """
+    Condição para WebDriverWait: elemento visível, habilitado e sem overlay sobre ele.
+
+    Parâmetros:
+    - locator (tuple): Par (By, identificador) do elemento.
+
+    Retorno:
+    - Função que devolve o elemento quando pronto, ou False.
+    """
+
+    def _predicate(driver):
+        element = EC.element_to_be_clickable(locator)(driver)
+        if element and driver.execute_script(ELEMENT_READY_SCRIPT, element):
+            return element
+        return False
 
-    # Salvar no arquivo de log com UTF-8 para evitar erros ao ler depois
-    with open(log_filename, "a", encoding="utf-8") as log_file:
-        log_file.write(message + "\n")
+    return _predicate
 
 
-def fill_field(driver, identifier, identifier_type, value, action_name="", timeout=20):
+def _normalize_value(value):
+    # Ignora máscaras de formatação (ex.: "20/05/1995" equivale a "20051995")
+    return "".join(char for char in value if char.isalnum())
+
+
+def log_sleep_savings():
+    """
+    Registra no log quanto tempo de pausa foi economizado em relação às pausas fixas.
+
+    Retorno:
+    - dict: Estatísticas retornadas por get_sleep_stats().
+    """
+
+    stats = get_sleep_stats()
+    log_message(f"⏳ Pausas fixas previstas: {stats['planned']:.2f}s | aguardado: {stats['spent']:.2f}s "
+                f"| economizado: {stats['saved']:.2f}s (modo rápido {'ativo' if fast_mode else 'inativo'}).")
+    return stats
+
+@traced(category="action", args=("action_name",))
+def fill_field(driver, identifier, identifier_type, value, action_name="", timeout=None):
     """
     Localiza um campo de input e preenche com um valor.
 
@@ -55,13 +163,15 @@ def fill_field(driver, identifier, identifier_type, value, action_name="", timeo
     - identifier_type (str): Tipo do identificador ('id', 'xpath', 'class_name', etc.).
     - value (str): Texto a ser inserido no campo.
     - action_name (str, opcional): Nome da ação para fins de log.
-    - timeout (int, opcional): Tempo máximo de espera pelo elemento (padrão: 20 segundos).
+    - timeout (int, opcional): Tempo máximo de espera pelo elemento (padrão: timeout adaptativo
+      do histórico, até 20 segundos; ver timeouts.get_timeout).
 
     Retorno:
-    - Nenhum. Apenas preenche o campo de input.
+    - bool: True se o campo foi preenchido, False em caso de erro.
     """
 
     start_time = time.time()  # Marca o tempo de início da execução
+    timeout = timeout or timeouts.get_timeout("fill_field")
 
     try:
         # Verifica se o valor passado é uma string
@@ -86,18 +196,38 @@ def fill_field(driver, identifier, identifier_type, value, action_name="", timeo
         # Aguarda até que o campo esteja presente na página
         element = wait.until(EC.presence_of_element_located((by_type[identifier_type], identifier)))
 
+        if fast_mode:
+            # Aguarda o campo estar visível, habilitado e sem overlay
+            element = WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                element_ready((by_type[identifier_type], identifier))
+            )
+            element.clear()
+            element.send_keys(value)
+
+            # Confirma que o valor foi realmente aplicado ao campo
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                    lambda d: _normalize_value(element.get_attribute("value") or "") == _normalize_value(value)
+                )
+            except TimeoutException:
+                log_message(f"⚠️ Aviso: O campo '{identifier}' não confirmou o valor digitado.")
+            _record_sleep(1, 0)
+            return True
+
         # Aguarda até que o campo esteja clicável
         wait.until(EC.element_to_be_clickable((by_type[identifier_type], identifier)))
 
         # Limpa o campo antes de inserir um novo valor
         element.clear()
-        time.sleep(1)  # Pequeno atraso para garantir que o campo esteja pronto
+        pause(1)  # Pequeno atraso para garantir que o campo esteja pronto
 
         # Insere o texto no campo de input
         element.send_keys(value)
+        return True
 
     except TimeoutException:
         log_message(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado após {timeout} segundos.")
+        timeouts.record_expired("fill_field", timeout)
 
     except NoSuchElementException:
         log_message(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado.")
@@ -110,10 +240,14 @@ def fill_field(driver, identifier, identifier_type, value, action_name="", timeo
 
     finally:
         execution_time = time.time() - start_time
-        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.")
+        timeouts.record_duration("fill_field", execution_time)
+        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.", action=action_name, duration=execution_time)
+
+    return False
 
 
-def click_element(driver, identifier, identifier_type, action_name="", timeout=20):
+@traced(category="action", args=("action_name",))
+def click_element(driver, identifier, identifier_type, action_name="", timeout=None):
     """
     Localiza um elemento na página e realiza um clique, baseado no tipo de identificador.
 
@@ -122,13 +256,15 @@ def click_element(driver, identifier, identifier_type, action_name="", timeout=2
     - identifier (str): O valor do identificador do elemento (ex: ID ou XPath).
     - identifier_type (str): O tipo do identificador ('id', 'xpath', 'class_name', etc.).
     - action_name (str, opcional): Nome da ação para log.
-    - timeout (int, opcional): Tempo máximo de espera pelo elemento (padrão: 20 segundos).
+    - timeout (int, opcional): Tempo máximo de espera pelo elemento (padrão: timeout adaptativo
+      do histórico, até 20 segundos; ver timeouts.get_timeout).
 
     Retorno:
-    - Nenhum. Apenas realiza o clique no elemento.
+    - bool: True se o clique foi realizado, False se o elemento não foi encontrado ou houve erro.
     """
 
     start_time = time.time()  # Marca o início da execução
+    timeout = timeout or timeouts.get_timeout("click_element")
 
     try:
         wait = WebDriverWait(driver, timeout)  # Configura tempo máximo de espera para encontrar o elemento
@@ -146,15 +282,24 @@ def click_element(driver, identifier, identifier_type, action_name="", timeout=2
         if identifier_type not in by_type:
             raise ValueError(f"❌ Tipo de identificador '{identifier_type}' não é suportado.")
 
-        # Aguarda até que o elemento esteja clicável na página
-        element = wait.until(EC.element_to_be_clickable((by_type[identifier_type], identifier)))
+        if fast_mode:
+            # Aguarda o elemento estar visível, habilitado e sem overlay sobre ele
+            element = WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                element_ready((by_type[identifier_type], identifier))
+            )
+            _record_sleep(1, 0)
+        else:
+            # Aguarda até que o elemento esteja clicável na página
+            element = wait.until(EC.element_to_be_clickable((by_type[identifier_type], identifier)))
+            pause(1)  # Pequeno delay para garantir que o elemento esteja pronto para interação
 
-        time.sleep(1)  # Pequeno delay para garantir que o elemento esteja pronto para interação
         element.click()  # Realiza o clique no elemento
+        return True
 
     except TimeoutException:
         # Se o tempo limite for atingido e o elemento não for encontrado
         log_message(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado após {timeout} segundos.")
+        timeouts.record_expired("click_element", timeout)
 
     except NoSuchElementException:
         # Se o elemento não existir na página
@@ -167,7 +312,10 @@ def click_element(driver, identifier, identifier_type, action_name="", timeout=2
     finally:
         # Calcula e exibe o tempo total da execução
         execution_time = time.time() - start_time
-        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.")
+        timeouts.record_duration("click_element", execution_time)
+        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.", action=action_name, duration=execution_time)
+
+    return False
 
 
 def get_file_path(folder_name):
@@ -197,44 +345,22 @@ def get_file_path(folder_name):
 
     return folder_path  # Retorna o caminho absoluto da pasta
 
-def load_env_file():
-    """
-    Carrega o arquivo .env corretamente, seja no ambiente de desenvolvimento ou no executável.
-
-    Retorno:
-    - Nenhum retorno, apenas carrega as variáveis do .env para o ambiente do sistema.
-    """
-
-    # Determina o diretório base conforme o ambiente de execução
-    if getattr(sys, 'frozen', False):  # Se estiver rodando como executável do PyInstaller
-        base_path = os.path.dirname(sys.executable)  # Obtém o diretório do executável
-        # Define o caminho do arquivo .env dentro da pasta _internal
-        env_path = os.path.join(base_path, "_internal", ".env")
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))  # Obtém o diretório do script Python
-        # Define o caminho do arquivo .env no ambiente de desenvolvimento
-        env_path = os.path.join(base_path, ".env")
-
-    # Verifica se o arquivo .env existe antes de carregá-lo
-    if os.path.exists(env_path):
-        log_message(f"✅ Arquivo .env carregado de: {env_path}")
-        load_dotenv(env_path)  # Carrega as variáveis do .env para o ambiente
-    else:
-        log_message("⚠️ Aviso: Arquivo .env não encontrado. Verifique o caminho.")
-
+@traced(category="action", args=("folder_name",))
 def send_files(driver,folder_name, action_name=""):
     """
-    Envia arquivos automaticamente para uma janela de upload utilizando xdotool.
+    Envia arquivos diretamente pelo campo <input type=file> da página, sem janela nativa
+    (o diálogo do sistema é suprimido por install_file_dialog_guard).
 
     Parâmetros:
     - folder_name (str): Nome da pasta que contém os arquivos.
     - action_name (str, opcional): Nome da ação para fins de log.
 
     Retorno:
-    - Nenhum retorno. Apenas executa a ação e exibe mensagens de status.
+    - list: Caminhos dos arquivos selecionados no campo de upload (vazia em caso de erro).
     """
 
     start_time = time.time()  # Marca o tempo de início da execução
+    files = []
 
     try:
         # Obtém o caminho absoluto da pasta onde os arquivos estão armazenados
@@ -243,58 +369,394 @@ def send_files(driver,folder_name, action_name=""):
         # Verifica se a pasta realmente existe
         if not os.path.exists(folder_path):
             log_message(f"❌ Erro: A pasta '{folder_name}' não foi encontrada.")
-            return  # Encerra a função se a pasta não existir
+            return files  # Encerra a função se a pasta não existir
 
-        time.sleep(1)  # Pequeno atraso antes de continuar
+        pause(1, driver)  # Pequeno atraso antes de continuar
 
-        files = [os.path.join(folder_path, file) for file in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, file))]
+        # Arquivos a enviar conforme o manifesto (sem duplicatas e/ou re-codificados, se configurado)
+        files = select_files(folder_name)
 
-        time.sleep(0.5)
+        pause(0.5)
 
         file_paths = "\n".join(files)
         file_input = driver.find_element(By.XPATH, "//input[@type='file' and @accept='image/*,.pdf,.zip']")
         file_input.send_keys(file_paths)
 
         log_message(f"✅ Arquivos da pasta '{folder_name}' enviados com sucesso!")
-        
-        pyautogui.hotkey('alt', 'f4')  # Fecha a janela de upload
-
-    except subprocess.CalledProcessError as e:
-        log_message(f"❌ Erro ao executar comando xdotool: {e}")
 
     except Exception as e:
         log_message(f"❌ Ocorreu um erro: {e}")
+        files = []
 
     finally:
         # Calcula e exibe o tempo total da operação
         execution_time = time.time() - start_time
-        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.")
+        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.", action=action_name, duration=execution_time)
+
+    return files
+
+
+# Observa o DOM no navegador e resolve assim que o texto deixa de existir (ou no timeout)
+TEXT_GONE_SCRIPT = """
+const text = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const now = () => performance.timeOrigin + performance.now();
+const started = now();
+
+const present = () => {
+    const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        if (walker.currentNode.nodeValue.includes(text)) { return true; }
+    }
+    return false;
+};
+
+if (!present()) { return done({gone: true, timestamp: now(), started: started}); }
+
+let timer = null;
+const observer = new MutationObserver(() => { if (!present()) { finish(true); } });
+const finish = (gone) => {
+    observer.disconnect();
+    clearTimeout(timer);
+    done({gone: gone, timestamp: now(), started: started});
+};
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => finish(!present()), timeoutMs);
+"""
+
+# Momento (no relógio do navegador) em que cada texto foi visto desaparecer, por thread
+_text_events = threading.local()
+
+
+def browser_now(driver):
+    """
+    Retorna o horário atual do navegador em milissegundos (epoch), com precisão sub-milissegundo.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+
+    Retorno:
+    - float ou None: Timestamp do navegador, ou None se não for possível obtê-lo.
+    """
+
+    try:
+        return driver.execute_script("return performance.timeOrigin + performance.now();")
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível obter o horário do navegador: {e}")
+        return None
+
+
+def get_text_gone_time(text):
+    """
+    Retorna o timestamp do navegador (ms) em que o texto foi visto desaparecer pela última vez.
+
+    Parâmetros:
+    - text (str): Texto monitorado por wait_text_gone, check_text_on_page ou check_and_refresh.
+
+    Retorno:
+    - float ou None: Timestamp em milissegundos, ou None se o texto não foi monitorado.
+    """
+
+    return getattr(_text_events, 'times', {}).get(text)
+
+
+def reset_text_events():
+    """
+    Limpa os timestamps de desaparecimento de texto registrados na thread atual.
+    """
+
+    _text_events.times = {}
+
+
+@contextlib.contextmanager
+def script_timeout(driver, seconds):
+    """
+    Ajusta o timeout de scripts assíncronos durante o bloco e restaura o valor anterior ao sair.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - seconds (float): Timeout de script (em segundos) dentro do bloco.
+    """
+
+    try:
+        previous_timeout = driver.timeouts.script
+    except Exception:
+        previous_timeout = None
+
+    driver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        if previous_timeout is not None:
+            try:
+                driver.set_script_timeout(previous_timeout)
+            except Exception:
+                pass
+
+
+@traced(category="wait", args=("text",))
+def wait_text_gone(driver, text, timeout):
+    """
+    Aguarda, sem polling, até que um texto deixe de existir na página. Instala um
+    MutationObserver no navegador via execute_async_script e resolve no exato momento
+    em que o texto sai do DOM.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - text (str): Texto a ser monitorado.
+    - timeout (float): Tempo máximo de espera (em segundos).
+
+    Retorno:
+    - dict ou None: {'gone': bool, 'timestamp': ms do navegador, 'started': ms do navegador},
+      ou None se a observação falhar (ex.: a página foi recarregada durante a espera).
+    """
+
+    try:
+        with script_timeout(driver, timeout + 5):
+            result = driver.execute_async_script(TEXT_GONE_SCRIPT, text, int(timeout * 1000))
+
+        if result and result.get("gone"):
+            if not hasattr(_text_events, 'times'):
+                _text_events.times = {}
+            _text_events.times[text] = result["timestamp"]
+
+        return result
+
+    except Exception as e:
+        log_message(f"⚠️ Observação do texto '{text}' interrompida: {e}")
+        return None
+
+
+# Contador de requisições XHR/fetch em andamento, injetado em cada documento antes dos scripts da página
+NETWORK_TRACKER_SCRIPT = """
+(() => {
+    if (window.__harnessNet) { return; }
+    const net = window.__harnessNet = {pending: 0, last: performance.now()};
+    const begin = () => { net.pending++; net.last = performance.now(); };
+    const end = () => { net.pending = Math.max(net.pending - 1, 0); net.last = performance.now(); };
+
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        try { return send.apply(this, arguments); } catch (e) { end(); throw e; }
+    };
+
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            try { return fetch.apply(this, arguments).finally(end); } catch (e) { end(); throw e; }
+        };
+    }
+})();
+"""
+
+# Resolve quando a página está ociosa: sem XHR/fetch pendente há quietMs, Angular estável,
+# sem barra de progresso/spinner visível e (opcionalmente) com o seletor presente
+PAGE_SETTLED_SCRIPT = NETWORK_TRACKER_SCRIPT + """
+const quietMs = arguments[0];
+const timeoutMs = arguments[1];
+const selector = arguments[2];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+const net = window.__harnessNet;
+
+let angularStable = typeof window.getAllAngularTestabilities !== 'function';
+const waitAngular = () => {
+    const testabilities = window.getAllAngularTestabilities();
+    let remaining = testabilities.length;
+    if (!remaining) { angularStable = true; return; }
+    testabilities.forEach(testability => testability.whenStable(() => {
+        if (--remaining === 0) { angularStable = true; }
+    }));
+};
+if (!angularStable) { try { waitAngular(); } catch (e) { angularStable = true; } }
+
+const blocked = () => {
+    for (const el of document.querySelectorAll(
+            '.cdk-overlay-backdrop-showing, mat-progress-bar, mat-spinner, mat-progress-spinner')) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width > 0 && rect.height > 0) { return true; }
+    }
+    return false;
+};
+
+// Timers recorrentes (ex.: polling de status) podem impedir o whenStable para sempre:
+// depois de 5 s, a rede ociosa e a ausência de indicadores de progresso bastam
+const angularMaxMs = 5000;
+
+const check = () => {
+    const now = performance.now();
+    const idle = net.pending === 0 && now - net.last >= quietMs;
+    const angularOk = angularStable || now - started >= angularMaxMs;
+    if (document.readyState === 'complete' && idle && angularOk && !blocked()
+            && (!selector || document.querySelector(selector))) {
+        return done({settled: true, elapsedMs: now - started, pending: 0, angularStable: angularStable});
+    }
+    if (now - started >= timeoutMs) {
+        return done({settled: false, elapsedMs: now - started, pending: net.pending,
+                     angularStable: angularStable, blocked: blocked()});
+    }
+    setTimeout(check, 25);
+};
+check();
+"""
+
+
+# Impede que cliques em <input type=file> abram o diálogo nativo do sistema (que exigiria
+# uma sessão gráfica para ser fechado). Inputs criados fora do DOM são anexados ocultos,
+# para que o Selenium consiga encontrá-los e preencher os arquivos com send_keys.
+FILE_DIALOG_GUARD_SCRIPT = """
+(() => {
+    if (window.__harnessFileGuard) { return; }
+    window.__harnessFileGuard = {suppressed: 0};
+    const guard = function (original) {
+        return function () {
+            if (this.type === 'file') {
+                window.__harnessFileGuard.suppressed++;
+                if (!this.isConnected) {
+                    this.style.display = 'none';
+                    (document.body || document.documentElement).appendChild(this);
+                }
+                return;
+            }
+            return original.apply(this, arguments);
+        };
+    };
+    HTMLInputElement.prototype.click = guard(HTMLInputElement.prototype.click);
+    if (HTMLInputElement.prototype.showPicker) {
+        HTMLInputElement.prototype.showPicker = guard(HTMLInputElement.prototype.showPicker);
+    }
+})();
+"""
+
+
+def install_file_dialog_guard(driver):
+    """
+    Suprime o diálogo nativo de seleção de arquivos em todo documento novo e na página atual.
+    O upload passa a acontecer apenas pelo <input type=file> (ver send_files).
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver (Chrome).
+
+    Retorno:
+    - bool: True se o script foi registrado via DevTools.
+    """
+
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": FILE_DIALOG_GUARD_SCRIPT})
+        driver.execute_script(FILE_DIALOG_GUARD_SCRIPT)
+        return True
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível suprimir o diálogo de arquivos: {e}")
+        return False
+
+
+def install_network_tracker(driver):
+    """
+    Registra o contador de XHR/fetch para ser executado em todo documento novo, antes dos
+    scripts da aplicação (Page.addScriptToEvaluateOnNewDocument), e também na página atual.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver (Chrome).
+
+    Retorno:
+    - bool: True se o script foi registrado via DevTools.
+    """
+
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_SCRIPT})
+        driver.execute_script(NETWORK_TRACKER_SCRIPT)
+        return True
+    except Exception as e:
+        log_message(f"⚠️ Não foi possível instalar o rastreador de requisições: {e}")
+        return False
+
+
+@traced(category="wait")
+def wait_page_settled(driver, timeout=60, quiet_ms=300, selector=None):
+    """
+    Aguarda a página ficar ociosa: nenhuma requisição XHR/fetch pendente por 'quiet_ms',
+    Angular estável (whenStable), sem barra de progresso/spinner visível e, se informado,
+    com o seletor CSS presente. Retorna assim que tudo isso for verdade.
+
+    Em páginas carregadas antes do rastreador existir, as requisições anteriores à chamada
+    não são vistas; o Angular (whenStable) e os indicadores de progresso cobrem esse caso.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - timeout (float, opcional): Tempo máximo de espera (padrão: 60 segundos).
+    - quiet_ms (int, opcional): Tempo sem requisições para considerar a rede ociosa (padrão: 300 ms).
+    - selector (str, opcional): Seletor CSS que precisa existir (ex.: 'mat-expansion-panel-header').
+
+    Retorno:
+    - dict ou None: {'settled': bool, 'elapsedMs': float, ...}, ou None se o script falhar
+      (nesse caso usa a espera antiga pela barra de progresso e pelo seletor).
+    """
 
+    try:
+        with script_timeout(driver, timeout + 5):
+            result = driver.execute_async_script(PAGE_SETTLED_SCRIPT, quiet_ms, int(timeout * 1000), selector)
+
+        if result and not result.get("settled"):
+            log_message(f"⚠️ Página não estabilizou em {timeout} segundos ({result}).")
+        return result
+
+    except Exception as e:
+        log_message(f"⚠️ Espera por página ociosa indisponível, usando a espera pela barra de progresso: {e}")
 
+        try:
+            WebDriverWait(driver, timeout).until_not(
+                EC.presence_of_element_located((By.CLASS_NAME, "mat-progress-bar-buffer"))
+            )
+            if selector:
+                WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        except Exception as wait_error:
+            log_message(f"⚠️ {wait_error}")
+        return None
+
+
+@traced(category="wait", args=("text",))
 def check_text_on_page(driver, text, timeout, check_interval=5):
     """
     Verifica continuamente se um texto específico ainda está presente na página.
+    Usa wait_text_gone (MutationObserver) e recorre ao polling caso a observação falhe.
 
     Parâmetros:
     - driver (WebDriver): Instância do Selenium WebDriver.
     - text (str): Texto a ser verificado na página.
     - timeout (int): Tempo máximo para aguardar a remoção do texto (em segundos).
-    - check_interval (int, opcional): Intervalo entre verificações (padrão: 5 segundos).
+    - check_interval (int, opcional): Intervalo entre verificações no modo polling (padrão: 5 segundos).
 
     Retorno:
-    - True: Se o texto desaparecer antes do tempo limite.
-    - False: Se o texto ainda estiver presente após o tempo limite.
+    - True: Se o texto ainda estiver presente após o tempo limite.
+    - False: Se o texto desaparecer antes do tempo limite.
     """
 
     start_time = time.time()  # Marca o tempo de início da verificação
     log_message(f"🔍 Iniciando verificação do texto: '{text}'")
 
     while True:
+        remaining = timeout - (time.time() - start_time)
+
+        # Tenta a espera baseada em eventos do DOM
+        result = wait_text_gone(driver, text, max(remaining, 0))
+        if result is not None:
+            if result["gone"]:
+                log_message(f"✅ O texto '{text}' desapareceu da página.")
+                return False
+            if time.time() - start_time >= timeout:
+                log_message(f"⏳ Tempo limite atingido! O texto '{text}' ainda está na página.")
+                return True
+            continue
+
         try:
             # Busca elementos que contêm o texto desejado
             element_present = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
 
-            # Se o texto não estiver mais na página, retorna True
+            # Se o texto não estiver mais na página, retorna False
             if not element_present:
                 log_message(f"✅ O texto '{text}' desapareceu da página.")
                 return False
@@ -303,7 +765,7 @@ def check_text_on_page(driver, text, timeout, check_interval=5):
             log_message(f"❌ Erro ao verificar '{text}': {e}")
             return False
 
-        # Se o tempo limite for atingido, retorna False
+        # Se o tempo limite for atingido, retorna True
         if time.time() - start_time > timeout:
             log_message(f"⏳ Tempo limite atingido! O texto '{text}' ainda está na página.")
             return True
@@ -312,7 +774,7 @@ def check_text_on_page(driver, text, timeout, check_interval=5):
         time.sleep(check_interval)
 
 
-
+@traced(category="action", args=("action_name",))
 def get_number(driver, identifier, identifier_type, action_name="", timeout=20):
     """
     Localiza um elemento que contém uma numeração e retorna o valor encontrado.
@@ -354,48 +816,170 @@ def get_number(driver, identifier, identifier_type, action_name="", timeout=20):
 
         # Se o elemento estiver visível, mas sem texto, exibe um aviso
         if not badge_number:
-           print(f"⚠️ Aviso: O elemento com {identifier_type} '{identifier}' foi encontrado, mas está vazio.")
+           log_message(f"⚠️ Aviso: O elemento com {identifier_type} '{identifier}' foi encontrado, mas está vazio.")
         else:
-           print(f"✅ Numeração capturada: {badge_number}")
+           log_message(f"✅ Numeração capturada: {badge_number}")
 
     except TimeoutException:
         # Se o tempo limite for atingido e o elemento não for encontrado
-       print(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado após {timeout} segundos.")
+       log_message(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado após {timeout} segundos.")
 
     except NoSuchElementException:
         # Se o elemento não existir na página
-       print(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado.")
+       log_message(f"❌ Erro: O elemento com {identifier_type} '{identifier}' não foi encontrado.")
 
     except ValueError as ve:
         # Se o tipo de identificador for inválido
-       print(f"❌ Erro de valor: {ve}")
+       log_message(f"❌ Erro de valor: {ve}")
 
     except Exception as e:
         # Qualquer outro erro inesperado
-       print(f"❌ Ocorreu um erro inesperado: {e}")
+       log_message(f"❌ Ocorreu um erro inesperado: {e}")
 
     finally:
         # Calcula o tempo de execução da ação
         execution_time = time.time() - start_time
-        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.")
+        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos.", action=action_name, duration=execution_time)
 
     return badge_number  # Retorna o número capturado (ou None se não encontrado)
 
-def identify_fields(driver):
+# Conjunto de mensagens que indicam ausência de informações nos widgets
+EMPTY_STATE_MESSAGES = {
+    'Esse paciente não possui um histórico de acompanhamento.',
+    'Não há medidas a serem exibidas',
+    'Nenhuma prescrição de medicamento',
+    'Não identificamos palavras-chaves para esse paciente.',
+    'Nenhum procedimento.',
+    'Nenhuma prescrição de óculos',
+    'Nenhuma refração dinâmica',
+    'Nenhuma refração estática',
+    'Nenhum exame de auto-refrator',
+    'Nenhum exame de auto-tonômetro'
+}
+
+# Expande todos os painéis fechados, aguarda cada um renderizar e coleta as mensagens de vazio
+EXPAND_AND_SCAN_SCRIPT = """
+const library = new Set(arguments[0]);
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+
+const widgets = Array.from(document.querySelectorAll('mat-expansion-panel-header')).map(header => {
+    const wasExpanded = header.getAttribute('aria-expanded') === 'true';
+    if (!wasExpanded) { header.click(); }
+    return {
+        header: header,
+        panel: header.closest('mat-expansion-panel') || header.parentElement,
+        title: (header.innerText || '').trim().split('\\n')[0],
+        wasExpanded: wasExpanded,
+        renderMs: null
+    };
+});
+
+const rendered = (widget) => {
+    if (widget.header.getAttribute('aria-expanded') !== 'true') { return false; }
+    const body = widget.panel.querySelector('.mat-expansion-panel-body') || widget.panel;
+    return (body.innerText || '').trim().length > 0;
+};
+
+const emptyMessages = (root) => Array.from(root.querySelectorAll('mat-card-content p'))
+    .map(p => (p.innerText || '').trim())
+    .filter(text => library.has(text));
+
+const finish = () => {
+    const messages = [];
+    for (const text of emptyMessages(document)) {
+        if (!messages.includes(text)) { messages.push(text); }
+    }
+    done({
+        elapsedMs: performance.now() - started,
+        messages: messages,
+        widgets: widgets.map(widget => {
+            const found = emptyMessages(widget.panel);
+            return {
+                title: widget.title,
+                wasExpanded: widget.wasExpanded,
+                renderMs: widget.renderMs,
+                empty: found.length > 0,
+                messages: found
+            };
+        })
+    });
+};
+
+const tick = () => {
+    const now = performance.now();
+    for (const widget of widgets) {
+        if (widget.renderMs === null && rendered(widget)) { widget.renderMs = now - started; }
+    }
+    if (widgets.every(widget => widget.renderMs !== null) || now - started > timeoutMs) { return finish(); }
+    // setTimeout em vez de requestAnimationFrame: o rAF é suspenso em janelas em segundo plano
+    // (workers paralelos com janela), e o timeout interno nunca seria verificado
+    setTimeout(tick, 50);
+};
+tick();
+"""
+
+
+@traced(category="action")
+def expand_and_scan_widgets(driver, timeout=10):
+    """
+    Expande todos os painéis fechados e coleta as mensagens de estado vazio em uma única
+    chamada ao navegador.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - timeout (int, opcional): Tempo máximo para os painéis renderizarem (padrão: 10 segundos).
+
+    Retorno:
+    - dict ou None: {'messages': mensagens de vazio encontradas, 'widgets': lista com título,
+      'empty', 'messages' e 'renderMs' de cada painel, 'elapsedMs': duração total}, ou None em caso de erro.
+    """
+
+    start_time = time.time()
+
     try:
-        # Conjunto de mensagens que indicam ausência de informações
-        library = {
-            'Esse paciente não possui um histórico de acompanhamento.',
-            'Não há medidas a serem exibidas',
-            'Nenhuma prescrição de medicamento',
-            'Não identificamos palavras-chaves para esse paciente.',
-            'Nenhum procedimento.',
-            'Nenhuma prescrição de óculos',
-            'Nenhuma refração dinâmica',
-            'Nenhuma refração estática',
-            'Nenhum exame de auto-refrator',
-            'Nenhum exame de auto-tonômetro'
-        }
+        with script_timeout(driver, timeout + 5):
+            result = driver.execute_async_script(EXPAND_AND_SCAN_SCRIPT, sorted(EMPTY_STATE_MESSAGES), int(timeout * 1000))
+
+        for widget in result["widgets"]:
+            render = f"{widget['renderMs']:.0f} ms" if widget["renderMs"] is not None else "não renderizou"
+            status = "vazio" if widget["empty"] else "com dados"
+            log_message(f"🔽 Widget '{widget['title']}' ({status}) - renderização: {render}")
+
+        return result
+
+    except Exception as e:
+        log_message(f"⚠️ Expansão em lote indisponível: {e}")
+        return None
+
+    finally:
+        execution_time = time.time() - start_time
+        log_message(f"⏳ Ação 'Expandir e verificar widgets' concluída em {execution_time:.2f} segundos.", duration=execution_time)
+
+
+@traced(category="action")
+def identify_fields(driver, bulk=True):
+    """
+    Expande os painéis da página e identifica os widgets sem informações.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - bulk (bool, opcional): Se True, expande e verifica tudo em uma única chamada ao
+      navegador (padrão: True). Em caso de falha, usa a verificação painel a painel.
+
+    Retorno:
+    - list: Mensagens de estado vazio encontradas na página.
+    """
+
+    if bulk:
+        result = expand_and_scan_widgets(driver)
+        if result is not None:
+            log_message("Processamento finalizado!")
+            return result["messages"]
+
+    try:
+        library = EMPTY_STATE_MESSAGES
 
         found_messages = set()  # Guarda mensagens encontradas para evitar repetição
         wait = WebDriverWait(driver, 5)  # Tempo máximo de espera por elementos
@@ -434,128 +1018,112 @@ def identify_fields(driver):
         log_message(f"Ocorreu um erro: {e}")  # Captura e exibe erros durante a execução
 
 
+@traced(category="action", args=("patient_id",))
 def delete_patient(patient_id, action_name=""):
     """
     Realiza uma requisição DELETE para remover um paciente da API Voiston.
+    Usa o cliente compartilhado do api_client (conexão persistente, timeout e novas tentativas).
 
     Parâmetros:
     - patient_id (str): ID do paciente a ser deletado.
     - action_name (str): Nome da ação para ser registrado no log.
-    """
-    url_api = os.getenv('URL_API')
 
-    # URL da API onde o paciente será deletado
-    url = f"{url_api}{patient_id}"
-
-    # Obtém a API_KEY do ambiente (arquivo .env ou variável de ambiente do sistema)
-    api_key = os.getenv("API_KEY")
+    Retorno:
+    - bool: True se o paciente foi excluído (ou já não existia), False caso contrário.
+    """
 
     # Se a chave da API não for encontrada, exibe um erro e encerra a função
-    if not api_key:
+    if not os.getenv("API_KEY"):
         log_message("Erro: API_KEY não encontrada. Verifique o .env!")
-        return  # Sai da função sem executar a requisição
-
-    # Define os headers da requisição HTTP
-    headers = {
-        "Content-Type": "application/json",  # Especifica o formato do conteúdo
-        "apiKey": api_key  # Autenticação na API
-    }
+        return False  # Sai da função sem executar a requisição
 
     # Registra o tempo de início da operação para fins de log
     start_time = time.time()
 
     try:
-        # Envia a requisição DELETE para a API
-        response = requests.delete(url, headers=headers)
+        from api_client import get_client
+
+        result = get_client().delete_patient(patient_id)
 
-        # Se a requisição foi bem-sucedida (código 200)
-        if response.status_code == 200:
+        if result["ok"]:
             log_message(f"✅ Paciente {patient_id} deletado com sucesso!")
+        elif result["status"] is None:
+            # Se houver um erro inesperado (exemplo: API fora do ar), exibe a mensagem de erro
+            log_message(f"❌ Erro ao chamar o endpoint de deleção: {result['error']}")
         else:
             # Se houve um erro na requisição, exibe o código de resposta e a mensagem da API
-            log_message(f"❌ Erro ao deletar paciente {patient_id}. Código: {response.status_code}, Resposta: {response.text}")
+            log_message(f"❌ Erro ao deletar paciente {patient_id}. Código: {result['status']}, Resposta: {result['error']}")
+
+        return result["ok"]
 
     except Exception as e:
-        # Se houver um erro inesperado (exemplo: API fora do ar), exibe a mensagem de erro
         log_message(f"❌ Erro ao chamar o endpoint de deleção: {e}")
+        return False
 
     finally:
         # Calcula o tempo total da operação e registra no log
         execution_time = time.time() - start_time
-        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos")
-
-_installed_flag = False # Variável global
-
-def install_requirements():
-    global _installed_flag
-
-    if _installed_flag:
-        log_message("✅ Dependências já instaladas. Iniciando o teste...")
-        return
-    _installed_flag = True
-
-    # Ajusta o caminho do requirements.txt corretamente
-    if getattr(sys, 'frozen', False):  # Se estiver rodando como executável do PyInstaller
-        base_path = sys._MEIPASS  # Diretório temporário do PyInstaller
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))  # Diretório do script
-
-    requirements_path = os.path.join(base_path, 'requirements.txt')
+        log_message(f"⏳ Ação '{action_name}' concluída em {execution_time:.2f} segundos", action=action_name, duration=execution_time)
 
-    if not os.path.exists(requirements_path):
-        log_message(f"❌ Arquivo {requirements_path} não encontrado!")
-        sys.exit(1)
+# Coleta rótulo, badge e texto de todos os mat-chip em uma única chamada ao navegador
+CHIPS_SCRIPT = """
+return Array.from(document.getElementsByClassName('mat-chip')).map(chip => {
+    const badge = chip.querySelector('.mat-badge-content');
+    return {
+        label: (chip.getAttribute('aria-label') || '').trim(),
+        badge: badge ? (badge.innerText || badge.textContent || '').trim() : null,
+        text: (chip.innerText || '').trim()
+    };
+});
+"""
 
-    log_message("🔍 Verificando dependências...")
 
-    # Obtém a lista de pacotes necessários
-    with open(requirements_path, "r") as req_file:
-        required_packages = [line.strip() for line in req_file.readlines() if line.strip()]
+def _chip_value(badge, text):
+    # Prioriza o número do .mat-badge-content (página de Exames); senão usa o texto do mat-chip
+    if badge is not None:
+        return int(badge) if badge.isdigit() else 0
+    return int(text) if text.isdigit() else 0
 
-    # Obtém a lista de pacotes já instalados
-    installed_packages = subprocess.run([sys.executable, "-m", "pip", "freeze"], capture_output=True, text=True)
-    installed_packages = installed_packages.stdout.split("\n")
 
-    # Identifica os pacotes que ainda não estão instalados
-    missing_packages = [pkg for pkg in required_packages if not any(pkg in installed for installed in installed_packages)]
+def _collect_chips(driver):
+    """
+    Lê todos os mat-chip da página e retorna pares (rótulo, valor).
 
-    if not missing_packages:
-        log_message("✅ Todas as dependências já estão instaladas. Iniciando o teste...")
-        return  # Se tudo estiver instalado, não abre o terminal e inicia o teste imediatamente
+    Usa uma única chamada execute_script; se ela falhar, recorre à leitura elemento a elemento.
 
-    log_message("⚙️ Instalando pacotes necessários...")
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
 
-    python_cmd = sys.executable  # Usa o Python atual
-    venv_path = os.path.join(base_path, "venv")  # Caminho do ambiente virtual
-    venv_python = os.path.join(venv_path, "Scripts", "python.exe") if os.name == "nt" else os.path.join(venv_path, "bin", "python")
+    Retorno:
+    - list: Lista de tuplas (label, value).
+    """
 
-    # Testa se o pip está disponível
-    test_pip_cmd = f"{python_cmd} -m pip --version"
-    result = subprocess.run(test_pip_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        chips = driver.execute_script(CHIPS_SCRIPT) or []
+        return [(chip["label"], _chip_value(chip["badge"], chip["text"])) for chip in chips]
 
-    # Se pip não estiver disponível ou ambiente for restrito, cria um ambiente virtual
-    if b"externally-managed-environment" in result.stderr or not shutil.which("pip"):
-        log_message("⚠️ Ambiente do sistema restringe instalações. Criando ambiente virtual...")
+    except Exception as e:
+        log_message(f"⚠️ Extração em lote indisponível, lendo chip a chip: {e}")
 
-        if not os.path.exists(venv_path):
-            subprocess.run(f"{python_cmd} -m venv {venv_path}", shell=True)
+    pairs = []
+    for chip in driver.find_elements(By.CLASS_NAME, "mat-chip"):
+        try:
+            # Obtém a descrição da categoria
+            label = (chip.get_attribute("aria-label") or "").strip()
 
-        python_cmd = venv_python  # Passa a usar o Python do ambiente virtual
-        subprocess.run(f"{python_cmd} -m pip install --upgrade pip", shell=True)
+            # Tenta encontrar o valor no .mat-badge-content (página de Exames)
+            badges = chip.find_elements(By.CLASS_NAME, "mat-badge-content")
+            badge = badges[0].text.strip() if badges else None
 
-    # Comando para instalar as dependências
-    install_cmd = f"{python_cmd} -m pip install -r \"{requirements_path}\""
+            pairs.append((label, _chip_value(badge, chip.text.strip())))
 
-    # Execução no Windows
-    if os.name == "nt":
-        terminal_cmd = f'start cmd /k "{install_cmd} & timeout /t 2 & exit"'
-    else:  # Linux/macOS
-        terminal_cmd = f'x-terminal-emulator -e "sh -c \'{install_cmd}; sleep 2\'"'
+        except Exception as e:
+            log_message(f"⚠️ Erro ao processar um chip: {e}")
 
-    subprocess.run(terminal_cmd, shell=True)
+    return pairs
 
-    log_message("✅ Instalação concluída. Iniciando o teste...")
 
+@traced(category="action")
 def extract_data(driver):
     """
     Extrai informações das páginas de Prontuários e Exames.
@@ -567,7 +1135,7 @@ def extract_data(driver):
     - dict: Dicionário contendo os valores extraídos.
     """
 
-    time.sleep(2)  # Aguarda a página carregar os dados
+    pause(2, driver)  # Aguarda a página carregar os dados
 
     categories = {
         "prescription": "Quantidade de prescrições encontradas no prontuário",
@@ -585,37 +1153,17 @@ def extract_data(driver):
     }
 
     try:
-        # Localiza todas as divs que podem conter os dados
-        chips = driver.find_elements(By.CLASS_NAME, "mat-chip")
-
-        for chip in chips:
-            try:
-                # Obtém a descrição da categoria
-                label = chip.get_attribute("aria-label").strip() if chip.get_attribute("aria-label") else ""
-
-                value = 0  # Valor padrão caso não seja encontrado
-
-                # Tenta encontrar o valor no .mat-badge-content (página de Exames)
-                try:
-                    value_element = chip.find_element(By.CLASS_NAME, "mat-badge-content")
-                    value = int(value_element.text) if value_element.text.isdigit() else 0
-                except:
-                    # Se não encontrou .mat-badge-content, tenta pegar o número diretamente do mat-chip
-                    text_value = chip.text.strip()
-                    value = int(text_value) if text_value.isdigit() else 0
-
-                # Mapeia os valores para os campos corretos
-                if label == categories["prescription"]:
-                    extracted_data["prescriptions"] = value
-                elif label == categories["procedures"]:
-                    extracted_data["procedures"] = value
-                elif label == categories["measurement_prontuario"] or label == categories["measurement_exame"]:
-                    extracted_data["measurements"] += value  # Soma medidas de ambas as páginas
-                elif label == categories["group"]:
-                    extracted_data["groups"] = value
-
-            except Exception as e:
-                log_message(f"⚠️ Erro ao processar um chip: {e}")
+        # Lê todos os chips da página de uma só vez
+        for label, value in _collect_chips(driver):
+            # Mapeia os valores para os campos corretos
+            if label == categories["prescription"]:
+                extracted_data["prescriptions"] = value
+            elif label == categories["procedures"]:
+                extracted_data["procedures"] = value
+            elif label == categories["measurement_prontuario"] or label == categories["measurement_exame"]:
+                extracted_data["measurements"] += value  # Soma medidas de ambas as páginas
+            elif label == categories["group"]:
+                extracted_data["groups"] = value
 
     except Exception as e:
         log_message(f"❌ Erro ao extrair dados da página: {e}")
@@ -627,15 +1175,17 @@ def extract_data(driver):
 
     return extracted_data
 
+@traced(category="wait", args=("text",))
 def check_and_refresh(driver, text, timeout, refresh_interval=60):
     """
     Verifica continuamente se um texto específico ainda está presente na página e atualiza a página se necessário.
+    Entre os refreshes, aguarda o texto sumir via MutationObserver (wait_text_gone).
 
     Parâmetros:
     - driver (WebDriver): Instância do Selenium WebDriver.
     - text (str): Texto a ser verificado na página.
     - timeout (int): Tempo máximo para aguardar a remoção do texto (em segundos).
-    - refresh_interval (int, opcional): Intervalo entre verificações e atualizações (padrão: 35 segundos).
+    - refresh_interval (int, opcional): Intervalo entre atualizações da página (padrão: 60 segundos).
 
     Retorno:
     - True: Se o texto desaparecer antes do tempo limite.
@@ -649,45 +1199,182 @@ def check_and_refresh(driver, text, timeout, refresh_interval=60):
 
     while time.time() - start_time < timeout:
         try:
-            # Busca o texto na página
-            element_present = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
-
-            # Se o texto sumiu, retorna imediatamente
-            if not element_present:
-                log_message(f"✅ O texto '{text}' desapareceu da página.")
-                return True  # Encerra a verificação com sucesso
-
             elapsed_time = time.time() - start_time  # Tempo decorrido
 
-            # Nos primeiros 60 segundos, apenas verifica sem atualizar a página
+            # Nos primeiros 60 segundos apenas observa; depois, observa até o próximo refresh
             if elapsed_time < 60:
+                window = 60 - elapsed_time
+            else:
+                window = refresh_interval - (time.time() - last_refresh)
+            window = max(min(window, timeout - elapsed_time), 0)
+
+            result = wait_text_gone(driver, text, window)
+
+            if result is None:
+                # Observação indisponível: volta para a verificação por polling
+                element_present = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
+                if not element_present:
+                    log_message(f"✅ O texto '{text}' desapareceu da página.")
+                    return True
                 time.sleep(2)
-                continue
+
+            elif result["gone"]:
+                # Se o texto sumiu, retorna imediatamente
+                log_message(f"✅ O texto '{text}' desapareceu da página.")
+                return True  # Encerra a verificação com sucesso
 
             # Se passou dos 60s e o texto ainda está na página, faz refresh, mas limita a quantidade de tentativas
-            if time.time() - last_refresh > refresh_interval:
+            if time.time() - start_time >= 60 and time.time() - last_refresh >= refresh_interval:
                 driver.refresh()  # Faz refresh da página
                 last_refresh = time.time()  # Atualiza o tempo do último refresh
-                
-                try:
-                    WebDriverWait(driver, 60).until_not(
-                        EC.presence_of_element_located((By.CLASS_NAME, "mat-progress-bar-buffer"))
-                    )
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "mat-expansion-panel-header"))
-                    )
-                except Exception as e:
-                    print(f"⚠️ {e}")
-
-                # Espera 3 segundos adicionais após o refresh para estabilizar a página
-                time.sleep(3)
+
+                wait_page_settled(driver, 60, selector="mat-expansion-panel-header")
 
         except Exception as e:
             log_message(f"❌ Erro ao verificar '{text}': {e}")
             return False
 
-        # Pequeno intervalo antes da próxima verificação
-        time.sleep(3)
-
     log_message(f"⏳ Tempo limite atingido! O texto '{text}' ainda está na página.")
-    return False
\ No newline at end of file
+    return False
+
+
+# Avalia várias condições de texto sobre o mesmo retrato do DOM a cada mutação e resolve na primeira
+# satisfeita (ou no timeout). Cada condição: {name, mode: 'all_gone' | 'any_present', texts}.
+CONDITIONS_SCRIPT = """
+const conditions = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const now = () => performance.timeOrigin + performance.now();
+const started = now();
+const texts = [...new Set(conditions.flatMap(condition => condition.texts))];
+const goneAt = {};
+
+// Uma única passada pelos nós de texto responde a presença de todos os textos
+const snapshot = () => {
+    const present = {};
+    const walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const value = walker.currentNode.nodeValue;
+        for (const text of texts) {
+            if (!present[text] && value.includes(text)) { present[text] = true; }
+        }
+    }
+    const time = now();
+    for (const text of texts) {
+        if (present[text]) { delete goneAt[text]; }
+        else if (!(text in goneAt)) { goneAt[text] = time; }
+    }
+    return present;
+};
+
+const evaluate = () => {
+    const present = snapshot();
+    for (const condition of conditions) {
+        if (condition.mode === 'all_gone' && condition.texts.every(text => !present[text])) {
+            return {met: condition.name, timestamp: Math.max(...condition.texts.map(text => goneAt[text]))};
+        }
+        if (condition.mode === 'any_present' && condition.texts.some(text => present[text])) {
+            return {met: condition.name, timestamp: now()};
+        }
+    }
+    return null;
+};
+
+let timer = null;
+let scheduled = false;
+const observer = new MutationObserver(() => {
+    // Agrupa as mutações de um mesmo ciclo em uma única avaliação
+    if (scheduled) { return; }
+    scheduled = true;
+    queueMicrotask(() => { scheduled = false; const result = evaluate(); if (result) { finish(result); } });
+});
+const finish = (result) => {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(Object.assign({started: started, gone: goneAt}, result));
+};
+
+const initial = evaluate();
+if (initial) { return done(Object.assign({started: started, gone: goneAt}, initial)); }
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => finish(evaluate() || {met: null, timestamp: now()}), timeoutMs);
+"""
+
+
+@traced(category="wait")
+def wait_conditions(driver, conditions, timeout, refresh_interval=60, refresh=None):
+    """
+    Aguarda até que uma entre várias condições de texto seja satisfeita. Todas as condições são
+    avaliadas juntas sobre o mesmo retrato do DOM (MutationObserver), com uma única política de
+    atualização da página, em vez de esperas sequenciais que se reiniciam a cada refresh.
+
+    Parâmetros:
+    - driver (WebDriver): Instância do Selenium WebDriver.
+    - conditions (list): Tuplas (nome, modo, textos), com modo 'all_gone' (todos os textos sumiram)
+      ou 'any_present' (algum texto apareceu). Na ordem dada, a primeira satisfeita vence.
+    - timeout (float): Tempo máximo de espera (em segundos).
+    - refresh_interval (float, opcional): Intervalo entre atualizações da página (padrão: 60 segundos).
+    - refresh (callable, opcional): Como atualizar (padrão: driver.refresh seguido de wait_page_settled).
+
+    Retorno:
+    - dict: {'met': nome da condição satisfeita ou None no timeout, 'timestamp': ms do navegador em
+      que ela foi satisfeita, 'elapsed': segundos de espera, 'refreshes': atualizações feitas}.
+    """
+
+    payload = [{"name": name, "mode": mode, "texts": list(texts)} for name, mode, texts in conditions]
+    start_time = time.time()
+    last_refresh = start_time
+    refreshes = 0
+    result = None
+
+    log_message(f"🔍 Aguardando condições: {', '.join(condition['name'] for condition in payload)}")
+
+    while True:
+        elapsed_time = time.time() - start_time
+        window = max(min(refresh_interval - (time.time() - last_refresh), timeout - elapsed_time), 0)
+
+        try:
+            with script_timeout(driver, window + 5):
+                result = driver.execute_async_script(CONDITIONS_SCRIPT, payload, int(window * 1000))
+        except Exception as e:
+            # Observação interrompida (ex.: navegação durante a espera): tenta de novo
+            log_message(f"⚠️ Observação das condições interrompida: {e}")
+            result = None
+            time.sleep(1)
+
+        if result:
+            # Mantém get_text_gone_time coerente para os textos observados
+            if not hasattr(_text_events, 'times'):
+                _text_events.times = {}
+            _text_events.times.update(result.get("gone") or {})
+
+            if result.get("met"):
+                break
+
+        if time.time() - start_time >= timeout:
+            break
+
+        # Uma única política de atualização para todas as condições
+        if time.time() - last_refresh >= refresh_interval:
+            if refresh:
+                refresh()
+            else:
+                driver.refresh()
+                wait_page_settled(driver, 60, selector="mat-expansion-panel-header")
+            last_refresh = time.time()
+            refreshes += 1
+
+    met = result.get("met") if result else None
+    outcome = {
+        "met": met,
+        "timestamp": result.get("timestamp") if result else None,
+        "elapsed": round(time.time() - start_time, 3),
+        "refreshes": refreshes,
+    }
+
+    if met:
+        log_message(f"✅ Condição '{met}' satisfeita em {outcome['elapsed']:.2f} segundos "
+                    f"({refreshes} atualização(ões) da página).", condition=met, duration=outcome["elapsed"])
+    else:
+        log_message(f"⏳ Tempo limite atingido! Nenhuma condição satisfeita em {timeout:.0f} segundos.")
+    return outcome